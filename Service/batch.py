@@ -0,0 +1,201 @@
+import os
+import re
+import json
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from azure.ai.textanalytics import TextAnalyticsClient
+from azure.storage.blob import BlobServiceClient
+from openai import AzureOpenAI
+from Service import doc_cache, tracing
+from Service.docx_extract import extract_bytes
+from Service.ingest import load_artifact, ingest
+from Service.language_batch import analyze_chunks
+from Service.text_utils import clean_text
+from Service.gpt_stream import stream_completion
+from Service.retrieval import index_chunks, select_within_budget
+from Service.token_budget import count_tokens
+
+# 여러 RFP 일괄 분석 + 비교표
+# - 문서별 분석을 동시에 진행 → 전체 시간이 문서 수의 합이 아니라 가장 오래 걸리는 문서에 가까워짐
+# - .docx 파싱(CPU)은 프로세스 풀에서, 다운로드/Language/GPT(I/O)는 스레드에서 실행
+# - Language/GPT 호출은 프로세스 공용 슬롯(BATCH_LLM_CONCURRENCY)으로 동시 실행 수 제한
+#   (GPT 토큰 할당량은 별도로 rate_limiter가 관리)
+BATCH_MAX_DOCUMENTS = int(os.getenv("BATCH_MAX_DOCUMENTS", "8"))          # 동시에 진행할 문서 수
+BATCH_PARSE_WORKERS = int(os.getenv("BATCH_PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "4"))
+BATCH_DOC_TOKENS = int(os.getenv("BATCH_DOC_TOKENS", "12000"))            # 문서당 GPT 입력 상한 (초과 시 관련 청크만)
+BATCH_MAX_OUTPUT_TOKENS = 1200
+
+COMPARE_FIELDS = ["사업명", "발주기관", "사업 기간", "예산", "사업 목적", "핵심 요구사항", "기술 요구사항", "보안/규제", "평가 기준", "리스크"]
+COMPARE_QUERY = "사업 개요 목적 기간 예산 요구사항 기술 보안 평가 기준 일정 리스크"
+
+COMPARE_SYSTEM = "너는 금융권 RFP 문서를 비교 분석하는 전문가다. 문서에 없는 내용은 추측하지 말고 '명시 없음'으로 쓴다."
+COMPARE_PROMPT = """다음 RFP 문서에서 아래 항목을 추출해 JSON 객체 하나로만 답하세요.
+키: {fields}
+각 값은 100자 이내의 한국어 문자열로 작성하세요.
+
+문서 ({name}):
+\"\"\"{text}\"\"\""""
+
+llm_slots = threading.BoundedSemaphore(BATCH_LLM_CONCURRENCY)
+_pool_lock = threading.Lock()
+_parse_pool = None
+_pool_disabled = False   # 프로세스 풀을 만들 수 없는 환경이면 이후로는 현재 프로세스에서 파싱
+
+
+def _get_parse_pool():
+    global _parse_pool
+    with _pool_lock:
+        if _parse_pool is None:
+            # spawn: Streamlit 스레드 상태를 복제하지 않고 윈도우와 동일하게 동작
+            _parse_pool = ProcessPoolExecutor(max_workers=BATCH_PARSE_WORKERS,
+                                              mp_context=multiprocessing.get_context("spawn"))
+        return _parse_pool
+
+def parse_docx(data: bytes) -> list:
+    # 프로세스 풀에서 파싱 (풀을 쓸 수 없는 환경이면 현재 프로세스에서)
+    global _parse_pool, _pool_disabled
+    with tracing.span("docx.parse", bytes=len(data)) as span:
+        if not _pool_disabled:
+            try:
+                paragraphs = _get_parse_pool().submit(extract_bytes, data).result()
+                span.set(process_pool=True)
+                return paragraphs
+            except (BrokenProcessPool, OSError):
+                with _pool_lock:
+                    _parse_pool, _pool_disabled = None, True
+        span.set(process_pool=False)
+        return extract_bytes(data)
+
+def _prepare(client, container, name, etag, language_client):
+    # 업로드 시 만든 artifact가 있으면 그대로, 없으면 다운로드 → 프로세스 풀 파싱 → artifact 생성
+    artifact = load_artifact(client, container, name, etag) if etag else None
+    if artifact is not None:
+        return artifact
+    blob_client = client.get_blob_client(container, name)
+    etag = blob_client.get_blob_properties().etag
+    artifact = load_artifact(client, container, name, etag)
+    if artifact is not None:
+        return artifact
+    with tracing.span("blob.download", blob=name) as span:
+        data = blob_client.download_blob().readall()
+        span.set(bytes=len(data))
+    doc_cache.put_paragraphs(container, name, etag, parse_docx(data))
+    with llm_slots:  # ingest 안에서 Language 키워드 추출 호출
+        return ingest(client, container, name, etag, language_client)
+
+def _document_text(artifact) -> str:
+    text = "\n".join(artifact["paragraphs"])
+    if count_tokens(text) <= BATCH_DOC_TOKENS:
+        return text
+    # 긴 문서는 비교 항목과 관련도 높은 청크만
+    return "\n".join(select_within_budget(index_chunks(artifact["retrieval_chunks"]), COMPARE_QUERY, BATCH_DOC_TOKENS))
+
+def parse_fields(content: str) -> dict:
+    # 응답에서 JSON 객체만 꺼냄 (코드 블록/앞뒤 설명이 붙어도 허용), 실패하면 원문 일부를 비고로
+    match = re.search(r"\{.*\}", content, re.S)
+    if match:
+        try:
+            values = json.loads(match.group(0))
+            return {field: str(values.get(field, "명시 없음")) for field in COMPARE_FIELDS}
+        except ValueError:
+            pass
+    return {field: "" for field in COMPARE_FIELDS} | {"비고": content.strip()[:300]}
+
+def analyze_document(job, client: BlobServiceClient, container: str, name: str, etag: str,
+                     language_client: TextAnalyticsClient, gpt_client: AzureOpenAI, deployment: str,
+                     use_cache: bool = True) -> dict:
+    timings = {}
+    with tracing.span("batch.document", blob=name):
+        start = time.perf_counter()
+        artifact = _prepare(client, container, name, etag, language_client)
+        timings["문서 준비"] = time.perf_counter() - start
+        job.check()
+
+        key_phrases = artifact["key_phrases"]
+        if key_phrases is None:
+            step = time.perf_counter()
+            with llm_slots:
+                results = analyze_chunks(language_client, [clean_text(c) for c in artifact["language_chunks"]],
+                                         tasks=("key_phrases",))
+            key_phrases = [r["key_phrases"] for r in results]
+            timings["Language"] = time.perf_counter() - step
+        job.check()
+
+        step = time.perf_counter()
+        prompt = COMPARE_PROMPT.format(fields=", ".join(COMPARE_FIELDS), name=name, text=_document_text(artifact))
+        with llm_slots:
+            response = stream_completion(
+                gpt_client, deployment,
+                messages=[{"role": "system", "content": COMPARE_SYSTEM}, {"role": "user", "content": prompt}],
+                use_cache=use_cache,
+                max_tokens=BATCH_MAX_OUTPUT_TOKENS,
+            )
+        timings["GPT"] = time.perf_counter() - step
+
+    counts = {}
+    for phrases in key_phrases:
+        for phrase in phrases:
+            counts[phrase] = counts.get(phrase, 0) + 1
+    return {
+        "name": name,
+        "etag": artifact["source_etag"],
+        "paragraphs": len(artifact["paragraphs"]),
+        "key_phrases": sorted(counts, key=counts.get, reverse=True)[:8],
+        "fields": parse_fields(response["content"]),
+        "usage": response["usage"],
+        "cached": response["cached"],
+        "timings": timings,
+        "elapsed": time.perf_counter() - start,
+        "error": None,
+    }
+
+def run_batch(job, client: BlobServiceClient, container: str, documents: list,
+              language_client: TextAnalyticsClient, gpt_client: AzureOpenAI, deployment: str,
+              use_cache: bool = True) -> dict:
+    # documents: [(blob 이름, etag)] → 문서가 끝나는 대로 job.publish(results=...)로 중간 결과 공개
+    results = {}
+    start = time.perf_counter()
+    job.publish(total=len(documents), results={})
+    job.set_progress("일괄 분석", 0, len(documents))
+    pool = ThreadPoolExecutor(max_workers=max(1, min(BATCH_MAX_DOCUMENTS, len(documents))), thread_name_prefix="batch")
+    try:
+        futures = {
+            pool.submit(tracing.wrap(analyze_document), job, client, container, name, etag,
+                        language_client, gpt_client, deployment, use_cache): name
+            for name, etag in documents
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                results[name] = future.result()
+            except Exception as e:  # 한 문서의 실패가 전체를 막지 않도록
+                results[name] = {"name": name, "error": f"{type(e).__name__}: {e}", "elapsed": time.perf_counter() - start}
+            job.publish(results=dict(results))
+            job.set_progress("일괄 분석", len(results), len(documents))
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    job.check()  # 중지된 경우 문서 작업이 JobCancelled로 끝나므로 작업 전체도 중지로 기록
+    ordered = [results[name] for name, _ in documents]
+    return {
+        "results": ordered,
+        "table": comparison_table(ordered),
+        "elapsed": time.perf_counter() - start,
+        "serial_elapsed": sum(r["elapsed"] for r in ordered),
+    }
+
+def comparison_table(results: list) -> list:
+    # 문서 1건 = 1행 (st.dataframe / CSV 표시용)
+    rows = []
+    for r in results:
+        row = {"문서": r["name"]}
+        if r["error"]:
+            row.update({field: "" for field in COMPARE_FIELDS}, 키워드="", 오류=r["error"])
+        else:
+            row.update(r["fields"], 키워드=", ".join(r["key_phrases"][:5]), 오류="")
+        row["소요 시간(초)"] = round(r["elapsed"], 2)
+        rows.append(row)
+    return rows
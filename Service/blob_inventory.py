@@ -0,0 +1,80 @@
+import os
+import time
+import threading
+from azure.storage.blob import BlobServiceClient
+
+# 컨테이너별 .docx 목록 캐시 (모든 탭/세션 공유)
+# 앱에서 업로드/삭제하면 즉시 무효화, 앱 밖에서 바뀐 내용은 INVENTORY_TTL 주기로 다시 조회
+# 목록 조회(네트워크)는 잠금 밖에서 하고 결과만 잠금 안에서 교체 → 다른 컨테이너 조회/무효화가 기다리지 않음
+# 같은 컨테이너를 동시에 갱신하면 한 스레드만 조회하고 나머지는 그 결과를 기다림
+INVENTORY_TTL = int(os.getenv("BLOB_INVENTORY_TTL", "60"))
+
+_lock = threading.Lock()
+_inventory = {}
+_loading = {}      # 컨테이너 → 조회 중 완료 이벤트
+_generation = 0    # invalidate마다 증가 (조회 중에 무효화되면 그 결과는 캐시에 넣지 않음)
+
+
+def _fetch(client, container):
+    container_client = client.get_container_client(container)
+    return [
+        {
+            "name": blob.name,
+            "size": blob.size,
+            "etag": blob.etag,
+            "last_modified": blob.last_modified,
+            "content_sha256": (blob.metadata or {}).get("content_sha256"),
+        }
+        for blob in container_client.list_blobs(include=["metadata"])
+        if blob.name.endswith(".docx")
+    ]
+
+def list_docx(client: BlobServiceClient, container: str) -> list:
+    while True:
+        with _lock:
+            entry = _inventory.get(container)
+            if entry and time.monotonic() - entry["loaded_at"] < INVENTORY_TTL:
+                return entry["items"]
+            loading = _loading.get(container)
+            if loading is None:
+                loading = _loading[container] = threading.Event()
+                generation = _generation
+                break
+        # 다른 스레드가 조회 중 → 끝나면 캐시를 다시 확인 (실패/무효화됐으면 직접 조회)
+        loading.wait()
+
+    items = None
+    try:
+        items = _fetch(client, container)
+    finally:
+        with _lock:
+            if items is not None and generation == _generation:
+                _inventory[container] = {"items": items, "loaded_at": time.monotonic()}
+            if _loading.get(container) is loading:
+                del _loading[container]
+        loading.set()
+    return items
+
+def get_etag(client: BlobServiceClient, container: str, blob_name: str):
+    for item in list_docx(client, container):
+        if item["name"] == blob_name:
+            return item["etag"]
+    return None
+
+def invalidate(container: str = None):
+    global _generation
+    with _lock:
+        _generation += 1
+        if container is None:
+            _inventory.clear()
+            _loading.clear()
+        else:
+            _inventory.pop(container, None)
+            _loading.pop(container, None)
+
+def find_by_hash(client: BlobServiceClient, container: str, digest: str):
+    # 같은 내용(해시)의 blob이 이미 있으면 그 항목을 반환
+    for item in list_docx(client, container):
+        if item["content_sha256"] == digest:
+            return item
+    return None
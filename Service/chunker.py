@@ -0,0 +1,150 @@
+import re
+import zlib
+from collections import deque
+
+# 공용 청크 분할기 (Language 사전 분석 / 로컬 검색 인덱스 / map-reduce 요약에서 사용)
+# - 크기는 size_fn 단위(글자 수 기본, count_tokens를 넘기면 토큰 수)로 max_size 이하 (구분자 포함)
+# - max_chars: 서비스 입력 제한(예: Language 5120 요소)을 글자 수로 함께 제한 (단락 사이 줄바꿈 포함)
+# - 한 단락이 한도를 넘으면 한국어/영어 문장 경계에서 나누고, 문장도 넘으면 공백 기준으로 자름
+# - overlap: 앞 청크 끝 문장들(size_fn 단위 합계)을 다음 청크 앞에 반복 → 경계에 걸친 내용도 검색되도록
+# - 단락/문장마다 size_fn을 한 번씩만 호출하고 문자열은 join으로 합치므로 입력 길이에 선형
+# - 공백뿐인 단락은 건너뛰므로 빈 청크는 만들지 않음
+LANGUAGE_MAX_ELEMENTS = 5120
+
+# 내용 기준 경계: 청크가 최대 크기의 절반을 넘은 뒤, 해시 하위 비트가 0인 단락에서 끊음
+# → 문서 앞부분에 단락이 추가/삭제돼도 그 뒤 경계가 다시 같은 자리로 맞춰져 청크 해시 캐시를 재사용할 수 있음
+ANCHOR_MASK = 0x3   # 평균 4단락마다 한 번 경계 후보
+
+# 문장 끝: 마침표/물음표/느낌표(+닫는 따옴표·괄호) 뒤 공백
+_SENTENCE_END = re.compile(r"[.!?。！？…]+[\"'”’)\]]*(?=\s)")
+# 마침표 하나로 끝나는 약어는 문장 끝으로 보지 않음
+# - 라틴 문자/숫자 한 글자: 목록 번호/이니셜 ("1." "A." "J.") — 한 글자 한국어 단어("원." "명.")는 문장 끝
+# - 대문자로 시작하는 짧은 호칭/회사/참조 약어: "Mr." "Dr." "Inc." "Fig." ("May." 같은 일반 단어는 제외)
+# - 한 글자씩 마침표로 이은 약어: "e.g." "i.e." "U.S." ("3.5억." 같은 숫자는 문장 끝)
+_ABBREVIATION = re.compile(r"[A-Za-z0-9]|(?:Mrs?|Ms|Dr|Prof|Sr|Jr|St|Mt|Inc|Ltd|Co|Corp|Dept|Fig|No|Vol|Art|Sec)|[A-Za-z](?:\.[A-Za-z])+")
+_ABBREVIATION_WINDOW = 16   # 마침표 앞에서 약어를 찾는 글자 수 (긴 공백 없는 텍스트도 선형으로 검사)
+# 단락 안의 글머리 기호 앞 (○ 항목 ○ 항목 처럼 한 줄로 붙은 목록)
+_BULLET = re.compile(r"\s(?=[○●■□▶•※◦]\s)")
+
+
+def _is_anchor(para: str) -> bool:
+    return zlib.crc32(para.strip().encode("utf-8")) & ANCHOR_MASK == 0
+
+def _is_abbreviation(text, match):
+    if match.group() != ".":
+        return False
+    dot = match.start()
+    window = text[max(0, dot - _ABBREVIATION_WINDOW):dot]
+    words = window.split()
+    if not words or (len(words) == 1 and dot > _ABBREVIATION_WINDOW):
+        return False   # 창 안에 단어 시작이 없으면 긴 단어
+    return _ABBREVIATION.fullmatch(words[-1].lstrip("(\"'“‘")) is not None
+
+def split_sentences(text: str) -> list:
+    # 한국어/영어 문장 경계로 나눈 목록 (빈 문장 제외)
+    ends = {m.end() for m in _SENTENCE_END.finditer(text) if not _is_abbreviation(text, m)}
+    cuts = sorted(ends | {m.start() + 1 for m in _BULLET.finditer(text)})
+    sentences = []
+    start = 0
+    for cut in cuts + [len(text)]:
+        sentence = text[start:cut].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = cut
+    return sentences
+
+def _hard_split(text, max_size, size_fn, max_chars):
+    # 문장 하나가 한도를 넘는 경우: 크기 비율로 창 길이를 정해 공백에서 자르고, 그래도 넘으면 창을 줄임
+    window = max(1, len(text) * max_size // max(1, size_fn(text)))
+    if max_chars:
+        window = min(window, max_chars - 1)
+    start = 0
+    while start < len(text):
+        end = min(len(text), start + window)
+        if end < len(text):
+            space = text.rfind(" ", start + window // 2, end)
+            if space > start:
+                end = space + 1
+        piece = text[start:end].strip()
+        size = size_fn(piece + " ")
+        while size > max_size and end - start > 1:   # 토큰 밀도가 고르지 않은 구간은 비율만큼 줄임
+            end = start + max(1, min(end - start - 1, (end - start) * max_size // size))
+            piece = text[start:end].strip()
+            size = size_fn(piece + " ")
+        if piece:
+            yield piece
+        start = end
+
+def _units(paragraphs, max_size, size_fn, max_chars, split_all):
+    # (텍스트, 크기, 뒤에 붙일 구분자) 단위로 펼침: 보통은 단락 하나, 한도를 넘는 단락은 문장(또는 그 조각)
+    # 크기는 구분자까지 포함해 재므로 단위 크기의 합이 청크 크기의 상한이 됨
+    # split_all=True이면 모든 단락을 문장 단위로 (overlap을 문장 단위로 넘기기 위해)
+    def fits(text, sep):
+        size = size_fn(text + sep)
+        return size if size <= max_size and (not max_chars or len(text) < max_chars) else None
+
+    for para in paragraphs:
+        para = para.strip()
+        if not para:
+            continue
+        size = None if split_all else fits(para, "\n")
+        if size is not None:
+            yield para, size, "\n"
+            continue
+        pieces = []
+        for sentence in split_sentences(para):
+            if fits(sentence, " ") is not None:
+                pieces.append(sentence)
+            else:
+                pieces.extend(_hard_split(sentence, max_size, size_fn, max_chars))
+        for i, piece in enumerate(pieces):
+            sep = "\n" if i == len(pieces) - 1 else " "
+            yield piece, size_fn(piece + sep), sep
+
+def chunk_paragraphs(paragraphs: list, max_size: int, size_fn=len, overlap: int = 0, max_chars: int = None,
+                     content_defined: bool = False) -> list:
+    # 단락 목록을 max_size(size_fn 단위) 이하의 청크로 묶는다
+    # content_defined=True이면 내용 기준 경계도 사용 (버전 간 청크 재사용용)
+    if max_size <= 0:
+        raise ValueError("max_size는 1 이상이어야 합니다.")
+    overlap = max(0, min(overlap, max_size // 2))
+    chunks = []
+    current = deque()   # (텍스트, 크기, 구분자)
+    size = chars = 0
+    fresh = False       # 앞 청크에서 넘겨받은 overlap 외의 새 내용이 있는지
+
+    def flush():
+        nonlocal size, chars, fresh
+        text = "".join(t + sep for t, _, sep in current).rstrip() + "\n"
+        chunks.append(text)
+        # 끝부분 overlap만 남김 (청크 전체를 넘기지는 않음)
+        carried, carried_size = [], 0
+        for unit in reversed(current):
+            if len(carried) + 1 >= len(current) or carried_size + unit[1] > overlap:
+                break
+            carried.append(unit)
+            carried_size += unit[1]
+        current.clear()
+        current.extend(reversed(carried))
+        size = carried_size
+        chars = sum(len(t) + 1 for t, _, _ in current)
+        fresh = False
+
+    for text, unit_size, sep in _units(paragraphs, max_size, size_fn, max_chars, split_all=overlap > 0):
+        unit_chars = len(text) + 1
+        if fresh and (size + unit_size > max_size or (max_chars and chars + unit_chars > max_chars)):
+            flush()
+        # 넘겨받은 overlap과 합쳐 한도를 넘으면 앞에서부터 덜어냄
+        while current and (size + unit_size > max_size or (max_chars and chars + unit_chars > max_chars)):
+            dropped = current.popleft()
+            size -= dropped[1]
+            chars -= len(dropped[0]) + 1
+        current.append((text, unit_size, sep))
+        size += unit_size
+        chars += unit_chars
+        fresh = True
+        if content_defined and sep == "\n" and size >= max_size // 2 and _is_anchor(text):
+            flush()
+    if fresh:
+        flush()
+    return chunks
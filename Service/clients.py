@@ -0,0 +1,137 @@
+import os
+import time
+import threading
+from dotenv import load_dotenv
+from Service import tracing
+
+# 프로세스 공용 클라이언트 레지스트리
+# - Streamlit은 interaction마다 main.py를 다시 실행하므로, 클라이언트는 여기서 프로세스당 한 번만 생성
+# - 처음 사용될 때 생성(lazy)하고 모든 세션이 같은 인스턴스(연결 풀 포함)를 공유
+# - health()로 생성/점검 상태를, warm_up()으로 시작 직후 백그라운드 생성 + 연결 예열
+load_dotenv()  # 모듈은 프로세스당 한 번만 로드되므로 .env도 한 번만 읽음
+
+_lock = threading.Lock()
+_factories = {}
+_instances = {}
+_status = {}
+
+
+def setting(name: str, default=None):
+    return os.getenv(name, default)
+
+def register(name: str, factory, check=None):
+    # factory() → 클라이언트, check(client) → 가벼운 점검 호출 (예외가 나면 비정상)
+    with _lock:
+        _factories[name] = (factory, check)
+        _status.setdefault(name, {"built": False, "ok": None, "error": None, "build_ms": None, "checked_at": None})
+
+def get(name: str):
+    client = _instances.get(name)
+    if client is not None:
+        return client
+    with _lock:  # 동시에 첫 요청이 와도 한 번만 생성
+        client = _instances.get(name)
+        if client is None:
+            factory, _ = _factories[name]
+            start = time.perf_counter()
+            try:
+                with tracing.span("client.build", client=name):
+                    client = factory()
+            except Exception as e:
+                _status[name].update(ok=False, error=f"{type(e).__name__}: {e}")
+                raise
+            _instances[name] = client
+            _status[name].update(built=True, error=None, build_ms=round((time.perf_counter() - start) * 1000, 1))
+    return client
+
+def override(name: str, client):
+    # 벤치마크/로컬 실행용: 생성 대신 주어진 인스턴스 사용
+    with _lock:
+        _factories.setdefault(name, (lambda: client, None))
+        _status.setdefault(name, {"built": False, "ok": None, "error": None, "build_ms": None, "checked_at": None})
+        _instances[name] = client
+        _status[name].update(built=True, error=None, build_ms=0.0)
+
+def reset(name: str = None):
+    # 키 교체 등으로 다시 만들어야 할 때 (다음 get()에서 새로 생성)
+    with _lock:
+        for key in ([name] if name else list(_instances)):
+            _instances.pop(key, None)
+            if key in _status:
+                _status[key].update(built=False, ok=None, error=None, build_ms=None)
+
+
+class LazyClient:
+    # 화면 모듈에 주입하는 대리 객체: 속성에 처음 접근할 때 레지스트리에서 실제 클라이언트를 가져옴
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(get(self._name), attr)
+
+    def __repr__(self):
+        return f"LazyClient({self._name!r})"
+
+
+def lazy(name: str) -> LazyClient:
+    return LazyClient(name)
+
+def check(name: str) -> dict:
+    # 생성 + 점검 호출 1회 (연결 풀도 이때 예열됨)
+    status = _status[name]
+    try:
+        client = get(name)
+        _, check_func = _factories[name]
+        if check_func:
+            with tracing.span("client.check", client=name):
+                check_func(client)
+        status.update(ok=True, error=None)
+    except Exception as e:
+        status.update(ok=False, error=f"{type(e).__name__}: {e}"[:300])
+    status["checked_at"] = time.time()
+    return dict(status)
+
+def health() -> dict:
+    # {이름: {"built", "ok", "error", "build_ms", "checked_at"}} (점검 호출은 하지 않음)
+    with _lock:
+        return {name: dict(status) for name, status in _status.items()}
+
+def warm_up(names=None, background: bool = True):
+    # 앱 시작 직후 클라이언트를 미리 만들고 점검 호출로 연결을 열어 둠 → 첫 사용자 요청의 지연 감소
+    names = list(names or _factories)
+    def run():
+        for name in names:
+            check(name)
+    if not background:
+        run()
+        return None
+    thread = threading.Thread(target=tracing.wrap(run), name="client-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+# ---------------- 기본 클라이언트 ----------------
+
+def _blob():
+    from azure.storage.blob import BlobServiceClient
+    return BlobServiceClient.from_connection_string(setting("AZURE_CONNECTION_STRING"))
+
+def _language():
+    from azure.core.credentials import AzureKeyCredential
+    from azure.ai.textanalytics import TextAnalyticsClient
+    return TextAnalyticsClient(endpoint=setting("LANGUAGE_ENDPOINT"), credential=AzureKeyCredential(setting("LANGUAGE_API_KEY")))
+
+def _openai():
+    from openai import AzureOpenAI
+    # gpt_client = AzureOpenAI(api_key=key, api_version="2024-07-18-preview", azure_endpoint=endpoint)
+    # 429 재시도는 공용 스케줄러(rate_limiter)가 담당하므로 SDK 자체 재시도는 끔
+    # 스트리밍 usage(stream_options.include_usage)는 2024-09-01-preview 이상에서 지원
+    return AzureOpenAI(api_key=setting("OPENAI_API_KEY"), api_version=setting("OPENAI_API_VERSION", "2024-10-21"),
+                       azure_endpoint=setting("OPENAI_ENDPOINT"), max_retries=0)
+
+def _check_blob(client):
+    client.get_account_information()
+
+register("blob", _blob, _check_blob)
+register("language", _language)  # 점검 호출도 과금되므로 생성만 확인
+register("openai", _openai)
@@ -0,0 +1,77 @@
+import os
+import time
+import json
+import hashlib
+import sqlite3
+import threading
+
+# GPT 응답 캐시 (SQLite): 배포 이름 + 메시지 + 파라미터가 같으면 저장된 응답을 재사용
+CACHE_PATH = os.getenv("COMPLETION_CACHE_PATH", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "completions.sqlite3"))
+CACHE_TTL = int(os.getenv("COMPLETION_CACHE_TTL", str(7 * 24 * 3600)))               # 초
+CACHE_MAX_BYTES = int(os.getenv("COMPLETION_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+
+_lock = threading.Lock()
+_conn = None
+_stats = {"hit": 0, "miss": 0, "evicted": 0}
+
+
+def _connect():
+    global _conn
+    if _conn is None:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        _conn = sqlite3.connect(CACHE_PATH, check_same_thread=False, isolation_level=None)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute("""CREATE TABLE IF NOT EXISTS completions (
+            key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,
+            created REAL NOT NULL, accessed REAL NOT NULL)""")
+        _conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_accessed ON completions(accessed)")
+    return _conn
+
+def make_key(deployment: str, messages: list, params: dict = None) -> str:
+    payload = json.dumps({"deployment": deployment, "messages": messages, "params": params or {}},
+                         ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def get(key: str, track: bool = True):
+    # track=False: hit/miss 통계에 넣지 않음 (GPT 외 결과를 같은 저장소에 둘 때)
+    now = time.time()
+    with _lock:
+        conn = _connect()
+        row = conn.execute("SELECT value, created FROM completions WHERE key = ?", (key,)).fetchone()
+        if row is None or now - row[1] > CACHE_TTL:
+            if row is not None:
+                conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+            _stats["miss"] += track
+            return None
+        conn.execute("UPDATE completions SET accessed = ? WHERE key = ?", (now, key))
+        _stats["hit"] += track
+    return json.loads(row[0])
+
+def put(key: str, value: dict):
+    data = json.dumps(value, ensure_ascii=False)
+    now = time.time()
+    with _lock:
+        conn = _connect()
+        conn.execute("INSERT OR REPLACE INTO completions (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                     (key, data, len(data.encode("utf-8")), now, now))
+        _evict(conn, now)
+
+def _evict(conn, now):
+    # 만료 항목 삭제 후, 용량 초과분은 오래 사용되지 않은 순서로 삭제
+    expired = conn.execute("DELETE FROM completions WHERE created < ?", (now - CACHE_TTL,)).rowcount
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+    removed = 0
+    if total > CACHE_MAX_BYTES:
+        for key, size in conn.execute("SELECT key, size FROM completions ORDER BY accessed").fetchall():
+            if total <= CACHE_MAX_BYTES:
+                break
+            conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+            total -= size
+            removed += 1
+    _stats["evicted"] += expired + removed
+
+def cache_stats() -> dict:
+    with _lock:
+        conn = _connect()
+        count, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions").fetchone()
+        return dict(_stats, entries=count, bytes=size)
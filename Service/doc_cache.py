@@ -0,0 +1,130 @@
+import os
+import io
+import json
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceModifiedError
+from azure.storage.blob import BlobServiceClient
+from Service.docx_extract import EXTRACTOR_VERSION, extract_lines
+from Service import tracing
+
+# .docx 추출 텍스트 캐시 (메모리 LRU + 디스크)
+# 키: (컨테이너, blob 이름, ETag) → 문서가 바뀌면 ETag가 바뀌므로 자동으로 새로 추출
+CACHE_DIR = os.getenv("DOC_CACHE_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "docx_text"))
+MEMORY_MAX_ITEMS = int(os.getenv("DOC_CACHE_MEMORY_ITEMS", "16"))
+
+_memory = OrderedDict()
+_lock = threading.Lock()
+_stats = {"memory_hit": 0, "disk_hit": 0, "miss": 0}
+
+
+def _cache_key(container: str, blob_name: str, etag: str) -> str:
+    raw = f"{container}\0{blob_name}\0{etag}\0{EXTRACTOR_VERSION}".encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+def _disk_path(key: str) -> str:
+    return os.path.join(CACHE_DIR, key[:2], f"{key}.json.gz")
+
+def _memory_get(key):
+    with _lock:
+        if key in _memory:
+            _memory.move_to_end(key)
+            return _memory[key]
+    return None
+
+def _memory_put(key, paragraphs):
+    with _lock:
+        _memory[key] = paragraphs
+        _memory.move_to_end(key)
+        while len(_memory) > MEMORY_MAX_ITEMS:
+            _memory.popitem(last=False)
+
+def _disk_get(key):
+    path = _disk_path(key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return tuple(json.load(f)["paragraphs"])
+    except (OSError, ValueError, KeyError):
+        # 깨진 캐시 파일은 무시하고 다시 추출
+        return None
+
+def _disk_put(key, container, blob_name, etag, paragraphs):
+    path = _disk_path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    data = {"container": container, "blob": blob_name, "etag": etag, "paragraphs": list(paragraphs)}
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)  # 원자적 교체 (동시 실행 프로세스 보호)
+
+def extract_paragraphs(data):
+    # data: bytes 또는 seek 가능한 파일 객체 → 단락과 표의 행을 문서 순서대로
+    source = io.BytesIO(data) if isinstance(data, (bytes, bytearray)) else data
+    return tuple(extract_lines(source))
+
+def get_paragraphs(client: BlobServiceClient, container: str, blob_name: str, etag: str = None) -> list:
+    with tracing.span("doc.load", blob=blob_name) as span:
+        paragraphs = _get_paragraphs(client, container, blob_name, etag, span)
+        span.set(paragraphs=len(paragraphs))
+        return paragraphs
+
+def _get_paragraphs(client, container, blob_name, etag, span):
+    # etag를 알고 있으면(목록 캐시 등) 속성 조회 요청을 생략
+    blob_client = client.get_blob_client(container, blob_name)
+    if etag is None:
+        etag = blob_client.get_blob_properties().etag
+    key = _cache_key(container, blob_name, etag)
+
+    paragraphs = _memory_get(key)
+    if paragraphs is not None:
+        _stats["memory_hit"] += 1
+        span.set(cache_hit="memory")
+        return list(paragraphs)
+
+    paragraphs = _disk_get(key)
+    if paragraphs is not None:
+        _stats["disk_hit"] += 1
+        span.set(cache_hit="disk")
+        _memory_put(key, paragraphs)
+        return list(paragraphs)
+
+    # 캐시 미스: 조회한 ETag와 동일한 버전만 다운로드
+    _stats["miss"] += 1
+    span.set(cache_hit=False)
+    buffer = io.BytesIO()
+    try:
+        # 임시 파일 없이 다운로드 스트림을 메모리 버퍼로 바로 받음 (zip은 끝부분 목차가 필요해 seek 가능해야 함)
+        with tracing.span("blob.download", blob=blob_name) as download:
+            blob_client.download_blob(etag=etag, match_condition=MatchConditions.IfNotModified).readinto(buffer)
+            download.set(bytes=buffer.tell())
+    except ResourceModifiedError:
+        # 전달받은 etag가 오래된 경우: 최신 속성으로 다시 조회
+        return _get_paragraphs(client, container, blob_name, None, span)
+    buffer.seek(0)
+    with tracing.span("docx.parse", bytes=buffer.getbuffer().nbytes):
+        paragraphs = extract_paragraphs(buffer)
+    _memory_put(key, paragraphs)
+    try:
+        _disk_put(key, container, blob_name, etag, paragraphs)
+    except OSError:
+        pass  # 디스크 캐시 실패는 분석에 영향 없음
+    return list(paragraphs)
+
+def put_paragraphs(container: str, blob_name: str, etag: str, paragraphs):
+    # 다른 곳(예: 일괄 분석의 프로세스 풀)에서 추출한 결과를 캐시에 넣어 get_paragraphs가 다시 다운로드하지 않게 함
+    key = _cache_key(container, blob_name, etag)
+    paragraphs = tuple(paragraphs)
+    _memory_put(key, paragraphs)
+    try:
+        _disk_put(key, container, blob_name, etag, paragraphs)
+    except OSError:
+        pass
+
+def cache_stats() -> dict:
+    with _lock:
+        return dict(_stats, memory_items=len(_memory))
@@ -0,0 +1,152 @@
+import os
+import sys
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from azure.storage.blob import BlobServiceClient
+from Service.ingest import get_artifact
+from Service.retrieval import index_chunks
+from Service import tracing
+
+# 프로세스 공용 문서 저장소 (세션은 핸들만 보관)
+# - 같은 문서(컨테이너, blob 이름, ETag)를 여러 사용자가 열어도 본문/검색 인덱스는 한 벌만 메모리에 둠
+# - 핸들을 가진 세션(holder)별로 마지막 사용 시각을 기록 → 최근 LEASE_TTL 안에 사용한 holder 수가 참조 수
+#   (Streamlit은 세션 종료를 알려주지 않으므로, 일정 시간 쓰지 않은 holder는 놓은 것으로 간주)
+# - 참조가 없는 항목은 전체 크기가 DOC_STORE_MAX_MB를 넘을 때 오래된 순으로 제거
+DOC_STORE_MAX_MB = float(os.getenv("DOC_STORE_MAX_MB", "256"))
+DOC_STORE_LEASE_TTL = int(os.getenv("DOC_STORE_LEASE_TTL", "1800"))   # 초
+
+_lock = threading.Lock()
+_entries = OrderedDict()   # key → _Entry (오래 안 쓴 순서)
+_loading = {}              # key → threading.Event (같은 항목을 동시에 두 번 만들지 않도록)
+_stats = {"hit": 0, "load": 0, "evicted": 0}
+
+
+class _Entry:
+    def __init__(self, value, size):
+        self.value = value
+        self.size = size
+        self.holders = {}
+
+    def live_holders(self, now):
+        return sum(now - seen < DOC_STORE_LEASE_TTL for seen in self.holders.values())
+
+
+def _approx_size(value, depth=0) -> int:
+    # 문자열/컨테이너를 따라가며 대략적인 메모리 크기 (bytes)
+    size = sys.getsizeof(value)
+    if depth > 4:
+        return size
+    if isinstance(value, dict):
+        size += sum(_approx_size(k, depth + 1) + _approx_size(v, depth + 1) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(_approx_size(v, depth + 1) for v in value)
+    return size
+
+def _evict_locked(now):
+    limit = DOC_STORE_MAX_MB * 1024 * 1024
+    total = sum(entry.size for entry in _entries.values())
+    for key in list(_entries):
+        if total <= limit:
+            break
+        entry = _entries[key]
+        entry.holders = {h: seen for h, seen in entry.holders.items() if now - seen < DOC_STORE_LEASE_TTL}
+        if entry.holders:
+            continue  # 사용 중인 문서는 한도를 넘어도 유지
+        del _entries[key]
+        total -= entry.size
+        _stats["evicted"] += 1
+
+def acquire(key, loader, holder: str):
+    # loader() → 값. 이미 있으면 재사용하고 holder를 참조에 추가
+    while True:
+        with _lock:
+            entry = _entries.get(key)
+            if entry is not None:
+                entry.holders[holder] = time.time()
+                _entries.move_to_end(key)
+                _stats["hit"] += 1
+                return key
+            event = _loading.get(key)
+            if event is None:
+                event = _loading[key] = threading.Event()
+                break
+        event.wait()  # 다른 세션이 만드는 중이면 끝날 때까지 기다렸다가 재사용
+    try:
+        with tracing.span("doc_store.load", kind=key[0]) as span:
+            value = loader()
+            size = _approx_size(value)
+            span.set(bytes=size)
+        with _lock:
+            entry = _entries[key] = _Entry(value, size)
+            entry.holders[holder] = time.time()
+            _stats["load"] += 1
+            _evict_locked(time.time())
+    finally:
+        with _lock:
+            _loading.pop(key, None)
+        event.set()
+    return key
+
+def get(key, holder: str = None):
+    # 제거된 항목이면 None (호출 측에서 다시 acquire)
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            return None
+        if holder is not None:
+            entry.holders[holder] = time.time()
+        _entries.move_to_end(key)
+        return entry.value
+
+def release(key, holder: str):
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None:
+            entry.holders.pop(holder, None)
+            _evict_locked(time.time())
+
+def stats() -> dict:
+    now = time.time()
+    with _lock:
+        return dict(_stats, entries=len(_entries),
+                    referenced=sum(entry.live_holders(now) > 0 for entry in _entries.values()),
+                    mb=round(sum(entry.size for entry in _entries.values()) / 1024 / 1024, 1))
+
+
+# ---------------- 문서 / 텍스트 핸들 ----------------
+
+def acquire_document(client: BlobServiceClient, container: str, blob_name: str, etag: str, holder: str,
+                     artifact: dict = None) -> tuple:
+    # 핸들 = (종류, 컨테이너, blob 이름, ETag) → 제거된 뒤에도 핸들만으로 다시 불러올 수 있음
+    # artifact를 이미 불러왔으면 넘겨서 다시 조회하지 않음
+    key = ("doc", container, blob_name, etag)
+    def load():
+        nonlocal artifact
+        if artifact is None:
+            artifact = get_artifact(client, container, blob_name, etag)
+        return {
+            "name": blob_name,
+            "etag": etag,
+            "text_length": sum(len(p) for p in artifact["paragraphs"]),
+            "index": index_chunks(artifact["retrieval_chunks"]),
+        }
+    return acquire(key, load, holder)
+
+def get_document(client: BlobServiceClient, handle: tuple, holder: str) -> dict:
+    value = get(handle, holder)
+    if value is None:
+        _, container, blob_name, etag = handle
+        acquire_document(client, container, blob_name, etag, holder)
+        value = get(handle, holder)
+    return value
+
+def acquire_text(text: str, holder: str) -> tuple:
+    # 외부 검색 결과처럼 여러 세션이 같은 내용을 가질 수 있는 텍스트 (내용 해시로 중복 제거)
+    key = ("text", hashlib.sha256(text.encode("utf-8")).hexdigest())
+    return acquire(key, lambda: text, holder)
+
+def get_text(handle: tuple, holder: str) -> str:
+    # 참조가 끊겨 제거된 텍스트는 다시 만들 수 없으므로 None
+    return get(handle, holder)
@@ -0,0 +1,86 @@
+import io
+import zipfile
+from xml.etree.ElementTree import iterparse
+
+# python-docx 객체 트리를 만들지 않고 word/document.xml을 순차적으로 읽어
+# 본문 단락과 표의 행을 문서 순서대로 꺼내는 추출기
+EXTRACTOR_VERSION = 2   # 추출 결과 형식이 바뀌면 올림 (캐시 키에 포함)
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+P, TBL, TR, TC, T = _W + "p", _W + "tbl", _W + "tr", _W + "tc", _W + "t"
+TAB, BR, CR, BODY = _W + "tab", _W + "br", _W + "cr", _W + "body"
+CELL_SEPARATOR = " | "
+
+
+def _paragraph_text(p):
+    parts = []
+    for node in p.iter():
+        if node.tag == T:
+            parts.append(node.text or "")
+        elif node.tag == TAB:
+            parts.append("\t")
+        elif node.tag in (BR, CR):
+            parts.append("\n")
+    return "".join(parts)
+
+def iter_blocks(source):
+    # source: 파일 경로 또는 seek 가능한 파일 객체 (BytesIO 등)
+    # ("paragraph", 텍스트) / ("table_row", [셀 텍스트...]) 를 문서 순서대로 반환
+    with zipfile.ZipFile(source) as zf, zf.open("word/document.xml") as xml:
+        body = None
+        p_depth = 0      # 중첩 단락(텍스트 상자 등) 구분
+        tbl_depth = 0    # 중첩 표 구분
+        row_cells = None
+        cell_parts = None
+
+        for event, elem in iterparse(xml, events=("start", "end")):
+            tag = elem.tag
+            if event == "start":
+                if tag == BODY:
+                    body = elem
+                elif tag == P:
+                    p_depth += 1
+                elif tag == TBL:
+                    tbl_depth += 1
+                elif tag == TR and tbl_depth == 1:
+                    row_cells = []
+                elif tag == TC and tbl_depth == 1:
+                    cell_parts = []
+                continue
+
+            if tag == P:
+                p_depth -= 1
+                if p_depth == 0:
+                    text = _paragraph_text(elem).strip()
+                    if tbl_depth == 0:
+                        if text:
+                            yield "paragraph", text
+                    elif cell_parts is not None and text:
+                        cell_parts.append(text)   # 중첩 표의 단락도 바깥 셀 텍스트로 합침
+            elif tag == TC and tbl_depth == 1:
+                row_cells.append(" ".join(cell_parts))
+                cell_parts = None
+            elif tag == TR and tbl_depth == 1:
+                if any(row_cells):
+                    yield "table_row", row_cells
+                row_cells = None
+            elif tag == TBL:
+                tbl_depth -= 1
+
+            # 본문 최상위 요소 처리가 끝나면 트리에서 제거해 메모리 사용량을 일정하게 유지
+            if body is not None and p_depth == 0 and tbl_depth == 0 and tag in (P, TBL):
+                body.clear()
+
+def extract_lines(source) -> list:
+    # 단락은 그대로, 표의 행은 "셀1 | 셀2 | ..." 한 줄로 변환
+    lines = []
+    for kind, value in iter_blocks(source):
+        if kind == "paragraph":
+            lines.append(value)
+        else:
+            lines.append(CELL_SEPARATOR.join(value))
+    return lines
+
+def extract_bytes(data: bytes) -> list:
+    # 프로세스 풀에서 호출하는 진입점 (bytes만 주고받도록 이 모듈 안에 둠 → 자식 프로세스 import 부담 최소화)
+    return extract_lines(io.BytesIO(data))
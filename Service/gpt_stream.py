@@ -0,0 +1,142 @@
+import time
+import streamlit as st
+from openai import AzureOpenAI
+from Service import completion_cache, rate_limiter, tracing
+from Service.token_budget import count_tokens, estimate_cost
+
+# 화면 갱신 최소 간격 (초) - 토큰마다 다시 그리면 웹소켓 메시지가 너무 많아짐
+RENDER_INTERVAL = 0.05
+
+
+def stream_completion(client: AzureOpenAI, deployment: str, messages: list, on_update=None, use_cache: bool = True,
+                      on_wait=None, **params) -> dict:
+    # stream=True로 호출해 토큰이 도착하는 대로 on_update(content, stats)를 호출한다
+    # 전송은 공용 스케줄러(rate_limiter)를 거치며, 대기 중에는 on_wait(순번, 대기열 길이, 예상 대기)를 호출한다
+    with tracing.span("openai.stream", deployment=deployment) as span:
+        result = _stream_completion(client, deployment, messages, on_update, use_cache, on_wait, params)
+        span.set(cache_hit=result["cached"], ttft_ms=round((result["ttft"] or 0) * 1000, 2))
+        if not result["cached"]:
+            span.set(**trace_usage(result["usage"]))
+        return result
+
+def trace_usage(usage) -> dict:
+    # span에 기록할 토큰/비용 속성
+    if not usage:
+        return {}
+    return {
+        "prompt_tokens": usage["prompt_tokens"],
+        "completion_tokens": usage["completion_tokens"],
+        "total_tokens": usage["total_tokens"],
+        "cost_usd": round(estimate_cost(usage["prompt_tokens"], usage["completion_tokens"]), 5),
+    }
+
+def _stream_completion(client, deployment, messages, on_update, use_cache, on_wait, params):
+    start = time.perf_counter()
+    key = completion_cache.make_key(deployment, messages, params)
+    if use_cache:
+        cached = completion_cache.get(key)
+        if cached is not None:
+            result = dict(cached, ttft=0.0, elapsed=time.perf_counter() - start, tokens_per_sec=0.0, done=True, cached=True)
+            if on_update:
+                on_update(result["content"], result)
+            return result
+
+    stream, reserved = rate_limiter.call(
+        # include_usage: 스트림 마지막에 usage 청크를 받음 (api_version 2024-09-01-preview 이상)
+        lambda: client.chat.completions.create(model=deployment, messages=messages, stream=True,
+                                               stream_options={"include_usage": True}, **params),
+        messages, params.get("max_tokens"), on_wait=on_wait)
+    queue_wait = time.perf_counter() - start
+
+    parts = []
+    usage = None
+    tokens = 0
+    first_token_at = None
+    last_render = 0.0
+    try:
+        for chunk in stream:
+            if getattr(chunk, "usage", None):
+                usage = _usage_dict(chunk.usage)
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            now = time.perf_counter()
+            if first_token_at is None:
+                first_token_at = now
+            parts.append(delta)
+            tokens += 1  # 스트림 청크 하나 ≒ 토큰 하나
+            if on_update and now - last_render >= RENDER_INTERVAL:
+                on_update("".join(parts), _stats(start, first_token_at, now, tokens))
+                last_render = now
+    finally:
+        # 중간에 끊겨도(네트워크 오류, 작업 취소) 받은 만큼으로 예약을 정산하고 연결을 닫음
+        if usage is None:
+            usage = _estimate_usage(messages, "".join(parts))
+        rate_limiter.scheduler.settle(reserved, usage["total_tokens"])
+        close = getattr(stream, "close", None)
+        if close:
+            close()
+
+    end = time.perf_counter()
+    content = "".join(parts)
+    result = _stats(start, first_token_at, end, tokens)
+    result.update(content=content, usage=usage, done=True, cached=False, queue_wait=queue_wait)
+    if result["content"]:
+        completion_cache.put(key, {"content": result["content"], "usage": usage, "tokens": tokens})
+    if on_update:
+        on_update(result["content"], result)
+    return result
+
+def _estimate_usage(messages, content):
+    # usage 청크를 주지 않는 배포/버전이면 토큰 수를 추정 (estimated=True로 표시)
+    prompt_tokens = sum(count_tokens(m["content"]) + 4 for m in messages)
+    completion_tokens = count_tokens(content)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "estimated": True,
+    }
+
+def _usage_dict(usage):
+    return {
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "total_tokens": usage.total_tokens,
+    }
+
+def _stats(start, first_token_at, now, tokens):
+    ttft = (first_token_at - start) if first_token_at else None
+    generating = (now - first_token_at) if first_token_at else 0.0
+    return {
+        "ttft": ttft,
+        "elapsed": now - start,
+        "tokens": tokens,
+        "tokens_per_sec": tokens / generating if generating > 0 else 0.0,
+    }
+
+def format_stats(stats: dict) -> str:
+    if stats.get("cached"):
+        return f"💾 캐시된 응답 ({stats['tokens']} tokens, 호출 비용 없음)"
+    if stats.get("ttft") is None:
+        return f"⏳ 첫 토큰 대기 중... ({stats['elapsed']:.1f}초)"
+    return (f"⚡ 첫 토큰 {stats['ttft']:.2f}초 · {stats['tokens']} tokens · "
+            f"{stats['tokens_per_sec']:.1f} tok/s · 경과 {stats['elapsed']:.1f}초")
+
+def queue_writer(status):
+    # OpenAI 스케줄러 대기 상태를 상태 표시줄에 표시하는 콜백
+    def on_wait(position, depth, wait):
+        if position == 0 and wait:
+            status.caption(f"🚦 OpenAI 할당량 대기 중... 약 {wait:.1f}초 후 전송 (대기열 {depth}건)")
+        else:
+            status.caption(f"🚦 OpenAI 대기열 {position + 1}번째 / 전체 {depth}건")
+    return on_wait
+
+def streamlit_writer(body, status):
+    # st.empty() 두 개(본문, 상태 표시줄)에 스트리밍 결과를 그리는 콜백
+    def on_update(content, stats):
+        body.markdown(content if stats.get("done") else content + " ▌")
+        status.caption(format_stats(stats))
+    return on_update
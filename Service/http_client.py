@@ -0,0 +1,99 @@
+import os
+import time
+import random
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from Service import tracing
+
+# 외부 HTTP 호출(Azure Search, LangSearch 등)용 공유 클라이언트
+# - 프로세스 전체에서 연결을 재사용 (Streamlit rerun과 무관하게 keep-alive 유지)
+# - 엔드포인트별 (연결, 읽기) 제한 시간
+# - 429/5xx/연결 오류 시 지터를 준 지수 백오프로 제한 횟수만큼 재시도 (Retry-After 우선)
+# - httpx + h2가 설치되어 있으면 HTTP/2 사용
+ENDPOINT_TIMEOUTS = {
+    "azure_search": (3.05, float(os.getenv("AZURE_SEARCH_TIMEOUT", "10"))),
+    "langsearch": (3.05, float(os.getenv("LANGSEARCH_TIMEOUT", "15"))),
+}
+DEFAULT_TIMEOUT = (3.05, 30.0)
+MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+POOL_MAXSIZE = 20
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+_lock = threading.Lock()
+_client = None
+
+try:
+    import httpx
+    import h2  # noqa: F401  (HTTP/2 지원 여부 확인용)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# 재시도 후에도 남는 연결/타임아웃 예외 (호출하는 쪽에서 서비스별 오류로 바꿀 때 사용)
+TRANSPORT_ERRORS = (httpx.TransportError,) if HTTP2_AVAILABLE else (requests.ConnectionError, requests.Timeout)
+
+
+def _get_client():
+    global _client
+    with _lock:
+        if _client is None:
+            if HTTP2_AVAILABLE:
+                _client = httpx.Client(http2=True, limits=httpx.Limits(max_connections=POOL_MAXSIZE,
+                                                                       max_keepalive_connections=POOL_MAXSIZE))
+            else:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=10, pool_maxsize=POOL_MAXSIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _client = session
+        return _client
+
+def _send(method, url, timeout, **kwargs):
+    client = _get_client()
+    if HTTP2_AVAILABLE:
+        connect, read = timeout
+        return client.request(method, url, timeout=httpx.Timeout(read, connect=connect), **kwargs)
+    return client.request(method, url, timeout=timeout, **kwargs)
+
+def _backoff(attempt, response=None):
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return min(float(retry_after), BACKOFF_MAX)
+            except ValueError:
+                pass
+    # full jitter: 0 ~ min(최대, 기본 * 2^시도)
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+def request(method: str, endpoint: str, url: str, **kwargs):
+    with tracing.span(f"http.{endpoint}", method=method) as span:
+        response = _request(method, endpoint, url, span, **kwargs)
+        span.set(status_code=response.status_code, bytes=len(getattr(response, "content", b"") or b""))
+        return response
+
+def _request(method, endpoint, url, span, **kwargs):
+    timeout = ENDPOINT_TIMEOUTS.get(endpoint, DEFAULT_TIMEOUT)
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            response = _send(method, url, timeout, **kwargs)
+        except TRANSPORT_ERRORS:
+            if attempt == MAX_RETRIES:
+                raise
+            span.add("retries")
+            time.sleep(_backoff(attempt))
+            continue
+        if response.status_code in RETRY_STATUS and attempt < MAX_RETRIES:
+            span.add("retries")
+            time.sleep(_backoff(attempt, response))
+            continue
+        return response
+
+def post(endpoint: str, url: str, **kwargs):
+    return request("POST", endpoint, url, **kwargs)
+
+def get(endpoint: str, url: str, **kwargs):
+    return request("GET", endpoint, url, **kwargs)
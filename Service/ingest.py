@@ -0,0 +1,123 @@
+import json
+import gzip
+import threading
+from collections import OrderedDict
+from azure.core.exceptions import ResourceNotFoundError
+from azure.storage.blob import BlobServiceClient
+from azure.ai.textanalytics import TextAnalyticsClient
+from Service.doc_cache import get_paragraphs, extract_paragraphs
+from Service.chunker import chunk_paragraphs, LANGUAGE_MAX_ELEMENTS
+from Service.text_utils import clean_text
+from Service.language_batch import analyze_chunks
+from Service import retrieval, sidecar, tracing, versions
+
+# 업로드 시점 사전 처리 결과를 sidecar 컨테이너의 artifacts/ 아래에 저장 (원본 컨테이너와 분리)
+# 형식이 바뀌면 ARTIFACT_VERSION을 올려 이전 버전 결과는 자동으로 다시 생성
+ARTIFACT_PREFIX = "artifacts/"
+ARTIFACT_VERSION = 4
+LANGUAGE_CHUNK_CHARS = 4000   # Language 서비스 5120 요소 제한 고려 (긴 단락은 문장 단위로 나눔)
+MEMORY_MAX_ITEMS = 8
+
+_memory = OrderedDict()
+_lock = threading.Lock()
+
+
+def artifact_name(blob_name: str) -> str:
+    return f"{ARTIFACT_PREFIX}{blob_name}.v{ARTIFACT_VERSION}.json.gz"
+
+def build_artifact(blob_name: str, etag: str, paragraphs: list, language_client: TextAnalyticsClient = None) -> dict:
+    with tracing.span("artifact.chunk", paragraphs=len(paragraphs)):
+        # 내용 기준 경계 → 개정본에서 바뀌지 않은 청크는 Language 결과 캐시를 그대로 사용
+        language_chunks = chunk_paragraphs(paragraphs, LANGUAGE_CHUNK_CHARS, max_chars=LANGUAGE_MAX_ELEMENTS,
+                                           content_defined=True)
+        retrieval_chunks = retrieval.split_chunks(paragraphs)
+    key_phrases = None
+    if language_client is not None:
+        results = analyze_chunks(language_client, [clean_text(c) for c in language_chunks], tasks=("key_phrases",))
+        # 일부 청크 실패 시 key_phrases는 저장하지 않음 (분석 시점에 다시 요청)
+        if not any(r["errors"] for r in results):
+            key_phrases = [r["key_phrases"] for r in results]
+    return {
+        "version": ARTIFACT_VERSION,
+        "source": blob_name,
+        "source_etag": etag,
+        "paragraphs": list(paragraphs),
+        "language_chunks": language_chunks,
+        "retrieval_chunks": retrieval_chunks,
+        "key_phrases": key_phrases,
+    }
+
+def save_artifact(client: BlobServiceClient, container: str, artifact: dict):
+    data = gzip.compress(json.dumps(artifact, ensure_ascii=False).encode("utf-8"))
+    with tracing.span("artifact.save", blob=artifact["source"], bytes=len(data)):
+        sidecar.blob_client(client, container, artifact_name(artifact["source"])).upload_blob(
+            data, overwrite=True, metadata={"source_etag": artifact["source_etag"]})
+    _remember(container, artifact)
+
+def load_artifact(client: BlobServiceClient, container: str, blob_name: str, etag: str):
+    # 원본 etag와 일치하는 최신 버전 artifact만 반환
+    with _lock:
+        artifact = _memory.get((container, blob_name, etag))
+        if artifact is not None:
+            _memory.move_to_end((container, blob_name, etag))
+            return artifact
+    with tracing.span("artifact.load", blob=blob_name) as span:
+        try:
+            raw = sidecar.blob_client(client, container, artifact_name(blob_name)).download_blob().readall()
+        except ResourceNotFoundError:
+            span.set(cache_hit=False)
+            return None
+        artifact = json.loads(gzip.decompress(raw).decode("utf-8"))
+        valid = artifact.get("version") == ARTIFACT_VERSION and artifact.get("source_etag") == etag
+        span.set(bytes=len(raw), cache_hit=valid)
+    if not valid:
+        return None
+    _remember(container, artifact)
+    return artifact
+
+def _remember(container, artifact):
+    key = (container, artifact["source"], artifact["source_etag"])
+    with _lock:
+        _memory[key] = artifact
+        _memory.move_to_end(key)
+        while len(_memory) > MEMORY_MAX_ITEMS:
+            _memory.popitem(last=False)
+
+def ingest(client: BlobServiceClient, container: str, blob_name: str, etag: str,
+           language_client: TextAnalyticsClient = None, data: bytes = None) -> dict:
+    with tracing.span("ingest", blob=blob_name):
+        return _ingest(client, container, blob_name, etag, language_client, data)
+
+def _ingest(client, container, blob_name, etag, language_client, data):
+    # 업로드 직후에는 이미 메모리에 있는 bytes를 그대로 사용 (다시 다운로드하지 않음)
+    if data is not None:
+        with tracing.span("docx.parse", bytes=len(data)):
+            paragraphs = extract_paragraphs(data)
+    else:
+        paragraphs = get_paragraphs(client, container, blob_name, etag=etag)
+    # 같은 이름의 이전 버전과 단락 비교 기록 (변경 분석/변경 통계용)
+    versions.record_version(client, container, blob_name, etag, paragraphs)
+    artifact = build_artifact(blob_name, etag, paragraphs, language_client)
+    save_artifact(client, container, artifact)
+    return artifact
+
+def get_artifact(client: BlobServiceClient, container: str, blob_name: str, etag: str,
+                 language_client: TextAnalyticsClient = None) -> dict:
+    # 업로드 시 만들어진 artifact를 우선 사용, 없으면(앱 밖에서 올린 파일 등) 지금 생성
+    if etag is not None:
+        artifact = load_artifact(client, container, blob_name, etag)
+        if artifact is not None:
+            return artifact
+    # 목록 캐시의 etag가 오래됐을 수 있으므로 생성 전에 실제 etag 확인
+    actual_etag = client.get_blob_client(container, blob_name).get_blob_properties().etag
+    if actual_etag != etag:
+        artifact = load_artifact(client, container, blob_name, actual_etag)
+        if artifact is not None:
+            return artifact
+    return ingest(client, container, blob_name, actual_etag, language_client)
+
+def delete_artifact(client: BlobServiceClient, container: str, blob_name: str):
+    try:
+        sidecar.blob_client(client, container, artifact_name(blob_name)).delete_blob()
+    except ResourceNotFoundError:
+        pass
@@ -0,0 +1,226 @@
+import os
+import json
+import gzip
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from Service import tracing
+
+# 백그라운드 작업 실행기 (Streamlit rerun과 무관하게 분석을 이어서 실행)
+# - 프로세스 공용 작업 풀(JOB_MAX_WORKERS)에서 실행, 넘치는 작업은 queued 상태로 대기
+# - 작업은 id로 조회하며 진행 상황(progress)과 스트리밍 중간 결과(partial)를 남김
+# - 같은 key(문서 + 요청 내용)의 작업이 진행 중이거나 최근에 끝났으면 새로 만들지 않고 그 작업을 돌려줌
+# - 끝난 작업의 결과는 .cache/jobs 에 저장 → 프로세스 재시작 후에도 id로 다시 조회 가능
+#   (JOB_DISK_TTL이 지났거나 JOB_DISK_MAX_FILES를 넘는 오래된 파일은 시작 시/저장할 때마다 삭제)
+JOB_MAX_WORKERS = int(os.getenv("JOB_MAX_WORKERS", "4"))
+JOB_TTL = int(os.getenv("JOB_TTL", "3600"))   # 끝난 작업을 메모리/key 재사용 대상으로 유지하는 시간 (초)
+JOB_DISK_TTL = int(os.getenv("JOB_DISK_TTL", str(7 * 24 * 3600)))   # 저장된 결과 파일 보관 기간 (초)
+JOB_DISK_MAX_FILES = int(os.getenv("JOB_DISK_MAX_FILES", "500"))
+JOB_DIR = os.getenv("JOB_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "jobs"))
+
+QUEUED, RUNNING, DONE, ERROR, CANCELLED = "queued", "running", "done", "error", "cancelled"
+FINISHED = (DONE, ERROR, CANCELLED)
+
+_lock = threading.Lock()
+_jobs = {}
+_by_key = {}
+_executor = ThreadPoolExecutor(max_workers=JOB_MAX_WORKERS, thread_name_prefix="job")
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, kind, key):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.key = key
+        self.status = QUEUED
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.progress = {}
+        self.data = {}
+        self.partial = ""
+        self.stats = {}
+        self.result = None
+        self.error = None
+        self.cancel_requested = False
+        self._lock = threading.Lock()
+
+    def _check(self):
+        if self.cancel_requested:
+            raise JobCancelled("사용자가 작업을 중지했습니다.")
+
+    def check(self):
+        # 긴 단계 중간에 호출 → 사용자가 중지했으면 JobCancelled
+        self._check()
+
+    def publish(self, **values):
+        # 단계별 중간 결과 (예: Language 분석 결과) → 작업이 끝나기 전에도 화면에 먼저 표시 가능
+        with self._lock:
+            self.data = dict(self.data, **values)
+        self._check()
+
+    def set_progress(self, stage, done=None, total=None, message=None):
+        with self._lock:
+            self.progress = {"stage": stage, "done": done, "total": total, "message": message}
+        self._check()
+
+    def stream_writer(self):
+        # stream_completion의 on_update 콜백: 중간 결과를 작업에 기록
+        def on_update(content, stats):
+            with self._lock:
+                self.partial = content
+                self.stats = dict(stats)
+            self._check()
+        return on_update
+
+    def wait_writer(self):
+        # stream_completion의 on_wait 콜백: OpenAI 스케줄러 대기 상태 기록
+        def on_wait(position, depth, wait):
+            if position == 0 and wait:
+                message = f"🚦 OpenAI 할당량 대기 중... 약 {wait:.1f}초 후 전송 (대기열 {depth}건)"
+            else:
+                message = f"🚦 OpenAI 대기열 {position + 1}번째 / 전체 {depth}건"
+            with self._lock:
+                self.progress = dict(self.progress, message=message)
+            self._check()
+        return on_wait
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "created": self.created,
+                "started": self.started,
+                "finished": self.finished,
+                "progress": dict(self.progress),
+                "data": dict(self.data),
+                "partial": self.partial,
+                "stats": dict(self.stats),
+                "result": self.result,
+                "error": self.error,
+            }
+
+
+def _path(job_id):
+    return os.path.join(JOB_DIR, f"{job_id}.json.gz")
+
+def _persist(job):
+    try:
+        os.makedirs(JOB_DIR, exist_ok=True)
+        snapshot = dict(job.snapshot(), partial="")
+        tmp_path = f"{_path(job.id)}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, _path(job.id))
+    except OSError:
+        pass  # 저장 실패해도 메모리의 결과는 그대로 사용
+    _cleanup_disk()
+
+def _cleanup_disk():
+    # 보관 기간이 지난 결과 파일과, 개수 한도를 넘는 오래된 파일 삭제 (남은 임시 파일 포함)
+    now = time.time()
+    try:
+        entries = [entry for entry in os.scandir(JOB_DIR) if entry.is_file()]
+    except OSError:
+        return
+    files = []
+    for entry in entries:
+        try:
+            files.append((entry.stat().st_mtime, entry.path))
+        except OSError:
+            continue
+    files.sort(reverse=True)
+    for index, (mtime, path) in enumerate(files):
+        if now - mtime > JOB_DISK_TTL or index >= JOB_DISK_MAX_FILES:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+def _run(job, func):
+    with job._lock:
+        cancelled = job.cancel_requested
+        if cancelled:
+            job.status, job.finished = CANCELLED, time.time()
+        else:
+            job.status, job.started = RUNNING, time.time()
+    if cancelled:
+        _persist(job)
+        return
+    try:
+        with tracing.span(f"job.{job.kind}", job_id=job.id):
+            result = func(job)
+        status, error = DONE, None
+    except JobCancelled as e:
+        result, status, error = None, CANCELLED, str(e)
+    except Exception as e:
+        result, status, error = None, ERROR, f"{type(e).__name__}: {e}"
+    with job._lock:
+        job.result, job.status, job.error, job.finished = result, status, error, time.time()
+    _persist(job)
+
+def _evict(now):
+    for job_id, job in list(_jobs.items()):
+        if job.status in FINISHED and now - job.finished > JOB_TTL:
+            del _jobs[job_id]
+            if _by_key.get(job.key) == job_id:
+                del _by_key[job.key]
+
+def submit(kind: str, func, key=None, force: bool = False) -> str:
+    # func(job) → JSON으로 저장 가능한 결과 (job.publish로 남긴 중간 결과도 함께 저장). 반환값은 작업 id
+    # force=False이면 같은 key의 진행 중/최근 완료(오류·중지 제외) 작업 id를 재사용
+    with _lock:
+        _evict(time.time())
+        if key is not None and not force:
+            existing = _jobs.get(_by_key.get(key))
+            if existing and existing.status not in (ERROR, CANCELLED):
+                return existing.id
+        job = Job(kind, key)
+        _jobs[job.id] = job
+        if key is not None:
+            _by_key[key] = job.id
+    _executor.submit(tracing.wrap(_run), job, func)
+    return job.id
+
+def get(job_id: str):
+    # 진행 중인 작업은 메모리에서, 오래전에 끝난 작업은 저장된 결과에서 조회 (없으면 None)
+    if not job_id:
+        return None
+    with _lock:
+        job = _jobs.get(job_id)
+    if job is not None:
+        return job.snapshot()
+    try:
+        with gzip.open(_path(job_id), "rt", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def cancel(job_id: str):
+    # 실행 중인 작업은 다음 진행 보고 시점에 중지됨
+    with _lock:
+        job = _jobs.get(job_id)
+    if job is not None and job.status not in FINISHED:
+        job.cancel_requested = True
+
+def queue_position(job_id: str) -> int:
+    with _lock:
+        queued = sorted((j for j in _jobs.values() if j.status == QUEUED), key=lambda j: j.created)
+    return next((i for i, j in enumerate(queued) if j.id == job_id), -1)
+
+def active_count() -> dict:
+    with _lock:
+        return {
+            "running": sum(j.status == RUNNING for j in _jobs.values()),
+            "queued": sum(j.status == QUEUED for j in _jobs.values()),
+        }
+
+
+_cleanup_disk()  # 작업 풀 시작 시 이전 실행에서 남은 오래된 결과 파일 정리
@@ -0,0 +1,96 @@
+import os
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from azure.ai.textanalytics import TextAnalyticsClient
+from Service import completion_cache, tracing
+
+# Language 서비스 요청당 문서 수 제한 (동기 API 10건, 분석 작업(LRO) 25건)
+KEY_PHRASE_BATCH_SIZE = 10
+SUMMARY_BATCH_SIZE = 25
+MAX_CONCURRENCY = int(os.getenv("LANGUAGE_MAX_CONCURRENCY", "4"))
+# 청크 본문 해시별 결과 캐시 (completion_cache 저장소 공용) → 문서가 일부만 바뀌면 바뀐 청크만 다시 요청
+RESULT_CACHE = os.getenv("LANGUAGE_RESULT_CACHE", "1") != "0"
+
+
+def _batches(indexes, size):
+    for start in range(0, len(indexes), size):
+        yield indexes[start:start + size]
+
+def _documents(texts, batch):
+    return [{"id": str(i), "text": texts[i]} for i in batch]
+
+def _extract_key_phrases(client, texts, batch, max_sentence_count):
+    with tracing.span("language.key_phrases", documents=len(batch), chars=sum(len(texts[i]) for i in batch)):
+        return client.extract_key_phrases(_documents(texts, batch))
+
+def _extract_summary(client, texts, batch, max_sentence_count):
+    with tracing.span("language.summary", documents=len(batch), chars=sum(len(texts[i]) for i in batch)):
+        poller = client.begin_extract_summary(_documents(texts, batch), max_sentence_count=max_sentence_count)
+        return list(poller.result())
+
+def _cache_key(kind, text, max_sentence_count):
+    params = {"max_sentence_count": max_sentence_count} if kind == "sentences" else {}
+    payload = json.dumps({"language": kind, "text": text, "params": params}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _cached(results, texts, kind, max_sentence_count):
+    # 캐시에 있는 청크는 결과를 채우고, 요청해야 할 청크 위치만 돌려준다
+    missing = []
+    for i, text in enumerate(texts):
+        cached = completion_cache.get(_cache_key(kind, text, max_sentence_count), track=False)
+        if cached is None:
+            missing.append(i)
+        else:
+            results[i][kind] = cached["value"]
+    return missing
+
+def analyze_chunks(client: TextAnalyticsClient, texts: list, max_concurrency: int = None, max_sentence_count: int = 8,
+                   tasks: tuple = ("key_phrases", "sentences"), use_cache: bool = True) -> list:
+    # 청크들을 요청 단위로 묶어 키워드/요약 작업을 동시에 실행하고, 결과는 청크 순서대로 돌려준다
+    results = [{"key_phrases": [], "sentences": [], "errors": []} for _ in texts]
+    indexes = list(range(len(texts)))
+    use_cache = use_cache and RESULT_CACHE   # False이면 캐시를 읽지 않고 새 결과로 갱신
+
+    jobs = []
+    cache_hits = 0
+    for kind, func, size in (("key_phrases", _extract_key_phrases, KEY_PHRASE_BATCH_SIZE),
+                             ("sentences", _extract_summary, SUMMARY_BATCH_SIZE)):
+        if kind not in tasks:
+            continue
+        pending = _cached(results, texts, kind, max_sentence_count) if use_cache else indexes
+        cache_hits += len(indexes) - len(pending)
+        jobs += [(kind, func, batch) for batch in _batches(pending, size)]
+    if cache_hits:
+        tracing.current().add("language_cache_hits", cache_hits)
+    if not jobs:
+        return results
+
+    workers = max(1, min(max_concurrency or MAX_CONCURRENCY, len(jobs)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(tracing.wrap(func), client, texts, batch, max_sentence_count): (kind, batch)
+            for kind, func, batch in jobs
+        }
+        for future in as_completed(futures):
+            kind, batch = futures[future]
+            try:
+                docs = future.result()
+            except Exception as e:
+                for i in batch:
+                    results[i]["errors"].append(f"{kind}: {e}")
+                continue
+
+            # 응답 문서 id로 원래 청크 위치를 찾는다
+            for doc in docs:
+                i = int(doc.id)
+                if doc.is_error:
+                    results[i]["errors"].append(f"{kind}: {doc.error.message}")
+                else:
+                    if kind == "key_phrases":
+                        results[i]["key_phrases"] = list(doc.key_phrases)
+                    else:
+                        results[i]["sentences"] = [sentence.text for sentence in doc.sentences]
+                    if RESULT_CACHE:
+                        completion_cache.put(_cache_key(kind, texts[i], max_sentence_count), {"value": results[i][kind]})
+    return results
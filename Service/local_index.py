@@ -0,0 +1,343 @@
+import os
+import re
+import json
+import math
+import mmap
+import time
+import struct
+import threading
+from collections import Counter, defaultdict
+from azure.storage.blob import BlobServiceClient
+from Service import blob_inventory, tracing
+from Service.ingest import load_artifact
+from Service.retrieval import tokenize, BM25_K1, BM25_B
+
+# word-data 컨테이너 전체 .docx에 대한 로컬 역색인 (Azure Search 인덱서 주기와 무관하게 즉시 검색)
+# - 검색 단위: 문서의 retrieval 청크, 토큰화는 retrieval.tokenize (한글 음절 bigram)
+# - 세그먼트 단위로 추가만 하고(불변), 삭제/교체는 tombstone으로 표시 → 업로드/삭제 시 해당 문서만 반영
+# - 세그먼트 파일
+#     seg_N.terms.json : {단어: [postings 시작 위치, 개수]}
+#     seg_N.post       : (청크 번호 uint32, 빈도 uint16) 배열, mmap으로 필요한 구간만 읽음
+#     seg_N.units.json : 문서 목록과 청크별 (문서 번호, 본문 위치, 본문 길이, 단어 수)
+#     seg_N.text       : 청크 본문(UTF-8) 이어 붙인 파일, 스니펫용 mmap
+# - manifest.json 교체(os.replace)로 원자적으로 반영, 세그먼트가 많아지면 살아있는 문서만 모아 병합
+INDEX_DIR = os.getenv("LOCAL_INDEX_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "local_index"))
+MAX_SEGMENTS = int(os.getenv("LOCAL_INDEX_MAX_SEGMENTS", "8"))
+SYNC_INTERVAL = int(os.getenv("LOCAL_INDEX_SYNC_INTERVAL", str(blob_inventory.INVENTORY_TTL)))
+SNIPPET_CHARS = 160
+POSTING = struct.Struct("<IH")
+
+_WORD = re.compile(r"[가-힣]+|[a-zA-Z]+|\d+")
+
+_lock = threading.RLock()
+_sync_lock = threading.Lock()   # 동기화는 한 번에 하나만 (검색이 쓰는 _lock과 별개)
+_manifest = None
+_segments = {}
+_last_sync = {}
+_pending = {}   # 컨테이너 → 사전 분석(artifact) 전이라 색인하지 못한 문서 수
+_errors = {}    # 컨테이너 → 마지막 백그라운드 동기화 오류
+
+
+class _Segment:
+    def __init__(self, seg_id):
+        base = os.path.join(INDEX_DIR, f"seg_{seg_id:06d}")
+        with open(f"{base}.terms.json", encoding="utf-8") as f:
+            self.terms = json.load(f)
+        with open(f"{base}.units.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.docs = meta["docs"]
+        self.units = meta["units"]
+        self.total_length = sum(unit[3] for unit in self.units)
+        self._files = []
+        self.postings = self._map(f"{base}.post")
+        self.text = self._map(f"{base}.text")
+
+    def _map(self, path):
+        f = open(path, "rb")
+        self._files.append(f)
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def postings_for(self, term):
+        entry = self.terms.get(term)
+        if entry is None:
+            return ()
+        offset, count = entry
+        return POSTING.iter_unpack(self.postings[offset * POSTING.size:(offset + count) * POSTING.size])
+
+    def unit_text(self, unit_id):
+        _, offset, size, _ = self.units[unit_id]
+        return bytes(self.text[offset:offset + size]).decode("utf-8")
+
+    def close(self):
+        for data in (self.postings, self.text):
+            if isinstance(data, mmap.mmap):
+                data.close()
+        for f in self._files:
+            f.close()
+
+
+def _manifest_path():
+    return os.path.join(INDEX_DIR, "manifest.json")
+
+def _load():
+    global _manifest
+    if _manifest is None:
+        try:
+            with open(_manifest_path(), encoding="utf-8") as f:
+                _manifest = json.load(f)
+        except (OSError, ValueError):
+            _manifest = {"segments": [], "deleted": {}, "next_id": 1}
+        for seg_id in _manifest["segments"]:
+            _segments[seg_id] = _Segment(seg_id)
+    return _manifest
+
+def _save(manifest):
+    os.makedirs(INDEX_DIR, exist_ok=True)
+    tmp_path = f"{_manifest_path()}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, _manifest_path())
+
+def _write_segment(seg_id, documents):
+    # documents: [(blob 이름, etag, 청크 목록)]
+    base = os.path.join(INDEX_DIR, f"seg_{seg_id:06d}")
+    os.makedirs(INDEX_DIR, exist_ok=True)
+    docs, units = [], []
+    postings = defaultdict(list)
+    offset = 0
+    with open(f"{base}.text", "wb") as text_file:
+        for doc_id, (name, etag, chunks) in enumerate(documents):
+            docs.append({"name": name, "etag": etag})
+            for chunk in chunks:
+                unit_id = len(units)
+                data = chunk.encode("utf-8")
+                text_file.write(data)
+                freqs = Counter(tokenize(chunk))
+                units.append([doc_id, offset, len(data), sum(freqs.values())])
+                offset += len(data)
+                for term, freq in freqs.items():
+                    postings[term].append((unit_id, min(freq, 0xFFFF)))
+
+    terms = {}
+    position = 0
+    with open(f"{base}.post", "wb") as post_file:
+        for term in sorted(postings):
+            entries = postings[term]
+            post_file.write(b"".join(POSTING.pack(unit_id, freq) for unit_id, freq in entries))
+            terms[term] = [position, len(entries)]
+            position += len(entries)
+    with open(f"{base}.terms.json", "w", encoding="utf-8") as f:
+        json.dump(terms, f, ensure_ascii=False)
+    with open(f"{base}.units.json", "w", encoding="utf-8") as f:
+        json.dump({"docs": docs, "units": units}, f, ensure_ascii=False)
+
+def _remove_segment_files(seg_id):
+    segment = _segments.pop(seg_id, None)
+    if segment is not None:
+        segment.close()
+    for suffix in ("terms.json", "post", "units.json", "text"):
+        try:
+            os.remove(os.path.join(INDEX_DIR, f"seg_{seg_id:06d}.{suffix}"))
+        except OSError:
+            pass
+
+def _live_docs(manifest):
+    # {blob 이름: (세그먼트 번호, 문서 번호, etag)} (tombstone 제외)
+    live = {}
+    for seg_id in manifest["segments"]:
+        deleted = set(manifest["deleted"].get(str(seg_id), []))
+        for doc_id, doc in enumerate(_segments[seg_id].docs):
+            if doc_id not in deleted:
+                live[doc["name"]] = (seg_id, doc_id, doc["etag"])
+    return live
+
+def _tombstone(manifest, names):
+    live = _live_docs(manifest)
+    for name in names:
+        if name in live:
+            seg_id, doc_id, _ = live[name]
+            manifest["deleted"].setdefault(str(seg_id), []).append(doc_id)
+
+def _compact(manifest):
+    # 살아있는 문서만 모아 세그먼트 하나로 다시 작성
+    live = _live_docs(manifest)
+    units_by_doc = defaultdict(list)
+    for seg_id in manifest["segments"]:
+        for unit_id, unit in enumerate(_segments[seg_id].units):
+            units_by_doc[(seg_id, unit[0])].append(unit_id)
+    documents = []
+    for name, (seg_id, doc_id, etag) in live.items():
+        segment = _segments[seg_id]
+        documents.append((name, etag, [segment.unit_text(i) for i in units_by_doc[(seg_id, doc_id)]]))
+    old_segments = list(manifest["segments"])
+    seg_id = manifest["next_id"]
+    _write_segment(seg_id, documents)
+    manifest.update(segments=[seg_id], deleted={}, next_id=seg_id + 1)
+    _save(manifest)
+    _segments[seg_id] = _Segment(seg_id)
+    for old_id in old_segments:
+        _remove_segment_files(old_id)
+
+def add_documents(documents: list):
+    # documents: [(blob 이름, etag, 청크 목록)] → 새 세그먼트 1개로 추가, 같은 이름의 이전 버전은 tombstone
+    if not documents:
+        return
+    with _lock:
+        manifest = _load()
+        seg_id = manifest["next_id"]
+        _write_segment(seg_id, documents)
+        _tombstone(manifest, [name for name, _, _ in documents])
+        manifest["segments"].append(seg_id)
+        manifest["next_id"] = seg_id + 1
+        _segments[seg_id] = _Segment(seg_id)
+        _save(manifest)
+        if len(manifest["segments"]) > MAX_SEGMENTS:
+            _compact(manifest)
+
+def add_document(name: str, etag: str, chunks: list):
+    add_documents([(name, etag, chunks)])
+
+def remove_documents(names: list):
+    with _lock:
+        manifest = _load()
+        _tombstone(manifest, names)
+        _save(manifest)
+        # tombstone이 살아있는 문서보다 많아지면 병합해 공간 회수
+        if sum(len(v) for v in manifest["deleted"].values()) > len(_live_docs(manifest)):
+            _compact(manifest)
+
+def remove_document(name: str):
+    remove_documents([name])
+
+def sync(client: BlobServiceClient, container: str, force: bool = False) -> dict:
+    # 컨테이너 목록과 비교해 새로 생기거나 바뀐 문서는 추가, 사라진 문서는 삭제 (SYNC_INTERVAL 주기)
+    # 목록/artifact 조회(네트워크)는 _lock 밖에서 하고 세그먼트 반영만 _lock 안에서 → 그동안에도 검색 가능
+    if not _sync_lock.acquire(blocking=False):
+        return {"added": 0, "removed": 0, "pending": _pending.get(container, 0)}  # 다른 스레드가 동기화 중
+    try:
+        if not force and time.monotonic() - _last_sync.get(container, float("-inf")) < SYNC_INTERVAL:
+            return {"added": 0, "removed": 0, "pending": _pending.get(container, 0)}
+        with tracing.span("local_index.sync") as span:
+            result = _sync(client, container)
+            span.set(**result)
+        _last_sync[container] = time.monotonic()
+        _pending[container] = result["pending"]
+        return result
+    finally:
+        _sync_lock.release()
+
+def _sync(client, container):
+    with _lock:
+        live = _live_docs(_load())
+    inventory = {item["name"]: item["etag"] for item in blob_inventory.list_docx(client, container)}
+    changed = [name for name, etag in inventory.items() if live.get(name, (None, None, None))[2] != etag]
+    removed = [name for name in live if name not in inventory]
+    documents = []
+    for name in changed:
+        # 이미 만들어진 artifact만 사용 (검색 경로에서는 ingest/버전 기록 같은 쓰기를 하지 않음)
+        # 아직 없는 문서는 업로드/요약 시 artifact가 생긴 뒤 다음 동기화에서 반영
+        artifact = load_artifact(client, container, name, inventory[name])
+        if artifact is not None:
+            documents.append((name, artifact["source_etag"], artifact["retrieval_chunks"]))
+    add_documents(documents)
+    if removed:
+        remove_documents(removed)
+    return {"added": len(documents), "removed": len(removed), "pending": len(changed) - len(documents)}
+
+def sync_in_background(client: BlobServiceClient, container: str):
+    # 검색 화면용: 동기화할 때가 되었으면 별도 스레드에서 실행하고 바로 반환 (검색은 현재 색인으로)
+    if syncing() or time.monotonic() - _last_sync.get(container, float("-inf")) < SYNC_INTERVAL:
+        return None
+    def run():
+        try:
+            sync(client, container)
+            _errors.pop(container, None)
+        except Exception as e:
+            _errors[container] = f"{type(e).__name__}: {e}"
+    thread = threading.Thread(target=tracing.wrap(run), name="local-index-sync", daemon=True)
+    thread.start()
+    return thread
+
+def syncing() -> bool:
+    return _sync_lock.locked()
+
+def pending(container: str) -> int:
+    return _pending.get(container, 0)
+
+def last_error(container: str):
+    return _errors.get(container)
+
+def _snippet(text, words):
+    lowered = text.lower()
+    hits = [lowered.find(w) for w in words if lowered.find(w) >= 0]
+    start = max(0, min(hits) - SNIPPET_CHARS // 4) if hits else 0
+    snippet = text[start:start + SNIPPET_CHARS].replace("\n", " ")
+    for word in sorted(words, key=len, reverse=True):
+        snippet = re.sub(re.escape(word), lambda m: f"**{m.group(0)}**", snippet, flags=re.IGNORECASE)
+    return ("… " if start > 0 else "") + snippet + (" …" if start + SNIPPET_CHARS < len(text) else "")
+
+def search(query: str, top: int = 10, skip: int = 0, passages: int = 3) -> dict:
+    # 반환: {"items": [{"name", "etag", "score", "snippet", "passages"}], "count", "elapsed"}
+    start = time.perf_counter()
+    query_terms = set(tokenize(query))
+    with _lock, tracing.span("local_index.search") as span:  # 검색 중에 병합으로 세그먼트가 닫히지 않도록 잠금 유지 (수 ms)
+        result = _search(query_terms, query, top, skip, passages, start)
+        span.set(hits=len(result["items"]), count=result["count"])
+        return result
+
+def _search(query_terms, query, top, skip, passages, start):
+    manifest = _load()
+    segments = [(seg_id, _segments[seg_id], set(manifest["deleted"].get(str(seg_id), [])))
+                for seg_id in manifest["segments"]]
+
+    n_units = sum(len(segment.units) for _, segment, _ in segments)
+    if not n_units or not query_terms:
+        return {"items": [], "count": 0, "elapsed": time.perf_counter() - start}
+    avg_length = (sum(segment.total_length for _, segment, _ in segments) / n_units) or 1
+    doc_freq = {term: sum(segment.terms.get(term, (0, 0))[1] for _, segment, _ in segments) for term in query_terms}
+
+    unit_scores = defaultdict(float)
+    for seg_id, segment, deleted in segments:
+        for term in query_terms:
+            df = doc_freq[term]
+            if not df:
+                continue
+            idf = math.log(1 + (n_units - df + 0.5) / (df + 0.5))
+            for unit_id, freq in segment.postings_for(term):
+                unit = segment.units[unit_id]
+                if unit[0] in deleted:
+                    continue
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * unit[3] / avg_length)
+                unit_scores[(seg_id, unit_id)] += idf * freq * (BM25_K1 + 1) / (freq + norm)
+
+    # 문서 점수 = 가장 관련도 높은 청크 점수
+    by_doc = defaultdict(list)
+    for (seg_id, unit_id), score in unit_scores.items():
+        by_doc[(seg_id, _segments[seg_id].units[unit_id][0])].append((score, unit_id))
+    ranked = sorted(by_doc.items(), key=lambda item: max(item[1])[0], reverse=True)
+
+    words = [w.lower() for w in _WORD.findall(query)]
+    items = []
+    for (seg_id, doc_id), hits in ranked[skip:skip + top]:
+        segment = _segments[seg_id]
+        hits.sort(reverse=True)
+        texts = [segment.unit_text(unit_id) for _, unit_id in hits[:passages]]
+        items.append({
+            "name": segment.docs[doc_id]["name"],
+            "etag": segment.docs[doc_id]["etag"],
+            "score": hits[0][0],
+            "snippet": _snippet(texts[0], words),
+            "passages": texts,
+        })
+    return {"items": items, "count": len(ranked), "elapsed": time.perf_counter() - start}
+
+def stats() -> dict:
+    with _lock:
+        manifest = _load()
+        return {
+            "documents": len(_live_docs(manifest)),
+            "segments": len(manifest["segments"]),
+            "deleted": sum(len(v) for v in manifest["deleted"].values()),
+        }
@@ -0,0 +1,121 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from openai import AzureOpenAI
+from Service.chunker import chunk_paragraphs
+from Service.token_budget import count_tokens
+from Service.gpt_stream import stream_completion, trace_usage
+from Service import completion_cache, rate_limiter, tracing
+
+# 문서 토큰 수가 임계값을 넘으면 map-reduce 요약으로 자동 전환
+MAP_REDUCE_TOKEN_THRESHOLD = int(os.getenv("MAP_REDUCE_TOKEN_THRESHOLD", "60000"))
+MAP_CHUNK_TOKENS = int(os.getenv("MAP_CHUNK_TOKENS", "8000"))        # map 단계 청크당 입력 토큰
+MAP_OUTPUT_TOKENS = int(os.getenv("MAP_OUTPUT_TOKENS", "1200"))      # map 결과 최대 출력 토큰
+REDUCE_INPUT_TOKENS = int(os.getenv("REDUCE_INPUT_TOKENS", "24000")) # reduce 1회 입력 토큰 상한
+MAP_MAX_CONCURRENCY = int(os.getenv("MAP_MAX_CONCURRENCY", "4"))
+
+# reduce 한 번에 부분 요약이 두 개 이상 들어가야 단계마다 개수가 줄어듦 (환경 변수로 잘못 바꾼 경우 시작 시 오류)
+if REDUCE_INPUT_TOKENS < 2 * MAP_OUTPUT_TOKENS:
+    raise ValueError(f"REDUCE_INPUT_TOKENS({REDUCE_INPUT_TOKENS})는 MAP_OUTPUT_TOKENS({MAP_OUTPUT_TOKENS})의 "
+                     f"2배 이상이어야 합니다.")
+
+MAP_PROMPT = """다음은 RFP 문서의 일부입니다.
+사업 목적·배경, 업무 요구사항, 기술 요구사항(기능/비기능/운영/보안), 일정, 예산, 제출 조건 등
+제안서 작성에 필요한 사실을 빠짐없이 항목별 bullet로 요약하세요. 원문에 없는 내용은 추가하지 마세요.
+\"\"\"{text}\"\"\""""
+
+REDUCE_PROMPT = """다음은 같은 RFP 문서를 부분별로 요약한 결과입니다.
+중복을 제거하고 항목별로 통합하여 하나의 요약으로 정리하세요. 세부 요구사항과 수치는 유지하세요.
+{text}"""
+
+FINAL_PROMPT = """다음은 RFP 문서 전체를 단계적으로 요약한 결과입니다. 이 요약을 바탕으로 아래 항목을 step by step으로 분석 및 작성해주세요. :
+\"\"\"{text}\"\"\"
+\"\"\"{instruction}\"\"\""""
+
+
+def needs_map_reduce(text: str, threshold: int = None) -> bool:
+    return count_tokens(text) > (threshold or MAP_REDUCE_TOKEN_THRESHOLD)
+
+def _complete(client, deployment, system, prompt, use_cache, stage):
+    with tracing.span("openai.complete", deployment=deployment, stage=stage) as span:
+        return _complete_traced(client, deployment, system, prompt, use_cache, span)
+
+def _complete_traced(client, deployment, system, prompt, use_cache, span):
+    messages = [{"role": "system", "content": system}, {"role": "user", "content": prompt}]
+    key = completion_cache.make_key(deployment, messages, {"max_tokens": MAP_OUTPUT_TOKENS})
+    if use_cache:
+        cached = completion_cache.get(key)
+        if cached is not None:
+            span.set(cache_hit=True)
+            return cached["content"]
+    response, reserved = rate_limiter.call(
+        lambda: client.chat.completions.create(model=deployment, messages=messages, max_tokens=MAP_OUTPUT_TOKENS),
+        messages, MAP_OUTPUT_TOKENS)
+    rate_limiter.scheduler.settle(reserved, response.usage.total_tokens if response.usage else reserved)
+    if response.usage:
+        span.set(cache_hit=False, **trace_usage({"prompt_tokens": response.usage.prompt_tokens,
+                                                 "completion_tokens": response.usage.completion_tokens,
+                                                 "total_tokens": response.usage.total_tokens}))
+    content = (response.choices[0].message.content or "").strip()
+    if content:
+        completion_cache.put(key, {"content": content})
+    return content
+
+def _parallel(client, deployment, system, prompts, on_progress, stage, use_cache):
+    results = [None] * len(prompts)
+    done = 0
+    with ThreadPoolExecutor(max_workers=max(1, min(MAP_MAX_CONCURRENCY, len(prompts)))) as pool:
+        futures = {pool.submit(tracing.wrap(_complete), client, deployment, system, p, use_cache, stage): i
+                   for i, p in enumerate(prompts)}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+            done += 1
+            if on_progress:
+                on_progress(stage, done, len(prompts))
+    return results
+
+def _group_by_tokens(texts, max_tokens):
+    # reduce 입력 상한 안에 들어가도록 부분 요약을 묶는다
+    return chunk_paragraphs(texts, max_tokens, size_fn=count_tokens)
+
+def map_reduce_summary(client: AzureOpenAI, deployment: str, system: str, paragraphs: list, instruction: str,
+                       on_progress=None, on_update=None, use_cache: bool = True, on_wait=None) -> dict:
+    with tracing.span("openai.map_reduce") as span:
+        result = _map_reduce_summary(client, deployment, system, paragraphs, instruction,
+                                     on_progress, on_update, use_cache, on_wait)
+        span.set(map_count=result["map_count"], reduce_passes=result["reduce_passes"])
+        return result
+
+def _map_reduce_summary(client, deployment, system, paragraphs, instruction, on_progress, on_update, use_cache, on_wait):
+    # 1) map: 토큰 예산 단위로 나눈 청크를 병렬 요약
+    # 경계는 내용 기준, 프롬프트에는 청크 위치를 넣지 않음 → 개정본에서도 바뀌지 않은 청크는 캐시된 요약 재사용
+    chunks = chunk_paragraphs(paragraphs, MAP_CHUNK_TOKENS, size_fn=count_tokens, content_defined=True)
+    prompts = [MAP_PROMPT.format(text=c) for c in chunks]
+    partials = _parallel(client, deployment, system, prompts, on_progress, "map", use_cache)
+
+    # 2) reduce: 하나의 그룹에 들어갈 때까지 반복 병합
+    reduce_passes = 0
+    groups = _group_by_tokens(partials, REDUCE_INPUT_TOKENS)
+    while len(groups) > 1:
+        reduce_passes += 1
+        partials = _parallel(client, deployment, system, [REDUCE_PROMPT.format(text=g) for g in groups],
+                             on_progress, f"reduce {reduce_passes}", use_cache)
+        previous, groups = len(groups), _group_by_tokens(partials, REDUCE_INPUT_TOKENS)
+        if len(groups) >= previous:
+            # 요약이 예상보다 길어 묶음 수가 줄지 않으면 무한 반복 대신 중단
+            raise RuntimeError(f"reduce {reduce_passes}단계에서 묶음 수가 줄지 않았습니다 ({previous} → {len(groups)}). "
+                               f"REDUCE_INPUT_TOKENS/MAP_OUTPUT_TOKENS 설정을 확인하세요.")
+    merged = groups[0] if groups else ""
+
+    # 3) 최종: 병합 요약에 사용자 분석 항목 적용 (스트리밍)
+    if on_progress:
+        on_progress("final", 0, 1)
+    result = stream_completion(
+        client, deployment,
+        messages=[{"role": "system", "content": system},
+                  {"role": "user", "content": FINAL_PROMPT.format(text=merged, instruction=instruction)}],
+        on_update=on_update,
+        use_cache=use_cache,
+        on_wait=on_wait,
+    )
+    result.update(map_count=len(chunks), reduce_passes=reduce_passes, merged_summary=merged)
+    return result
@@ -0,0 +1,31 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from Service import tracing
+
+
+def _timed(func):
+    start = time.perf_counter()
+    value = func()
+    return value, time.perf_counter() - start
+
+def run_concurrently(steps: dict) -> dict:
+    # steps: {단계 이름: (인자 없는 함수, 제한 시간(초))} → 모든 단계를 동시에 시작
+    # 반환: {단계 이름: {"value", "error", "elapsed"}} (제한 시간 초과 시 error=TimeoutError)
+    pool = ThreadPoolExecutor(max_workers=max(1, len(steps)))
+    start = time.perf_counter()
+    futures = {name: (pool.submit(tracing.wrap(_timed), func), timeout) for name, (func, timeout) in steps.items()}
+
+    results = {}
+    for name, (future, timeout) in futures.items():
+        remaining = None if timeout is None else max(0.0, timeout - (time.perf_counter() - start))
+        try:
+            value, elapsed = future.result(timeout=remaining)
+            results[name] = {"value": value, "error": None, "elapsed": elapsed}
+        except FutureTimeout:
+            results[name] = {"value": None, "error": TimeoutError(f"{name}: {timeout}초 제한 시간 초과"), "elapsed": timeout}
+        except Exception as e:
+            results[name] = {"value": None, "error": e, "elapsed": time.perf_counter() - start}
+
+    # 제한 시간을 넘긴 작업은 기다리지 않고 백그라운드에서 끝나도록 둠
+    pool.shutdown(wait=False, cancel_futures=True)
+    return results
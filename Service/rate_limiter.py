@@ -0,0 +1,133 @@
+import os
+import time
+import threading
+from collections import deque
+import openai
+from Service.token_budget import count_tokens
+from Service import tracing
+
+# Azure OpenAI 배포 할당량(TPM/RPM)에 맞춘 프로세스 전체 공용 스케줄러
+# - 토큰 버킷 2개(분당 토큰, 분당 요청)로 전송 속도 제한
+# - 요청 전 토큰 수를 추정해 차감하고, 응답 후 실제 사용량으로 정산
+# - 도착 순서(FIFO)대로 처리해 한 사용자가 할당량을 독점하지 않도록 함
+# - 429 응답의 Retry-After 동안 모든 요청 일시 중지 후 재시도
+OPENAI_TPM = int(os.getenv("OPENAI_TPM", "80000"))
+OPENAI_RPM = int(os.getenv("OPENAI_RPM", str(max(1, OPENAI_TPM * 6 // 1000))))  # Azure 기본 비율: 1000 TPM당 6 RPM
+DEFAULT_OUTPUT_TOKENS = int(os.getenv("OPENAI_EXPECTED_OUTPUT_TOKENS", "1500"))
+MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "4"))
+DEFAULT_RETRY_AFTER = 10.0
+POLL_INTERVAL = 0.25
+
+
+class _Bucket:
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+
+class Scheduler:
+    def __init__(self, tpm, rpm):
+        self._lock = threading.Lock()
+        self._tokens = _Bucket(tpm)
+        self._requests = _Bucket(rpm)
+        self._queue = deque()
+        self._next_ticket = 0
+        self._paused_until = 0.0
+        self.stats = {"requests": 0, "throttled": 0, "waited_sec": 0.0}
+
+    def queue_depth(self) -> int:
+        with self._lock:
+            return len(self._queue)
+
+    def acquire(self, tokens: int, on_wait=None) -> int:
+        # 차례가 오고 버킷에 여유가 생길 때까지 대기 후 추정 토큰 차감
+        tokens = min(tokens, int(self._tokens.capacity))  # 할당량보다 큰 요청도 버킷이 가득 차면 통과
+        start = time.monotonic()
+        with self._lock:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            self._queue.append(ticket)
+        try:
+            while True:
+                with self._lock:
+                    now = time.monotonic()
+                    self._tokens.refill(now)
+                    self._requests.refill(now)
+                    position = self._queue.index(ticket)
+                    wait = None
+                    if position == 0:
+                        wait = max(self._paused_until - now, self._tokens.wait_time(tokens), self._requests.wait_time(1))
+                        if wait <= 0:
+                            self._tokens.level -= tokens
+                            self._requests.level -= 1
+                            self._queue.popleft()
+                            self.stats["requests"] += 1
+                            self.stats["waited_sec"] += now - start
+                            return tokens
+                    depth = len(self._queue)
+                if on_wait:
+                    on_wait(position, depth, wait)
+                time.sleep(POLL_INTERVAL if wait is None else min(max(wait, 0.01), POLL_INTERVAL))
+        except BaseException:
+            with self._lock:
+                if ticket in self._queue:
+                    self._queue.remove(ticket)
+            raise
+
+    def settle(self, estimated: int, actual: int):
+        # 추정치와 실제 사용량의 차이만큼 버킷을 보정 (음수 = 빚)
+        with self._lock:
+            self._tokens.level = min(self._tokens.capacity, self._tokens.level + estimated - actual)
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self.stats["throttled"] += 1
+
+
+scheduler = Scheduler(OPENAI_TPM, OPENAI_RPM)
+
+
+def estimate_tokens(messages: list, max_tokens: int = None) -> int:
+    prompt = sum(count_tokens(m["content"]) + 4 for m in messages)
+    return prompt + (max_tokens or DEFAULT_OUTPUT_TOKENS)
+
+def retry_after_seconds(error) -> float:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(name)
+        if value:
+            try:
+                return float(value) * scale
+            except ValueError:
+                pass
+    return DEFAULT_RETRY_AFTER
+
+def call(func, messages: list, max_tokens: int = None, on_wait=None):
+    # func(): 실제 API 호출. 반환값과 추정 토큰 수를 돌려주며, 정산은 호출 측에서 settle()로 수행
+    estimated = estimate_tokens(messages, max_tokens)
+    span = tracing.current()
+    for attempt in range(MAX_RETRIES + 1):
+        queued_at = time.perf_counter()
+        reserved = scheduler.acquire(estimated, on_wait)
+        span.add("queue_wait_ms", round((time.perf_counter() - queued_at) * 1000, 2))
+        try:
+            return func(), reserved
+        except openai.RateLimitError as e:
+            scheduler.settle(reserved, 0)
+            if attempt == MAX_RETRIES:
+                raise
+            span.add("retries")
+            scheduler.pause(retry_after_seconds(e))
+        except Exception:
+            scheduler.settle(reserved, 0)
+            raise
@@ -0,0 +1,89 @@
+import os
+import re
+import math
+from collections import Counter
+from Service.chunker import chunk_paragraphs
+from Service.token_budget import count_tokens
+from Service import tracing
+
+# 문서별 BM25 검색 인덱스 (외부 서비스 없이 로컬에서 동작)
+RETRIEVAL_CHUNK_TOKENS = int(os.getenv("RETRIEVAL_CHUNK_TOKENS", "500"))
+RETRIEVAL_OVERLAP_TOKENS = int(os.getenv("RETRIEVAL_OVERLAP_TOKENS", "50"))   # 청크 경계에 걸친 문장도 검색되도록
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "4"))
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_WORD = re.compile(r"[가-힣]+|[a-zA-Z]+|\d+")
+
+
+def tokenize(text: str) -> list:
+    # 한글은 조사/어미가 붙어 형태가 바뀌므로 음절 bigram, 영문은 소문자 단어 단위
+    terms = []
+    for word in _WORD.findall(text):
+        if "가" <= word[0] <= "힣":
+            if len(word) == 1:
+                terms.append(word)
+            else:
+                terms.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            terms.append(word.lower())
+    return terms
+
+def split_chunks(paragraphs: list, chunk_tokens: int = None) -> list:
+    return chunk_paragraphs(paragraphs, chunk_tokens or RETRIEVAL_CHUNK_TOKENS, size_fn=count_tokens,
+                            overlap=RETRIEVAL_OVERLAP_TOKENS)
+
+def build_index(paragraphs: list, chunk_tokens: int = None) -> dict:
+    return index_chunks(split_chunks(paragraphs, chunk_tokens))
+
+def index_chunks(chunks: list) -> dict:
+    with tracing.span("retrieval.index", chunks=len(chunks)):
+        term_freqs = [Counter(tokenize(chunk)) for chunk in chunks]
+    doc_freq = Counter()
+    for tf in term_freqs:
+        doc_freq.update(tf.keys())
+    lengths = [sum(tf.values()) for tf in term_freqs]
+    return {
+        "chunks": chunks,
+        "term_freqs": term_freqs,
+        "doc_freq": doc_freq,
+        "lengths": lengths,
+        "avg_length": (sum(lengths) / len(lengths)) if lengths else 0.0,
+    }
+
+def search(index: dict, query: str, top_k: int = None) -> list:
+    # (청크 번호, 점수, 청크 본문) 목록을 점수 내림차순으로 반환
+    n = len(index["chunks"])
+    if not n:
+        return []
+    query_terms = set(tokenize(query))
+    scores = []
+    for i, tf in enumerate(index["term_freqs"]):
+        score = 0.0
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * index["lengths"][i] / (index["avg_length"] or 1))
+        for term in query_terms:
+            freq = tf.get(term)
+            if not freq:
+                continue
+            df = index["doc_freq"][term]
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            score += idf * freq * (BM25_K1 + 1) / (freq + norm)
+        if score > 0:
+            scores.append((i, score))
+    scores.sort(key=lambda item: item[1], reverse=True)
+    return [(i, score, index["chunks"][i]) for i, score in scores[:top_k or RETRIEVAL_TOP_K]]
+
+def select_within_budget(index: dict, query: str, max_tokens: int) -> list:
+    # 질문과 관련도 높은 청크부터 예산까지 채우고, 남는 예산은 앞쪽 청크로 채움 → 문서 순서대로 반환
+    ranked = [i for i, _, _ in search(index, query, top_k=len(index["chunks"]))]
+    seen = set(ranked)
+    ranked += [i for i in range(len(index["chunks"])) if i not in seen]
+    selected = []
+    used = 0
+    for i in ranked:
+        size = count_tokens(index["chunks"][i])
+        if used + size > max_tokens:
+            continue
+        selected.append(i)
+        used += size
+    return [index["chunks"][i] for i in sorted(selected)]
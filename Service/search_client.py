@@ -0,0 +1,191 @@
+import os
+import time
+import threading
+from urllib.parse import quote
+from collections import OrderedDict
+from Service import http_client, tracing
+
+# Azure Search 조회 클라이언트
+# - 결과 목록에는 content를 받지 않고, 필요한 필드(select)와 하이라이트만 요청
+# - skip/top 페이지 단위 조회 + 전체 건수(count)
+# - (검색어, 필드, 페이지) 단위 TTL 캐시 → 같은 조회가 rerun마다 다시 나가지 않음
+# - 본문(content)은 결과를 펼칠 때 문서 키로 한 건씩 조회 (역시 캐시)
+API_VERSION = "2023-10-01-Preview"
+KEY_FIELD = os.getenv("SEARCH_KEY_FIELD", "metadata_storage_path")
+NAME_FIELD = os.getenv("SEARCH_NAME_FIELD", "metadata_storage_name")   # blob 이름 (로컬 인덱스 결과와 병합 시 사용)
+SELECT_FIELDS = [f.strip() for f in os.getenv("SEARCH_SELECT_FIELDS", "title,author,created").split(",") if f.strip()]
+PAGE_SIZE = int(os.getenv("SEARCH_PAGE_SIZE", "10"))
+CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "300"))           # 초
+CACHE_MAX_ITEMS = int(os.getenv("SEARCH_CACHE_MAX_ITEMS", "256"))
+HIGHLIGHT_PRE_TAG = "**"
+HIGHLIGHT_POST_TAG = "**"
+
+_lock = threading.Lock()
+_cache = OrderedDict()
+_stats = {"hit": 0, "miss": 0}
+_schemas = {}        # (service, index) → {"fields", "key"} (스키마를 읽을 수 없으면 None)
+_skip_select = set() # select 때문에 400이 난 인덱스 → 이후로는 select 없이 요청
+
+
+class SearchError(Exception):
+    # status_code가 None이면 응답을 받지 못한 경우 (연결 실패/타임아웃)
+    def __init__(self, status_code, text):
+        super().__init__(f"{status_code} - {text}" if status_code is not None else text)
+        self.status_code = status_code
+        self.text = text
+
+
+def _cache_get(key):
+    with _lock:
+        entry = _cache.get(key)
+        if entry and time.monotonic() - entry[0] < CACHE_TTL:
+            _cache.move_to_end(key)
+            _stats["hit"] += 1
+            return entry[1]
+        _cache.pop(key, None)
+        _stats["miss"] += 1
+    return None
+
+def _cache_put(key, value):
+    with _lock:
+        _cache[key] = (time.monotonic(), value)
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_MAX_ITEMS:
+            _cache.popitem(last=False)
+
+def _headers(api_key):
+    return {"Content-Type": "application/json", "api-key": api_key}
+
+def _call(send, url, api_key, **kwargs):
+    # 재시도 후에도 남은 연결 오류는 SearchError로 바꿔 화면에서 한 가지 예외만 처리하도록 함
+    try:
+        return send("azure_search", url, headers=_headers(api_key), **kwargs)
+    except http_client.TRANSPORT_ERRORS as e:
+        raise SearchError(None, f"검색 서비스에 연결하지 못했습니다 ({type(e).__name__}: {e})") from e
+
+def _index_schema(service, api_key, index):
+    # 인덱스 스키마(GET /indexes/{name})를 한 번 읽어 {"fields": retrievable 필드, "key": 키 필드}로 기억
+    # 조회 전용 키처럼 스키마를 읽을 권한이 없으면 None (select 그대로 보내고 400이면 select 없이 재시도)
+    cache_key = (service, index)
+    with _lock:
+        if cache_key in _schemas:
+            return _schemas[cache_key]
+    url = f"{service}/indexes/{quote(index, safe='')}?api-version={API_VERSION}"
+    with tracing.span("search.schema", index=index) as span:
+        try:
+            response = http_client.get("azure_search", url, headers=_headers(api_key))
+        except Exception:
+            return None  # 네트워크 오류는 기억하지 않고 다음 검색에서 다시 확인
+        schema = None
+        fields = response.json().get("fields") if response.status_code == 200 else None
+        if fields:   # 필드 목록이 없는 응답은 스키마를 모르는 것으로 취급
+            schema = {
+                "fields": {f["name"] for f in fields if f.get("retrievable", True)},
+                "key": next((f["name"] for f in fields if f.get("key")), None),
+            }
+        span.set(status=response.status_code, fields=len(schema["fields"]) if schema else 0)
+    with _lock:
+        _schemas[cache_key] = schema
+    return schema
+
+def _key_field(schema, index):
+    # 반환: (문서 키 필드, 경고) — SEARCH_KEY_FIELD가 스키마에 없으면 인덱스의 실제 키 필드로 대체
+    if schema is None or KEY_FIELD in schema["fields"]:
+        return KEY_FIELD, None
+    if schema["key"]:
+        return schema["key"], (f"키 필드 '{KEY_FIELD}'가 인덱스 '{index}'에 없어 '{schema['key']}'를 사용합니다. "
+                               f"SEARCH_KEY_FIELD 설정을 확인하세요.")
+    return None, f"키 필드 '{KEY_FIELD}'가 인덱스 '{index}'에 없어 본문 보기를 사용할 수 없습니다."
+
+def search(service: str, api_key: str, index: str, query: str, search_fields: list,
+           page: int = 0, page_size: int = None, use_cache: bool = True) -> dict:
+    # 반환: {"items": [{"key", "name", 선택 필드..., "highlights"}], "count", "page", "page_size", "elapsed", "cached",
+    #        "warnings"}
+    page_size = page_size or PAGE_SIZE
+    cache_key = ("search", service, index, query, tuple(search_fields), page, page_size)
+    if use_cache:
+        cached = _cache_get(cache_key)
+        if cached is not None:
+            with tracing.span("search.query", page=page, cache_hit=True, hits=len(cached["items"])):
+                return dict(cached, cached=True)
+    with tracing.span("search.query", page=page, cache_hit=False) as span:
+        result = _search(service, api_key, index, query, search_fields, page, page_size)
+        span.set(hits=len(result["items"]), count=result["count"])
+    _cache_put(cache_key, result)
+    return dict(result, cached=False)
+
+def _search(service, api_key, index, query, search_fields, page, page_size):
+
+    url = f"{service}/indexes/{index}/docs/search?api-version={API_VERSION}"
+    data = {
+        "search": query,
+        "searchFields": ",".join(search_fields),
+        "highlight": ",".join(search_fields),
+        "highlightPreTag": HIGHLIGHT_PRE_TAG,
+        "highlightPostTag": HIGHLIGHT_POST_TAG,
+        "count": True,
+        "skip": page * page_size,
+        "top": page_size,
+    }
+    schema = _index_schema(service, api_key, index)
+    key_field, warning = _key_field(schema, index)
+    if (service, index) not in _skip_select:
+        wanted = dict.fromkeys(field for field in [key_field, NAME_FIELD] + SELECT_FIELDS if field)
+        data["select"] = ",".join(wanted if schema is None else [f for f in wanted if f in schema["fields"]])
+    start = time.perf_counter()
+    response = _call(http_client.post, url, api_key, json=data)
+    if response.status_code == 400 and "select" in data:
+        # 스키마를 확인하지 못했고 select에 없는/조회 불가 필드가 있는 경우 → select 없이 다시 요청
+        retry = {k: v for k, v in data.items() if k != "select"}
+        response = _call(http_client.post, url, api_key, json=retry)
+        if response.status_code == 200:
+            with _lock:
+                _skip_select.add((service, index))
+    if response.status_code != 200:
+        raise SearchError(response.status_code, response.text)
+
+    body = response.json()
+    items = []
+    for doc in body.get("value", []):
+        item = {"key": doc.get(key_field) if key_field else None, "name": doc.get(NAME_FIELD),
+                "score": doc.get("@search.score")}
+        item.update({field: doc.get(field) for field in SELECT_FIELDS})
+        item["highlights"] = [h for values in (doc.get("@search.highlights") or {}).values() for h in values]
+        items.append(item)
+    if warning is None and key_field and items and all(item["key"] is None for item in items):
+        warning = f"검색 결과에 키 필드 '{key_field}'가 없어 본문 보기를 사용할 수 없습니다. SEARCH_KEY_FIELD 설정을 확인하세요."
+    result = {
+        "items": items,
+        "count": body.get("@odata.count", len(items)),
+        "page": page,
+        "page_size": page_size,
+        "elapsed": time.perf_counter() - start,
+        "warnings": [warning] if warning else [],
+    }
+    return result
+
+def get_document(service: str, api_key: str, index: str, key: str, fields: tuple = ("content",)) -> dict:
+    # 문서 키로 한 건 조회 (결과를 펼쳤을 때만 호출)
+    cache_key = ("document", service, index, key, tuple(fields))
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    url = (f"{service}/indexes/{index}/docs/{quote(str(key), safe='')}"
+           f"?api-version={API_VERSION}&$select={','.join(fields)}")
+    response = _call(http_client.get, url, api_key)
+    if response.status_code != 200:
+        raise SearchError(response.status_code, response.text)
+    document = response.json()
+    _cache_put(cache_key, document)
+    return document
+
+def invalidate():
+    with _lock:
+        _cache.clear()
+        _schemas.clear()
+        _skip_select.clear()
+
+def cache_stats() -> dict:
+    with _lock:
+        return dict(_stats, items=len(_cache))
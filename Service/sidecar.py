@@ -0,0 +1,28 @@
+import os
+import threading
+from azure.core.exceptions import ResourceExistsError
+from azure.storage.blob import BlobServiceClient
+
+# 사전 분석 결과/버전 기록 같은 파생 데이터를 두는 별도 컨테이너
+# 원본 문서 컨테이너(word-data)에 두면 업로드 탭 목록과 Azure Search 인덱서가 JSON 파일까지 읽게 되므로 분리
+# 원본 컨테이너 이름을 경로 앞에 붙여 여러 원본 컨테이너가 같은 sidecar 컨테이너를 함께 사용
+SIDECAR_CONTAINER = os.getenv("SIDECAR_CONTAINER", "word-data-sidecar")
+
+_lock = threading.Lock()
+_ready = set()
+
+
+def _ensure_container(client):
+    if SIDECAR_CONTAINER in _ready:
+        return
+    with _lock:
+        if SIDECAR_CONTAINER not in _ready:
+            try:
+                client.create_container(SIDECAR_CONTAINER)
+            except ResourceExistsError:
+                pass
+            _ready.add(SIDECAR_CONTAINER)
+
+def blob_client(client: BlobServiceClient, source_container: str, name: str):
+    _ensure_container(client)
+    return client.get_blob_client(SIDECAR_CONTAINER, f"{source_container}/{name}")
@@ -0,0 +1,9 @@
+import re
+
+
+def clean_text(text: str) -> str:
+    # 특수문자 제거 + 공백 정리 + 숫자 제거
+    text = re.sub(r"[^\w\s가-힣]", " ", text)       # 특수문자 제거
+    text = re.sub(r"\d+", " ", text)               # 숫자 제거
+    text = re.sub(r"\s+", " ", text)               # 공백 정리
+    return text.strip()
@@ -0,0 +1,98 @@
+import os
+import re
+
+# 토큰 수 추정: tiktoken이 설치되어 있으면 실제 토크나이저, 없으면 문자 기반 근사치
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding(os.getenv("TOKEN_ENCODING", "o200k_base"))
+except Exception:
+    _encoding = None
+
+_HANGUL = re.compile(r"[가-힣ㄱ-ㅎㅏ-ㅣ]")
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    # 한글은 대략 글자당 1토큰, 그 외(영문/숫자/공백)는 4글자당 1토큰
+    hangul = len(_HANGUL.findall(text))
+    return hangul + (len(text) - hangul + 3) // 4
+
+# 호출 전 입력 토큰 예산 (모델 컨텍스트 - 출력 예약분, 비용 한도 중 작은 값)
+CONTEXT_TOKENS = int(os.getenv("GPT_CONTEXT_TOKENS", "128000"))
+OUTPUT_RESERVE_TOKENS = int(os.getenv("GPT_OUTPUT_RESERVE_TOKENS", "8000"))
+PRICE_PER_1K_INPUT = float(os.getenv("GPT_PRICE_PER_1K_INPUT", "0.0025"))   # USD
+PRICE_PER_1K_OUTPUT = float(os.getenv("GPT_PRICE_PER_1K_OUTPUT", "0.01"))   # USD
+MAX_INPUT_COST = float(os.getenv("GPT_MAX_INPUT_COST", "0.25"))             # USD, 0이면 비용 한도 없음
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def input_budget() -> int:
+    budget = CONTEXT_TOKENS - OUTPUT_RESERVE_TOKENS
+    if MAX_INPUT_COST > 0 and PRICE_PER_1K_INPUT > 0:
+        budget = min(budget, int(MAX_INPUT_COST / PRICE_PER_1K_INPUT * 1000))
+    return budget
+
+def estimate_cost(tokens: int, output_tokens: int = 0) -> float:
+    return tokens / 1000 * PRICE_PER_1K_INPUT + output_tokens / 1000 * PRICE_PER_1K_OUTPUT
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    if _encoding is not None:
+        return _encoding.decode(_encoding.encode(text, disallowed_special=())[:max_tokens])
+    # 근사치 토크나이저: 글자 수 기준 이분 탐색
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if count_tokens(text[:mid]) <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low]
+
+def fit_parts(parts: dict, budget: int = None, trim_order: tuple = (), min_tokens: dict = None) -> dict:
+    # parts: {구성 요소 이름: 텍스트}, trim_order 순서대로 잘라 전체가 예산 안에 들어가게 함
+    # min_tokens: 구성 요소별로 남겨둘 최소 토큰 수 (이보다 더 줄여야 하면 fits=False)
+    budget = budget or input_budget()
+    min_tokens = min_tokens or {}
+    before = {name: count_tokens(text) for name, text in parts.items()}
+    fitted = dict(parts)
+    after = dict(before)
+    overhead = MESSAGE_OVERHEAD_TOKENS * len(parts)
+    trimmed = []
+
+    for name in trim_order:
+        excess = sum(after.values()) + overhead - budget
+        if excess <= 0:
+            break
+        keep = max(min_tokens.get(name, 0), after[name] - excess)
+        if keep < after[name]:
+            fitted[name] = truncate_to_tokens(parts[name], keep)
+            after[name] = count_tokens(fitted[name])
+            trimmed.append(name)
+
+    total = sum(after.values()) + overhead
+    return {
+        "parts": fitted,
+        "before": before,
+        "after": after,
+        "total": total,
+        "budget": budget,
+        "trimmed": trimmed,
+        "fits": total <= budget,
+        "cost": estimate_cost(total),
+    }
+
+def budget_table(report: dict) -> dict:
+    # st.table 표시용
+    names = list(report["before"])
+    return {
+        "구성 요소": names + ["합계"],
+        "원본 tokens": [report["before"][n] for n in names] + [sum(report["before"].values())],
+        "전송 tokens": [report["after"][n] for n in names] + [report["total"]],
+    }
@@ -0,0 +1,155 @@
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+import contextvars
+from collections import deque, defaultdict
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+# 가벼운 구간(span) 계측
+# - with span("openai.stream", tokens=...) as s: ... s.set(bytes=...) 형태로 외부 호출/CPU 구간을 감쌈
+# - 종료된 span은 JSONL 파일(크기 기준 회전)에 한 줄씩 기록하고, 최근 span은 메모리에 보관해 p50/p95 집계
+# - 중첩된 span은 parent_id/trace_id로 연결 (작업 스레드로 넘길 함수는 wrap()으로 감싸야 부모가 이어짐)
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "1") != "0"
+TRACE_PATH = os.getenv("TRACE_PATH", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "traces", "spans.jsonl"))
+TRACE_MAX_BYTES = int(os.getenv("TRACE_MAX_BYTES", str(10 * 1024 * 1024)))
+TRACE_BACKUPS = int(os.getenv("TRACE_BACKUPS", "3"))
+RECENT_SPANS = int(os.getenv("TRACE_RECENT_SPANS", "5000"))
+
+_current = contextvars.ContextVar("current_span", default=None)
+_recent = deque(maxlen=RECENT_SPANS)
+_lock = threading.Lock()
+_logger = None
+
+
+def _get_logger():
+    global _logger
+    with _lock:
+        if _logger is None:
+            logger = logging.getLogger("rfp.trace")
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            try:
+                os.makedirs(os.path.dirname(TRACE_PATH), exist_ok=True)
+                handler = RotatingFileHandler(TRACE_PATH, maxBytes=TRACE_MAX_BYTES, backupCount=TRACE_BACKUPS, encoding="utf-8")
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                logger.addHandler(handler)
+            except OSError:
+                logger.addHandler(logging.NullHandler())  # 파일을 못 쓰면 메모리 집계만
+            _logger = logger
+        return _logger
+
+
+class Span:
+    def __init__(self, name, parent, attrs):
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.attrs = dict(attrs)
+        self.start = time.perf_counter()
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def add(self, name, amount=1):
+        self.attrs[name] = self.attrs.get(name, 0) + amount
+
+
+class _NoopSpan:
+    def set(self, **attrs):
+        pass
+
+    def add(self, name, amount=1):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+@contextmanager
+def span(name: str, **attrs):
+    if not TRACE_ENABLED:
+        yield _NOOP
+        return
+    current = Span(name, _current.get(), attrs)
+    token = _current.set(current)
+    status, error = "ok", None
+    try:
+        yield current
+    except Exception as e:  # st.rerun/st.stop 같은 제어 흐름 예외는 오류로 기록하지 않음
+        status, error = "error", f"{type(e).__name__}: {e}"[:300]
+        raise
+    finally:
+        _current.reset(token)
+        _finish(current, status, error)
+
+def wrap(func):
+    # 작업 스레드에서 실행할 함수가 현재 span 아래에 기록되도록 컨텍스트를 복사해 전달
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(func, *args, **kwargs)
+
+def current():
+    # 진행 중인 span (없으면 아무 일도 하지 않는 객체) → 하위 함수에서 속성 추가용
+    return _current.get() or _NOOP
+
+def _finish(current_span, status, error):
+    record = {
+        "ts": time.time(),
+        "name": current_span.name,
+        "trace_id": current_span.trace_id,
+        "span_id": current_span.span_id,
+        "parent_id": current_span.parent_id,
+        "duration_ms": round((time.perf_counter() - current_span.start) * 1000, 2),
+        "status": status,
+    }
+    if error:
+        record["error"] = error
+    record.update(current_span.attrs)
+    with _lock:
+        _recent.append(record)
+    try:
+        _get_logger().info(json.dumps(record, ensure_ascii=False, default=str))
+    except Exception:
+        pass  # 계측 실패가 기능에 영향을 주지 않도록
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[index]
+
+def summary(since: float = None) -> list:
+    # 구간 이름별 호출 수, p50/p95/최대(ms), 오류 수, 토큰/바이트/비용/캐시 적중 합계
+    with _lock:
+        records = [r for r in _recent if since is None or r["ts"] >= since]
+    groups = defaultdict(list)
+    for record in records:
+        groups[record["name"]].append(record)
+    rows = []
+    for name, items in sorted(groups.items()):
+        durations = [r["duration_ms"] for r in items]
+        rows.append({
+            "stage": name,
+            "count": len(items),
+            "p50_ms": _percentile(durations, 0.5),
+            "p95_ms": _percentile(durations, 0.95),
+            "max_ms": max(durations),
+            "errors": sum(r["status"] == "error" for r in items),
+            "tokens": sum(r.get("total_tokens") or 0 for r in items),
+            "bytes": sum(r.get("bytes") or 0 for r in items),
+            "retries": sum(r.get("retries") or 0 for r in items),
+            "cache_hits": sum(bool(r.get("cache_hit")) for r in items),
+            "cost_usd": round(sum(r.get("cost_usd") or 0 for r in items), 4),
+        })
+    return rows
+
+def recent(limit: int = 50) -> list:
+    with _lock:
+        return list(_recent)[-limit:]
+
+def clear():
+    with _lock:
+        _recent.clear()
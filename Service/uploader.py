@@ -0,0 +1,85 @@
+import os
+import time
+import uuid
+import base64
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from azure.storage.blob import BlobServiceClient, BlobBlock
+from Service import tracing
+
+# 블록 단위 병렬 업로드 설정
+UPLOAD_BLOCK_SIZE = int(os.getenv("UPLOAD_BLOCK_SIZE_MB", "4")) * 1024 * 1024
+UPLOAD_MAX_CONCURRENCY = int(os.getenv("UPLOAD_MAX_CONCURRENCY", "4"))   # 파일 하나당 동시 블록 수
+UPLOAD_PARALLEL_FILES = int(os.getenv("UPLOAD_PARALLEL_FILES", "3"))     # 동시에 올리는 파일 수
+HASH_METADATA_KEY = "content_sha256"
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def upload_file(client: BlobServiceClient, container: str, name: str, data: bytes,
+                block_size: int = None, max_concurrency: int = None, metadata: dict = None) -> dict:
+    with tracing.span("blob.upload", blob=name, bytes=len(data)) as span:
+        result = _upload_file(client, container, name, data, block_size, max_concurrency, metadata)
+        span.set(blocks=result["blocks"], mb_per_sec=round(result["mb_per_sec"], 2))
+        return result
+
+def _upload_file(client, container, name, data, block_size, max_concurrency, metadata):
+    block_size = block_size or UPLOAD_BLOCK_SIZE
+    max_concurrency = max_concurrency or UPLOAD_MAX_CONCURRENCY
+    blob_client = client.get_blob_client(container, name)
+    start = time.perf_counter()
+
+    if len(data) <= block_size:
+        response = blob_client.upload_blob(data, overwrite=True, metadata=metadata)
+        blocks = 1
+    else:
+        # 블록을 병렬로 stage 한 뒤 순서대로 commit (commit 시점에 기존 blob을 교체)
+        prefix = uuid.uuid4().hex[:16]
+        block_ids = [base64.b64encode(f"{prefix}-{i:08d}".encode()).decode() for i in range(0, (len(data) + block_size - 1) // block_size)]
+
+        def stage(i):
+            blob_client.stage_block(block_ids[i], data[i * block_size:(i + 1) * block_size])
+
+        with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+            list(pool.map(stage, range(len(block_ids))))
+        response = blob_client.commit_block_list([BlobBlock(block_id=b) for b in block_ids], metadata=metadata)
+        blocks = len(block_ids)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "name": name,
+        "etag": response["etag"],
+        "bytes": len(data),
+        "blocks": blocks,
+        "elapsed": elapsed,
+        "mb_per_sec": len(data) / 1024 / 1024 / elapsed if elapsed > 0 else 0.0,
+    }
+
+def _upload_and_process(client, container, name, data, digest, block_size, max_concurrency, after_upload):
+    result = upload_file(client, container, name, data, block_size, max_concurrency, {HASH_METADATA_KEY: digest})
+    if after_upload:
+        # 후처리가 실패해도 업로드는 끝났으므로 예외를 결과에 담아 돌려줌 (업로드 실패와 구분)
+        try:
+            result["after_upload"] = after_upload(result, data)
+        except Exception as e:
+            result["after_upload"] = e
+    return result
+
+def upload_files(client: BlobServiceClient, container: str, files: list, parallel_files: int = None,
+                 block_size: int = None, max_concurrency: int = None, after_upload=None):
+    # files: [(이름, bytes, 해시)] → 완료되는 순서대로 (이름, 결과 또는 예외)를 돌려주는 generator
+    # after_upload(result, data): 업로드 직후 같은 작업 스레드에서 실행할 후처리 (예: ingestion)
+    #   반환값(또는 후처리에서 난 예외)은 결과의 "after_upload"에 담김
+    workers = max(1, min(parallel_files or UPLOAD_PARALLEL_FILES, len(files)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(tracing.wrap(_upload_and_process), client, container, name, data, digest,
+                        block_size, max_concurrency, after_upload): name
+            for name, data, digest in files
+        }
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except Exception as e:
+                yield futures[future], e
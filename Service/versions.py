@@ -0,0 +1,146 @@
+import os
+import json
+import gzip
+import time
+import hashlib
+import difflib
+import threading
+from azure.core.exceptions import ResourceNotFoundError
+from azure.storage.blob import BlobServiceClient
+from Service import sidecar, tracing
+
+# 문서(blob)별 버전 기록: 같은 이름으로 다시 업로드되면 이전 버전 단락과 비교(diff)
+# artifact와 같은 sidecar 컨테이너에 저장 (원본 컨테이너/검색 인덱서와 분리)
+# - versions/{blob 이름}/log.json : 버전 목록 (버전 번호, etag, 단락 수, 이전 버전 대비 변경 통계)
+# - versions/{blob 이름}/v{n}.json.gz : 버전별 단락 목록 (최근 VERSION_MAX_KEEP개만 유지)
+# 내용이 같은 단락은 같은 청크/캐시 키가 되도록 청크 경계를 내용 기준으로 정하므로(chunker.content_defined),
+# 바뀐 단락이 포함된 청크만 Language/GPT에 다시 요청됨
+VERSION_PREFIX = "versions/"
+VERSION_MAX_KEEP = int(os.getenv("VERSION_MAX_KEEP", "5"))
+LOG_TTL = 60   # 초 (앱 밖에서 바뀐 기록은 이 주기로 다시 조회)
+
+_lock = threading.Lock()
+_logs = {}   # (container, blob 이름) → (조회 시각, 버전 목록)
+
+
+def _log_name(blob_name):
+    return f"{VERSION_PREFIX}{blob_name}/log.json"
+
+def _version_name(blob_name, version):
+    return f"{VERSION_PREFIX}{blob_name}/v{version}.json.gz"
+
+def paragraph_hash(paragraph: str) -> str:
+    return hashlib.sha1(" ".join(paragraph.split()).encode("utf-8")).hexdigest()[:16]
+
+def _digest(paragraphs):
+    return hashlib.sha256("\n".join(paragraph_hash(p) for p in paragraphs).encode("utf-8")).hexdigest()
+
+def list_versions(client: BlobServiceClient, container: str, blob_name: str) -> list:
+    # [{"version", "etag", "created", "paragraphs", "digest", "changes"}] (오래된 순)
+    with _lock:
+        entry = _logs.get((container, blob_name))
+        if entry and time.monotonic() - entry[0] < LOG_TTL:
+            return entry[1]
+    try:
+        raw = sidecar.blob_client(client, container, _log_name(blob_name)).download_blob().readall()
+        log = json.loads(raw.decode("utf-8"))
+    except ResourceNotFoundError:
+        log = []
+    with _lock:
+        _logs[(container, blob_name)] = (time.monotonic(), log)
+    return log
+
+def load_paragraphs(client: BlobServiceClient, container: str, blob_name: str, version: int):
+    try:
+        raw = sidecar.blob_client(client, container, _version_name(blob_name, version)).download_blob().readall()
+    except ResourceNotFoundError:
+        return None  # 보관 개수를 넘어 지워진 버전
+    return json.loads(gzip.decompress(raw).decode("utf-8"))
+
+def diff_paragraphs(old: list, new: list) -> dict:
+    # 단락 해시 단위 비교 (공백 차이는 무시)
+    # ops: [(태그, 이전 시작, 이전 끝, 새 시작, 새 끝)] — 태그는 difflib의 equal/replace/delete/insert
+    matcher = difflib.SequenceMatcher(None, [paragraph_hash(p) for p in old], [paragraph_hash(p) for p in new],
+                                      autojunk=False)
+    ops = matcher.get_opcodes()
+    added = sum(j2 - j1 for tag, i1, i2, j1, j2 in ops if tag in ("insert", "replace"))
+    removed = sum(i2 - i1 for tag, i1, i2, j1, j2 in ops if tag in ("delete", "replace"))
+    unchanged = sum(i2 - i1 for tag, i1, i2, j1, j2 in ops if tag == "equal")
+    return {
+        "ops": ops,
+        "added": added,
+        "removed": removed,
+        "unchanged": unchanged,
+        "changed_ratio": round(added / len(new), 3) if new else 0.0,
+    }
+
+def record_version(client: BlobServiceClient, container: str, blob_name: str, etag: str, paragraphs: list) -> dict:
+    # 새 etag의 단락을 버전으로 기록하고 이전 버전과의 변경 통계를 함께 저장 → 기록된(또는 기존) 버전 항목 반환
+    with tracing.span("versions.record", blob=blob_name) as span:
+        log = list(list_versions(client, container, blob_name))
+        latest = log[-1] if log else None
+        if latest and latest["etag"] == etag:
+            return latest
+        digest = _digest(paragraphs)
+        if latest and latest["digest"] == digest:
+            # 내용이 같은 재업로드는 새 버전을 만들지 않고 etag만 갱신
+            latest = dict(latest, etag=etag)
+            log[-1] = latest
+            _save_log(client, container, blob_name, log)
+            return latest
+
+        changes = None
+        if latest:
+            previous = load_paragraphs(client, container, blob_name, latest["version"])
+            if previous is not None:
+                diff = diff_paragraphs(previous, paragraphs)
+                changes = {k: diff[k] for k in ("added", "removed", "unchanged", "changed_ratio")}
+        version = latest["version"] + 1 if latest else 1
+        data = gzip.compress(json.dumps(paragraphs, ensure_ascii=False).encode("utf-8"))
+        sidecar.blob_client(client, container, _version_name(blob_name, version)).upload_blob(data, overwrite=True)
+        entry = {"version": version, "etag": etag, "created": time.time(), "paragraphs": len(paragraphs),
+                 "digest": digest, "changes": changes}
+        log.append(entry)
+
+        # 보관 개수를 넘은 오래된 버전 단락은 삭제 (목록에는 통계만 남김)
+        for old in log[:-VERSION_MAX_KEEP]:
+            if old.get("stored", True):
+                _delete_blob(client, container, _version_name(blob_name, old["version"]))
+                old["stored"] = False
+        _save_log(client, container, blob_name, log)
+        span.set(version=version, **(changes or {}))
+        return entry
+
+def _save_log(client, container, blob_name, log):
+    data = json.dumps(log, ensure_ascii=False).encode("utf-8")
+    sidecar.blob_client(client, container, _log_name(blob_name)).upload_blob(data, overwrite=True)
+    with _lock:
+        _logs[(container, blob_name)] = (time.monotonic(), log)
+
+def _delete_blob(client, container, name):
+    try:
+        sidecar.blob_client(client, container, name).delete_blob()
+    except ResourceNotFoundError:
+        pass
+
+def delete_versions(client: BlobServiceClient, container: str, blob_name: str):
+    for entry in list_versions(client, container, blob_name):
+        if entry.get("stored", True):
+            _delete_blob(client, container, _version_name(blob_name, entry["version"]))
+    _delete_blob(client, container, _log_name(blob_name))
+    with _lock:
+        _logs.pop((container, blob_name), None)
+
+def changed_sections(old: list, new: list, context: int = 1) -> list:
+    # 변경 부분만 앞뒤 context개 단락과 함께 묶음 → [{"before": [...], "after": [...], "context": [...]}]
+    sections = []
+    for tag, i1, i2, j1, j2 in diff_paragraphs(old, new)["ops"]:
+        if tag == "equal":
+            continue
+        sections.append({
+            "tag": tag,
+            "before": old[i1:i2],
+            "after": new[j1:j2],
+            "context": new[max(0, j1 - context):j1] + new[j2:j2 + context],
+        })
+    return sections
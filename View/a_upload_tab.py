@@ -1,31 +1,83 @@
 import streamlit as st
 import os
 from azure.storage.blob import BlobServiceClient
+from azure.ai.textanalytics import TextAnalyticsClient
+from Service import blob_inventory, local_index, versions
+from Service.uploader import content_hash, upload_files
+from Service.ingest import ingest, delete_artifact
 
 # 외부에서 주입받을 blob 클라이언트
 blob_service_client = None
+language_client = None
 CONTAINER_NAME = "word-data"
 
 def init_blob_service_a(client: BlobServiceClient):
     global blob_service_client
     blob_service_client = client
 
+def init_language_client_a(client: TextAnalyticsClient):
+    global language_client
+    language_client = client
+
+def ingest_uploaded(result, data):
+    # 업로드 직후 텍스트/청크/키워드를 미리 계산해 sidecar artifact로 저장
+    artifact = ingest(blob_service_client, CONTAINER_NAME, result["name"], result["etag"], language_client, data=data)
+    local_index.add_document(result["name"], result["etag"], artifact["retrieval_chunks"])  # 로컬 검색에 즉시 반영
+    summary = f"{len(artifact['paragraphs'])}개 단락"
+    history = versions.list_versions(blob_service_client, CONTAINER_NAME, result["name"])
+    if history and history[-1]["changes"]:
+        # 같은 이름의 이전 버전이 있으면 변경 단락 수도 함께 표시
+        changes = history[-1]["changes"]
+        summary += f" · 버전 {history[-1]['version']}, 이전 대비 +{changes['added']}/-{changes['removed']}개 단락"
+    return summary
+
 def upload_tab():
     st.header("📁 Word 파일 업로드 / 파일명 특수문자 제외")
-    uploaded_file = st.file_uploader("Word (.docx) 파일을 업로드하세요", type="docx")
-    if uploaded_file:
-        blob_client = blob_service_client.get_blob_client(container=CONTAINER_NAME, blob=uploaded_file.name)
-        blob_client.upload_blob(uploaded_file, overwrite=True)
-        st.success(f"{uploaded_file.name} 파일이 Azure에 업로드되었습니다.")
-        st.session_state["refresh_list"] = True  # 목록 갱신 플래그 설정
+    uploaded_files = st.file_uploader("Word (.docx) 파일을 업로드하세요", type="docx", accept_multiple_files=True)
+
+    # file_uploader는 rerun마다 같은 파일을 다시 돌려주므로 새 파일만 처리
+    # 업로드에 성공했거나 중복으로 건너뛴 파일만 처리 완료로 기록 (실패한 파일은 다음 rerun에서 다시 시도)
+    done_ids = st.session_state.setdefault("uploaded_file_ids", set())
+    new_files = [f for f in uploaded_files or [] if f.file_id not in done_ids]
+    if new_files:
+        pending = []
+        file_ids = {}
+        for uploaded_file in new_files:
+            data = uploaded_file.getvalue()
+            digest = content_hash(data)
+            # 🔁 같은 내용이 이미 컨테이너(또는 이번 업로드 목록)에 있으면 건너뜀
+            existing = blob_inventory.find_by_hash(blob_service_client, CONTAINER_NAME, digest)
+            duplicate = next((name for name, _, d in pending if d == digest), None)
+            if existing or duplicate:
+                done_ids.add(uploaded_file.file_id)
+                st.info(f"⏭️ {uploaded_file.name}: 동일한 내용의 파일({existing['name'] if existing else duplicate})이 이미 있어 건너뜁니다.")
+                continue
+            pending.append((uploaded_file.name, data, digest))
+            file_ids[uploaded_file.name] = uploaded_file.file_id
+
+        if pending:
+            with st.spinner(f"{len(pending)}개 파일 업로드 중..."):
+                for name, result in upload_files(blob_service_client, CONTAINER_NAME, pending, after_upload=ingest_uploaded):
+                    if isinstance(result, Exception):
+                        st.error(f"❌ {name} 업로드 실패: {result}")
+                        continue
+                    done_ids.add(file_ids[name])
+                    uploaded = (f"{name} 파일이 Azure에 업로드되었습니다. "
+                                f"({result['bytes'] / 1024 / 1024:.1f}MB · 블록 {result['blocks']}개 · "
+                                f"{result['elapsed']:.1f}초 · {result['mb_per_sec']:.1f}MB/s")
+                    if isinstance(result["after_upload"], Exception):
+                        # 파일은 올라갔으므로 다시 올릴 필요 없음 (사전 분석은 요약/검색 시 다시 시도됨)
+                        st.warning(f"⚠️ {uploaded}) — 사전 분석 실패: {result['after_upload']}")
+                    else:
+                        st.success(f"{uploaded} · 사전 분석 {result['after_upload']})")
+            blob_inventory.invalidate(CONTAINER_NAME)  # 목록 캐시 갱신
 
     st.divider()
     st.subheader("🗂️ Word 파일 조회 및 삭제")
 
     try:
         container_client = blob_service_client.get_container_client(CONTAINER_NAME)
-        blobs = container_client.list_blobs()
-        docx_files = [blob.name for blob in blobs if blob.name.endswith(".docx")]
+        docx_files = [blob["name"] for blob in blob_inventory.list_docx(blob_service_client, CONTAINER_NAME)]
 
         if docx_files:
             for file_name in docx_files:
@@ -37,7 +89,10 @@ def upload_tab():
                     if delete_button:
                         blob_client = container_client.get_blob_client(file_name)
                         blob_client.delete_blob()
-                        st.session_state["refresh_list"] = True  # 삭제 후 플래그 설정
+                        delete_artifact(blob_service_client, CONTAINER_NAME, file_name)
+                        versions.delete_versions(blob_service_client, CONTAINER_NAME, file_name)
+                        local_index.remove_document(file_name)
+                        blob_inventory.invalidate(CONTAINER_NAME)  # 삭제 후 목록 캐시 갱신
                         st.rerun()  # 즉시 리렌더링
         else:
             st.info("현재 저장된 Word 파일이 없습니다.")
@@ -1,11 +1,17 @@
 import streamlit as st
-from azure.core.credentials import AzureKeyCredential
 from azure.ai.textanalytics import TextAnalyticsClient
 from azure.storage.blob import BlobServiceClient
 from openai import AzureOpenAI
-import time
 import re
-import docx, tempfile, os
+from Service import blob_inventory
+from Service.ingest import get_artifact
+from Service.text_utils import clean_text
+from Service.language_batch import analyze_chunks
+from Service.gpt_stream import stream_completion, format_stats
+from Service import completion_cache, jobs, versions
+from Service.map_reduce import MAP_REDUCE_TOKEN_THRESHOLD, needs_map_reduce, map_reduce_summary
+from Service.token_budget import count_tokens, estimate_cost, fit_parts, budget_table
+from View.job_view import follow_job, stop_button
 
 language_client = None
 blob_service_client = None
@@ -14,30 +20,44 @@ deployment_name = None
 
 CONTAINER_NAME = "word-data"
 
+# 다른 화면으로 이동했다 돌아와도 유지할 위젯 값 (View.navigation에서 사용)
+STATE_KEYS = ["summary_file", "summary_instruction", "summary_bypass_cache"]
+
+DEVELOPER_PROMPT = """
+                너는 금융권 RFP 문서를 참고하여 제안서를 작성하는 전문가다.  
+                - 금융 IT 시스템, 최신 기술 트렌드, 규제 환경에 정통하다.  
+                - RFP 요구사항을 정확히 분석해, 실현 가능한 솔루션과 명확한 근거를 제시한다.  
+                - 제안서는 논리적 구조(요구사항, 솔루션, 일정, 예산, 리스크 등)로 작성하며, 근거와 데이터, 표를 활용해 신뢰도를 높인다.  
+                - 복잡한 용어는 쉽게 풀어 설명하고, 허위·과장·비현실적 내용은 배제한다.  
+                - 법적·윤리적 기준과 금융 규제를 최대한 준수한다.  
+                - 가능하다면 실제 금융권 RFP 사례를 참고해 설득력 있는 제안서를 작성하라.
+            """
+
+
+DELTA_PROMPT = """다음은 같은 RFP 문서의 이전 버전과 개정 버전 사이에 바뀐 부분입니다.
+[삭제]는 이전 버전에만, [추가]는 개정 버전에만 있는 단락이고, [주변]은 위치 파악을 위한 바뀌지 않은 단락입니다.
+1. 변경 사항을 항목별로 정리하세요 (요구사항/일정/예산/평가 기준/제출 조건 등으로 구분).
+2. 각 변경이 제안서 작성에 주는 영향과 다시 검토해야 할 부분을 설명하세요.
+3. 단순 오탈자/서식 수정은 한 줄로 묶어 언급하세요.
+형식은 Markdown 표를 활용하세요.
+\"\"\"{text}\"\"\""""
+DELTA_MAX_OUTPUT_TOKENS = 2000
+
 
 # 초기화 함수들
-def init_language_client(endpoint, key):
+def init_language_client(client: TextAnalyticsClient):
     global language_client
-    language_client = TextAnalyticsClient(endpoint=endpoint, credential=AzureKeyCredential(key))
+    language_client = client
 
 def init_blob_service_b(client: BlobServiceClient):
     global blob_service_client
     blob_service_client = client
 
-def init_gpt_b(endpoint, key, deployment):
+def init_gpt_b(client: AzureOpenAI, deployment):
     global gpt_client, deployment_name
-    # gpt_client = AzureOpenAI(api_key=key, api_version="2024-07-18-preview", azure_endpoint=endpoint)
-    # gpt_client = AzureOpenAI(api_key=key, api_version="2024-07-18", azure_endpoint=endpoint)
-    gpt_client = AzureOpenAI(api_key=key, api_version="2024-04-01-preview", azure_endpoint=endpoint)
+    gpt_client = client
     deployment_name = deployment
 
-def clean_text(text: str) -> str:
-    # 특수문자 제거 + 공백 정리 + 숫자 제거
-    text = re.sub(r"[^\w\s가-힣]", " ", text)       # 특수문자 제거
-    text = re.sub(r"\d+", " ", text)               # 숫자 제거
-    text = re.sub(r"\s+", " ", text)               # 공백 정리
-    return text.strip()
-
 # UI 구성 함수
 def summary_tab():
     # Language Service 입력 문서 분할 처리: 최대 5120 텍스트 요소 초과 시 오류 → 단락별로 나눠서 처리
@@ -49,14 +69,15 @@ def summary_tab():
         return
 
     # 📄 문서 목록 불러오기
-    container_client = blob_service_client.get_container_client(CONTAINER_NAME)
-    docx_files = [blob.name for blob in container_client.list_blobs() if blob.name.endswith(".docx")]
+    docx_files = [blob["name"] for blob in blob_inventory.list_docx(blob_service_client, CONTAINER_NAME)]
 
     if not docx_files:
         st.info("📂 업로드된 문서가 없습니다.")
         return
 
-    selected_file = st.selectbox("요약할 문서를 선택하세요", docx_files)
+    if st.session_state.get("summary_file") not in docx_files:
+        st.session_state.pop("summary_file", None)  # 삭제된 문서가 선택되어 있던 경우
+    selected_file = st.selectbox("요약할 문서를 선택하세요", docx_files, key="summary_file")
 
     st.markdown("""
             <div style="font-size:10pt;">
@@ -88,190 +109,309 @@ def summary_tab():
         주의사항:
         - 형식은 Markdown 또는 표를 활용해 시각적으로 구성해 주세요.
         """
+    st.session_state.setdefault("summary_instruction", default_instruction)
     user_instruction = st.text_area(
         label="GPT 프롬프트 분석 항목을 입력하세요",
-        value=default_instruction,
-        height=180
+        height=180,
+        key="summary_instruction"
     )
 
+    bypass_cache = st.checkbox("♻️ 캐시된 GPT 응답 무시하고 새로 생성", key="summary_bypass_cache")
+
     if st.button("🚀 요약 시작", key="summary_button"):
         try:
-            # 📥 파일 다운로드 및 텍스트 추출
-            blob = blob_service_client.get_blob_client(CONTAINER_NAME, selected_file)
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".docx") as tmp:
-                tmp.write(blob.download_blob().readall())
-                tmp_path = tmp.name
-            
-            doc = docx.Document(tmp_path)
-            paragraphs = [p.text.strip() for p in doc.paragraphs if p.text.strip()]
-            full_text = "\n".join(paragraphs)
-            os.remove(tmp_path)
-            st.write("문서 길이:", len(full_text))
-
-            st.success("✅ 문서 추출 완료")
-
-            # 📏 텍스트 분할 (5120 요소 제한 고려)
-            max_chars = 4000
-            chunks = []
-            current = ""
-
-            for para in paragraphs:
-                if len(current) + len(para) < max_chars:
-                    current += para + "\n"
-                else:
-                    chunks.append(current)
-                    current = para + "\n"
-            if current:
-                chunks.append(current)
-
-            # ✂️ [1] 문서 요약 (SDK 5.3용 사용불가)
-            # st.subheader("✂️ Language 요약 결과")
-            # for idx, chunk in enumerate(chunks):
-            #     try:
-            #         task = AnalyzeTextOptions(
-            #             input_documents=[TextDocumentInput(id="1", text=chunk)],
-            #             tasks=[{
-            #                 "kind": TasksKind.SUMMARIZATION,
-            #                 "parameters": {
-            #                     "sentence_count": 5,
-            #                     "sort_by": "Rank"
-            #                 }
-            #             }]
-            #         )
-            #         poller = language_client.analyze_text(task)
-            #         results = poller.result()
-            #         for doc_result in results:
-            #             for task_result in doc_result.results:
-            #                 if task_result.kind.name == "summarization":
-            #                     st.markdown(f"📄 요약 블록 {idx+1}")
-            #                     for sentence in task_result.sentences:
-            #                         st.markdown(f"- {sentence.text}")
-            #     except Exception as e:
-            #         st.error(f"요약 블록 {idx+1} 오류: {e}")
-
-            for idx, chunk in enumerate(chunks):
-                try:
-                    cleaned_text = clean_text(chunk)
-
-                    with st.expander(f"🧩 Chunk {idx+1} 결과 ({len(chunk)}자)", expanded=False):
-                        st.markdown("### 🔑 핵심 키워드")
-                        phrase_result = language_client.extract_key_phrases([cleaned_text])
-                        for doc in phrase_result:
-                            if not doc.is_error:
-                                # ✨ 🔍 키워드 후처리 필터링 적용
-                                filtered_keywords = [
-                                    kw for kw in doc.key_phrases
-                                    if len(kw.strip()) > 2 and not re.search(r"\b의\b|\b년\b|\bSPI의\b", kw)
-                                ]
-                                unique_keywords = list(set(filtered_keywords))  # 중복 제거
-                                for kw in unique_keywords:
-                                    st.markdown(f"• {kw}")
-                            else:
-                                st.error(f"키워드 추출 실패 {e}")
-
-                        st.markdown("### 📑 문서 요약 문장")
-                        poller = language_client.begin_extract_summary([cleaned_text], max_sentence_count=8)
-                        summary_results = poller.result()
-                        for doc in summary_results:
-                            if not doc.is_error:
-                                for sentence in doc.sentences:
-                                    st.markdown(f"• {sentence.text}")
-                            else:
-                                st.error(f"요약 실패 {e}")
-                except Exception as e:
-                    st.error(f"❌ Chunk {idx+1} 처리 중 오류 발생: {e}")
-        
-            # # 🔸 감정 분석
-            # st.subheader("❤️ [2] 감정 분석")
-            # sentiment_result = language_client.analyze_sentiment([full_text])[0]
-            # if not sentiment_result.is_error:
-            #     st.write(f"전반적인 감정: `{sentiment_result.sentiment}`")
-            #     st.write("감정 점수:", sentiment_result.confidence_scores._asdict())
-        
+            etag = blob_inventory.get_etag(blob_service_client, CONTAINER_NAME, selected_file)
+            # ⚙️ 분석은 백그라운드 작업으로 실행 → 다른 위젯을 눌러 rerun되어도 중단되지 않고 결과에 다시 연결
+            st.session_state["summary_job_id"] = jobs.submit(
+                "summary",
+                lambda job: _run_summary(job, selected_file, etag, user_instruction, not bypass_cache),
+                key=("summary", selected_file, etag, user_instruction, bypass_cache),
+                force=bypass_cache,
+            )
         except Exception as e:
             st.error(f"문서 분석 오류: {e}")
-            # return
-
-        # 🧠 GPT 분석
-        st.subheader("🤖 GPT 요약 및 기술 분석")
 
-        gpt_input = full_text
-        prompt = f"""다음은 RFP 문서 원문입니다. 문서를 바탕으로 아래 항목을 전체적으로 스캔 후 step by step으로 자료 분석 및 작성해주세요. :
-                \"\"\"{gpt_input}\"\"\"
+    # 🕘 같은 이름으로 다시 올린 문서면 이전 버전 대비 변경 부분만 분석 (전체 분석보다 적은 토큰)
+    history = versions.list_versions(blob_service_client, CONTAINER_NAME, selected_file)
+    if len(history) >= 2:
+        latest = history[-1]
+        changes = latest["changes"]
+        if changes:
+            st.caption(f"🕘 버전 {latest['version']} · 이전 버전 대비 추가/변경 {changes['added']}개 · "
+                       f"삭제 {changes['removed']}개 · 유지 {changes['unchanged']}개 단락")
+        if st.button("🔍 이전 버전 대비 변경 사항 분석", key="delta_button"):
+            previous = history[-2]["version"]
+            st.session_state["delta_job_id"] = jobs.submit(
+                "delta",
+                lambda job: _run_delta(job, selected_file, previous, latest["version"], not bypass_cache),
+                key=("delta", selected_file, latest["etag"], bypass_cache),
+                force=bypass_cache,
+            )
+
+    job_id = st.session_state.get("delta_job_id")
+    if job_id:
+        _show_delta_job(job_id)
+
+    job_id = st.session_state.get("summary_job_id")
+    if job_id:
+        _show_summary_job(job_id)
+
+
+def _run_summary(job, selected_file, etag, user_instruction, use_cache):
+    # 작업 스레드에서 실행 (st.* 호출 없이 job에 진행 상황/중간 결과만 기록)
+    # 📥 업로드 시 만들어 둔 사전 분석 결과(단락/청크/키워드) 불러오기
+    job.set_progress("문서 로드")
+    artifact = get_artifact(blob_service_client, CONTAINER_NAME, selected_file, etag, language_client)
+    paragraphs = artifact["paragraphs"]
+    full_text = "\n".join(paragraphs)
+
+    # 📏 텍스트 분할 (5120 요소 제한 고려)
+    chunks = artifact["language_chunks"]
+
+    # 🔑 키워드 + 📑 요약: 청크를 배치로 묶어 동시에 요청 (키워드는 사전 분석 결과가 있으면 재사용)
+    job.set_progress("Language 분석", message=f"Language 분석 중... ({len(chunks)}개 청크)")
+    cleaned_texts = [clean_text(chunk) for chunk in chunks]
+    tasks = ("sentences",) if artifact["key_phrases"] is not None else ("key_phrases", "sentences")
+    chunk_results = analyze_chunks(language_client, cleaned_texts, max_sentence_count=8, tasks=tasks, use_cache=use_cache)
+    if artifact["key_phrases"] is not None:
+        for result, key_phrases in zip(chunk_results, artifact["key_phrases"]):
+            result["key_phrases"] = key_phrases
+    job.publish(file=selected_file, text_length=len(full_text),
+                chunks=[dict(result, length=len(chunk)) for chunk, result in zip(chunks, chunk_results)])
+
+    prompt = f"""다음은 RFP 문서 원문입니다. 문서를 바탕으로 아래 항목을 전체적으로 스캔 후 step by step으로 자료 분석 및 작성해주세요. :
+                \"\"\"{full_text}\"\"\"
                 \"\"\"{user_instruction}\"\"\"
                 문서 내용:"""
 
-        st.write("문서 길이:", len(full_text))
-        st.write("전달 된 문서 길이:", len(gpt_input))
-        st.write("GPT에 보낸 prompt 길이:", len(prompt))
+    # 🧮 전송 전 토큰 예산 점검 (문서는 자르지 않고, 예산을 넘으면 분할 요약 경로로 보냄)
+    budget_report = fit_parts({"system": DEVELOPER_PROMPT, "document": full_text, "instruction": user_instruction})
+    # 📚 문서가 토큰 임계값 또는 예산을 넘으면 map-reduce 요약으로 자동 전환
+    use_map_reduce = needs_map_reduce(full_text) or not budget_report["fits"]
+    job.publish(prompt_length=len(prompt),
+                budget={"table": budget_table(budget_report), "total": budget_report["total"],
+                        "budget": budget_report["budget"], "cost": budget_report["cost"]},
+                map_reduce=use_map_reduce,
+                threshold=min(MAP_REDUCE_TOKEN_THRESHOLD, budget_report["budget"]))
+
+    # 🚦 429 재시도/대기는 공용 스케줄러(rate_limiter)가 Retry-After 기준으로 처리
+    job.set_progress("OpenAI 응답 대기")
+    if use_map_reduce:
+        gpt_response = map_reduce_summary(
+            gpt_client, deployment_name, DEVELOPER_PROMPT, paragraphs, user_instruction,
+            on_progress=lambda stage, done, total: job.set_progress(stage, done, total, f"🧩 {stage} 단계 {done}/{total} 완료"),
+            on_update=job.stream_writer(),
+            use_cache=use_cache,
+            on_wait=job.wait_writer()
+        )
+        gpt_response.pop("merged_summary", None)
+    else:
+        gpt_response = stream_completion(
+            gpt_client, deployment_name,
+            messages=[
+                {"role": "system", "content": DEVELOPER_PROMPT},
+                {"role": "user", "content": prompt}],
+            on_update=job.stream_writer(),
+            use_cache=use_cache,
+            on_wait=job.wait_writer()
+        )
+    return gpt_response
+
+def _format_sections(sections):
+    blocks = []
+    for section in sections:
+        lines = [f"[주변] {p}" for p in section["context"]]
+        lines += [f"[삭제] {p}" for p in section["before"]]
+        lines += [f"[추가] {p}" for p in section["after"]]
+        blocks.append("\n".join(lines))
+    return "\n---\n".join(blocks)
+
+def _run_delta(job, selected_file, old_version, new_version, use_cache):
+    # 두 버전의 단락을 비교해 바뀐 부분(+주변 단락)만 GPT에 전송
+    job.set_progress("버전 비교")
+    old = versions.load_paragraphs(blob_service_client, CONTAINER_NAME, selected_file, old_version)
+    new = versions.load_paragraphs(blob_service_client, CONTAINER_NAME, selected_file, new_version)
+    if old is None or new is None:
+        raise ValueError("비교할 버전의 단락이 보관 기간이 지나 삭제되었습니다.")
+    sections = versions.changed_sections(old, new)
+    diff = versions.diff_paragraphs(old, new)
+    full_tokens = count_tokens("\n".join(new))
+    job.publish(file=selected_file, versions=(old_version, new_version),
+                changes={k: diff[k] for k in ("added", "removed", "unchanged")},
+                sections=sections[:50], section_count=len(sections))
+    if not sections:
+        return {"content": "이전 버전과 비교해 바뀐 단락이 없습니다."}
+
+    report = fit_parts({"system": DEVELOPER_PROMPT, "changes": _format_sections(sections)}, trim_order=("changes",))
+    job.publish(budget={"total": report["total"], "cost": report["cost"], "trimmed": bool(report["trimmed"]),
+                        "full_total": full_tokens, "full_cost": estimate_cost(full_tokens)})
+
+    job.set_progress("OpenAI 응답 대기")
+    return stream_completion(
+        gpt_client, deployment_name,
+        messages=[
+            {"role": "system", "content": DEVELOPER_PROMPT},
+            {"role": "user", "content": DELTA_PROMPT.format(text=report["parts"]["changes"])}],
+        on_update=job.stream_writer(),
+        use_cache=use_cache,
+        on_wait=job.wait_writer(),
+        max_tokens=DELTA_MAX_OUTPUT_TOKENS,
+    )
 
-        # time
-        max_retries = 1
-        retry_count = 0
-        gpt_response = None
+def _show_sections(data):
+    changes = data["changes"]
+    old_version, new_version = data["versions"]
+    title = (f"🕘 버전 {old_version} → {new_version}: 변경 {data['section_count']}곳 "
+             f"(+{changes['added']} / -{changes['removed']}개 단락, 유지 {changes['unchanged']}개)")
+    with st.expander(title, expanded=False):
+        for section in data["sections"]:
+            for p in section["before"]:
+                st.markdown(f"➖ ~~{p}~~")
+            for p in section["after"]:
+                st.markdown(f"➕ {p}")
+            st.divider()
+        if data["section_count"] > len(data["sections"]):
+            st.caption(f"... 외 {data['section_count'] - len(data['sections'])}곳")
+
+def _show_delta_job(job_id):
+    stop_button(job_id, key="delta_stop_button")
+    st.subheader("🔍 변경 사항 분석")
+    sections_area = st.container()
+    status_text = st.empty()
+    result_body = st.expander("변경 분석 결과", expanded=True).empty()
+
+    shown = set()
+    def on_poll(job):
+        data = job["data"]
+        if "sections" in data and "sections" not in shown:
+            shown.add("sections")
+            with sections_area:
+                _show_sections(data)
+        if "budget" in data and "budget" not in shown:
+            shown.add("budget")
+            budget = data["budget"]
+            with sections_area:
+                st.caption(f"🧮 전송 {budget['total']:,} tokens (${budget['cost']:.3f}) · "
+                           f"전체 문서 {budget['full_total']:,} tokens (${budget['full_cost']:.3f})"
+                           + (" · ✂️ 변경 부분이 예산을 넘어 일부만 전송" if budget["trimmed"] else ""))
+
+    job = follow_job(job_id, status_text, result_body, on_poll=on_poll)
+    if job is None:
+        st.session_state.pop("delta_job_id", None)
+        status_text.empty()
+        return
+    if job["status"] == jobs.CANCELLED:
+        status_text.caption("⏹️ 작업이 중지되었습니다.")
+    elif job["status"] == jobs.ERROR:
+        status_text.text("❌ 오류 발생!")
+        st.error(f"변경 분석 오류: {job['error']}")
+    elif "tokens" in job["result"]:
+        status_text.caption(format_stats(job["result"]))
+    else:
+        status_text.empty()
+
+def _show_chunks(data):
+    st.write("문서 길이:", data["text_length"])
+    st.success(f"✅ 문서 추출 완료 ({data['file']})")
+    for idx, result in enumerate(data["chunks"]):
+        with st.expander(f"🧩 Chunk {idx+1} 결과 ({result['length']}자)", expanded=False):
+            st.markdown("### 🔑 핵심 키워드")
+            # ✨ 🔍 키워드 후처리 필터링 적용
+            filtered_keywords = [
+                kw for kw in result["key_phrases"]
+                if len(kw.strip()) > 2 and not re.search(r"\b의\b|\b년\b|\bSPI의\b", kw)
+            ]
+            unique_keywords = list(set(filtered_keywords))  # 중복 제거
+            for kw in unique_keywords:
+                st.markdown(f"• {kw}")
+
+            st.markdown("### 📑 문서 요약 문장")
+            for sentence in result["sentences"]:
+                st.markdown(f"• {sentence}")
+
+            for error in result["errors"]:
+                st.error(f"❌ Chunk {idx+1} 처리 중 오류 발생: {error}")
+
+def _show_budget(data):
+    st.write("문서 길이:", data["text_length"])
+    st.write("GPT에 보낸 prompt 길이:", data["prompt_length"])
+    budget = data["budget"]
+    with st.expander(f"🧮 전송 전 토큰 예산: {budget['total']:,} / {budget['budget']:,} tokens", expanded=False):
+        st.table(budget["table"])
+        st.caption(f"예상 입력 비용: ${budget['cost']:.3f}")
+    if data["map_reduce"]:
+        st.info(f"📚 문서가 {data['threshold']:,} 토큰을 초과하여 분할 요약(map-reduce) 모드로 분석합니다.")
+
+def _show_summary_job(job_id):
+    # 진행 중인 작업은 단계별 결과를 도착하는 대로 그리고, 끝난 작업은 저장된 결과를 바로 표시
+    stop_button(job_id, key="summary_stop_button")
+    document_area = st.container()
+    # 🧠 GPT 분석
+    st.subheader("🤖 GPT 요약 및 기술 분석")
+    plan_area = st.container()
+    progress_area = st.empty()
+    status_text = st.empty()
+    result_box = st.expander("분석 결과", expanded=True)
+    result_body = result_box.empty()
+
+    shown = set()
+    def on_poll(job):
+        data = job["data"]
+        if "chunks" in data and "chunks" not in shown:
+            shown.add("chunks")
+            with document_area:
+                _show_chunks(data)
+        if "budget" in data and "budget" not in shown:
+            shown.add("budget")
+            with plan_area:
+                _show_budget(data)
+        progress = job["progress"]
+        if data.get("map_reduce") and progress.get("total") and job["status"] == jobs.RUNNING:
+            progress_area.progress(progress["done"] / progress["total"])
+
+    job = follow_job(job_id, status_text, result_body, on_poll=on_poll)
+    progress_area.empty()
+    if job is None:
+        st.session_state.pop("summary_job_id", None)
+        status_text.empty()
+        return
+    if job["status"] == jobs.CANCELLED:
+        status_text.caption("⏹️ 작업이 중지되었습니다.")
+        return
+    if job["status"] == jobs.ERROR:
+        status_text.text("❌ 오류 발생!")
+        st.error(f"{'GPT 호출' if 'budget' in job['data'] else '문서 분석'} 오류: {job['error']}")
+        return
 
-        developer = """
-                너는 금융권 RFP 문서를 참고하여 제안서를 작성하는 전문가다.  
-                - 금융 IT 시스템, 최신 기술 트렌드, 규제 환경에 정통하다.  
-                - RFP 요구사항을 정확히 분석해, 실현 가능한 솔루션과 명확한 근거를 제시한다.  
-                - 제안서는 논리적 구조(요구사항, 솔루션, 일정, 예산, 리스크 등)로 작성하며, 근거와 데이터, 표를 활용해 신뢰도를 높인다.  
-                - 복잡한 용어는 쉽게 풀어 설명하고, 허위·과장·비현실적 내용은 배제한다.  
-                - 법적·윤리적 기준과 금융 규제를 최대한 준수한다.  
-                - 가능하다면 실제 금융권 RFP 사례를 참고해 설득력 있는 제안서를 작성하라.
-            """
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-
-        while retry_count < max_retries:
-            try:
-                for i in range(101):  # 예: 진행률을 10단계로 나누어 대기 시간 동안 보여줌
-                    progress_value = min(max(i, 0), 100)
-                    progress_bar.progress(progress_value)
-                    status_text.text(f"OpenAI 응답 기다리는 중... ({i + 1}/30)")
-
-                gpt_response = gpt_client.chat.completions.create(
-                    model=deployment_name,
-                    messages=[
-                        {"role": "system", "content": developer},
-                        {"role": "user", "content": prompt}]
-                )
-                status_text.text("✅ 응답 수신 완료!")
-                progress_bar.empty()
-                break  # 정상적으로 응답 받으면 반복 종료
-            except Exception as e:
-                status_text.text("❌ 오류 발생!")
-                progress_bar.empty()
-                if "429" in str(e):
-                    retry_count += 1
-                    st.warning(f"🚦 GPT 호출이 제한되었어요. {30}초 대기 후 다시 시도합니다... (시도 {retry_count}/{max_retries})")
-                    time.sleep(20)
-                else:
-                    st.error(f"GPT 호출 오류: {e}")
-                    break
-
-        # ✅ 토큰 사용량 분석
-        if gpt_response and hasattr(gpt_response, "usage"):
-            token_info = gpt_response.usage
-            st.write("🔢 GPT 토큰 사용량")
-            st.write(f"- 입력 tokens: {token_info.prompt_tokens}")
-            st.write(f"- 출력 tokens: {token_info.completion_tokens}")
-            st.write(f"- 전체 tokens: {token_info.total_tokens}")
-
-            # 📌 토큰 수 기준 자동 경고
-            total_used = token_info.total_tokens
-            if total_used > 80000:
-                st.warning("⚠️ 현재 프롬프트와 출력 토큰 수가 80,000을 초과했어요. GPT의 입력 한도(128,000)에 근접하고 있어요.")
-                st.markdown("✅ 문서 내용 슬라이싱을 더 줄이거나, chunk 방식으로 분할 요약하는 게 안전해요.")
-            elif total_used > 100000:
-                st.error("🚨 거의 한계치에 도달했어요. 문서 길이를 줄이는 것이 꼭 필요합니다.")
-
-        with st.expander(f"분석 결과", expanded=False):        
-            # 결과 처리
-            if gpt_response:
-                content = gpt_response.choices[0].message.content.strip()
-                if content:
-                    st.markdown(content)
-                else:
-                    st.warning("GPT 응답이 비어 있어요.")
-            else:
-                st.error("GPT 호출에 반복 실패했습니다. 나중에 다시 시도해 주세요.")
\ No newline at end of file
+    # 결과 처리
+    gpt_response = job["result"]
+    status_text.caption(format_stats(gpt_response))
+    if not gpt_response["content"].strip():
+        result_body.warning("GPT 응답이 비어 있어요.")
+    if "map_count" in gpt_response:
+        st.caption(f"🧩 map {gpt_response['map_count']}회 · reduce {gpt_response['reduce_passes']}단계")
+
+    stats = completion_cache.cache_stats()
+    st.caption(f"💾 GPT 응답 캐시: hit {stats['hit']} · miss {stats['miss']} · 저장 {stats['entries']}건")
+
+    # ✅ 토큰 사용량 분석
+    token_info = gpt_response["usage"]
+    st.write("🔢 GPT 토큰 사용량")
+    if token_info:
+        if token_info.get("estimated"):
+            st.caption("응답에 usage가 없어 토큰 수를 추정했습니다.")
+        st.write(f"- 입력 tokens: {token_info['prompt_tokens']}")
+        st.write(f"- 출력 tokens: {token_info['completion_tokens']}")
+        st.write(f"- 전체 tokens: {token_info['total_tokens']}")
+        total_used = token_info["total_tokens"]
+    else:
+        # usage 없이 저장된 예전 캐시 응답이면 수신한 청크 수로 출력 토큰을 표시
+        st.write(f"- 출력 tokens (스트림 기준): {gpt_response['tokens']}")
+        total_used = 0
+
+    # 📌 토큰 수 기준 자동 경고
+    if total_used > 100000:
+        st.error("🚨 거의 한계치에 도달했어요. 문서 길이를 줄이는 것이 꼭 필요합니다.")
+    elif total_used > 80000:
+        st.warning("⚠️ 현재 프롬프트와 출력 토큰 수가 80,000을 초과했어요. GPT의 입력 한도(128,000)에 근접하고 있어요.")
+        st.markdown("✅ 문서 내용 슬라이싱을 더 줄이거나, chunk 방식으로 분할 요약하는 게 안전해요.")
@@ -1,67 +1,190 @@
+import math
+import time
 import streamlit as st
-import requests
+from azure.storage.blob import BlobServiceClient
+from Service import search_client, local_index
 
 # Azure Search 설정
 search_service_name = None
 search_api_key = None
 index_name = "basic"
 
+# 로컬 인덱스 동기화용 blob 클라이언트
+blob_service_client = None
+CONTAINER_NAME = "word-data"
+
+# 검색 엔진: Azure Search / 로컬 역색인 / 두 결과를 RRF(Reciprocal Rank Fusion)로 병합
+BACKENDS = ["Azure Search", "로컬 인덱스", "하이브리드"]
+HYBRID_DEPTH = 20   # 병합 전 엔진별로 가져올 상위 결과 수
+RRF_K = 60
+
+# 다른 화면으로 이동했다 돌아와도 유지할 위젯 값 (View.navigation에서 사용)
+STATE_KEYS = ["search_keyword", "search_backend", "search_fields"]
+
 def init_serach_c(service_name, api_key):
     global search_service_name, search_api_key
     search_service_name = service_name
     search_api_key = api_key
 
+def init_blob_service_c(client: BlobServiceClient):
+    global blob_service_client
+    blob_service_client = client
+
+def _azure_item(doc):
+    return {
+        "name": doc.get("name"),
+        "title": doc.get("title") or doc.get("name") or "(제목 없음)",
+        "lines": [f"… {h} …" for h in doc["highlights"]],
+        "caption": f"🕒 작성일: {doc.get('created') or 'N/A'} | 작성자: {doc.get('author') or 'N/A'}",
+        "key": doc["key"],
+        "passages": None,
+        "sources": ["Azure"],
+    }
+
+def _local_item(doc):
+    return {
+        "name": doc["name"],
+        "title": doc["name"],
+        "lines": [doc["snippet"]],
+        "caption": f"📊 점수: {doc['score']:.2f}",
+        "key": None,
+        "passages": doc["passages"],
+        "sources": ["로컬"],
+    }
+
+def _sync_local_index():
+    # 동기화는 백그라운드 스레드에서 (검색은 기다리지 않고 현재 색인으로 실행)
+    local_index.sync_in_background(blob_service_client, CONTAINER_NAME)
+    if local_index.syncing():
+        st.caption("🔄 로컬 인덱스 동기화 중... (현재 색인으로 검색합니다)")
+    error = local_index.last_error(CONTAINER_NAME)
+    if error:
+        st.warning(f"⚠️ 로컬 인덱스 동기화 실패 (기존 색인으로 검색): {error}")
+    waiting = local_index.pending(CONTAINER_NAME)
+    if waiting:
+        st.caption(f"⏳ 사전 분석 전인 문서 {waiting}개는 로컬 인덱스에 아직 포함되지 않았습니다.")
+
+def _show_warnings(result):
+    for warning in result.get("warnings", []):
+        st.warning(f"⚠️ {warning}")
+
+def _search_page(backend, query, fields, page, page_size):
+    # 반환: (항목 목록, 전체 건수, 출처 설명)
+    if backend == "Azure Search":
+        result = search_client.search(search_service_name, search_api_key, index_name, query, list(fields), page=page)
+        _show_warnings(result)
+        source = "캐시" if result["cached"] else f"{result['elapsed']:.2f}초"
+        return [_azure_item(doc) for doc in result["items"]], result["count"], f"Azure Search · {source}"
+
+    _sync_local_index()
+    if backend == "로컬 인덱스":
+        result = local_index.search(query, top=page_size, skip=page * page_size)
+        return [_local_item(doc) for doc in result["items"]], result["count"], f"로컬 인덱스 · {result['elapsed'] * 1000:.1f}ms"
+
+    # 하이브리드: 엔진별 순위로 RRF 점수를 더하고 같은 blob은 하나로 합침
+    # Azure Search가 실패하면 로컬 결과만으로 순위를 매기고 출처 설명에 경고를 남김
+    start = time.perf_counter()
+    note = ""
+    try:
+        azure = search_client.search(search_service_name, search_api_key, index_name, query, list(fields),
+                                     page_size=HYBRID_DEPTH)
+        _show_warnings(azure)
+    except search_client.SearchError as e:
+        azure = {"items": []}
+        note = f" · ⚠️ Azure Search 실패로 로컬 결과만 표시 ({e})"
+    local = local_index.search(query, top=HYBRID_DEPTH)
+    merged = {}
+    for items in ([_azure_item(doc) for doc in azure["items"]], [_local_item(doc) for doc in local["items"]]):
+        for rank, item in enumerate(items):
+            entry_key = item["name"] or item["key"]
+            entry = merged.get(entry_key)
+            if entry is None:
+                merged[entry_key] = entry = dict(item, rrf=0.0)
+            else:
+                entry["lines"] += item["lines"]
+                entry["sources"] += item["sources"]
+                entry["passages"] = entry["passages"] or item["passages"]
+                entry["key"] = entry["key"] or item["key"]
+            entry["rrf"] += 1 / (RRF_K + rank + 1)
+    ranked = sorted(merged.values(), key=lambda entry: entry["rrf"], reverse=True)
+    for entry in ranked:
+        entry["caption"] += f" | 🔗 {' + '.join(entry['sources'])} (RRF {entry['rrf']:.4f})"
+    return ranked[page * page_size:(page + 1) * page_size], len(ranked), f"하이브리드 · {time.perf_counter() - start:.2f}초{note}"
+
 # UI 구성 함수
 def search_tab():
     st.subheader("🔎 Azure Search 기반 문서 검색")
 
     # 검색 키워드 입력
-    keyword = st.text_input("검색할 키워드를 입력하세요")
+    keyword = st.text_input("검색할 키워드를 입력하세요", key="search_keyword")
+    backend = st.radio("검색 엔진", BACKENDS, horizontal=True, key="search_backend")
 
     # 전체 필드 목록
     all_fields = ["content", "title", "author", "file_type"]
 
     # 사용자 필드 선택
+    st.session_state.setdefault("search_fields", ["content"])
     selected_fields = st.multiselect(
         "검색할 필드를 선택하세요",
         options=all_fields,
-        default=["content"]
+        key="search_fields"
     )
 
     # 인덱스 정의 기준으로 검색 가능한 필드만 리스트로 구성
     searchable_fields = ["content"]  # 필드 중 searchable: true 인 것만
     valid_search_fields = [field for field in selected_fields if field in searchable_fields]
 
-    # 검색 URL 구성
-    search_url = f"{search_service_name}/indexes/{index_name}/docs/search?api-version=2023-10-01-Preview"
-
     if st.button("조회", key="search_basic_button"):
-        if keyword:
-            if not valid_search_fields:
-                st.warning("⚠️ 선택한 필드 중 검색 가능한 항목이 없습니다.")
-                return
-
-            headers = {
-                "Content-Type": "application/json",
-                "api-key": search_api_key
-            }
-
-            data = {
-                "search": keyword,
-                "searchFields": ",".join(valid_search_fields),
-                "top": 5
-            }
-
-            response = requests.post(search_url, headers=headers, json=data)
-
-            if response.status_code == 200:
-                results = response.json()
-                for doc in results.get("value", []):
-                    st.markdown(f"### 📄 제목: {doc.get('title', '(제목 없음)')}")
-                    st.write(doc.get("content", "(본문 없음)"))
-                    st.caption(f"🕒 작성일: {doc.get('created', 'N/A')} | 작성자: {doc.get('author', 'N/A')}")
-                    st.divider()
-            else:
-                st.error(f"❌ 검색 실패: {response.status_code} - {response.text}")
-        else:
+        if not keyword:
             st.warning("🔎 검색 키워드를 입력해 주세요.")
+            return
+        if not valid_search_fields:
+            st.warning("⚠️ 선택한 필드 중 검색 가능한 항목이 없습니다.")
+            return
+        # 새 조회는 첫 페이지부터, 결과는 rerun 후에도 유지
+        st.session_state["search_query"] = (backend, keyword, tuple(valid_search_fields))
+        st.session_state["search_page"] = 0
+
+    if "search_query" not in st.session_state:
+        return
+    backend, query, fields = st.session_state["search_query"]
+    page = st.session_state.get("search_page", 0)
+    page_size = search_client.PAGE_SIZE
+
+    try:
+        items, count, source = _search_page(backend, query, fields, page, page_size)
+    except search_client.SearchError as e:
+        st.error(f"❌ 검색 실패: {e}")
+        return
+
+    total_pages = max(1, math.ceil(count / page_size))
+    st.caption(f"'{query}' 검색 결과 {count}건 · {page + 1}/{total_pages} 페이지 · {source}")
+
+    for i, doc in enumerate(items):
+        st.markdown(f"### 📄 제목: {doc['title']}")
+        for line in doc["lines"]:
+            st.markdown(line)
+        st.caption(doc["caption"])
+
+        # 본문은 펼칠 때만 조회 (로컬 결과는 일치한 청크를 표시)
+        if (doc["key"] or doc["passages"]) and st.toggle("📄 본문 보기", key=f"search_content_{page}_{i}_{doc['key'] or doc['name']}"):
+            with st.container(height=400):
+                if doc["key"]:
+                    try:
+                        content = search_client.get_document(search_service_name, search_api_key, index_name, doc["key"])
+                        st.write(content.get("content") or "(본문 없음)")
+                    except search_client.SearchError as e:
+                        st.error(f"❌ 본문 조회 실패: {e}")
+                else:
+                    for passage in doc["passages"]:
+                        st.write(passage)
+                        st.divider()
+        st.divider()
+
+    col_prev, col_next = st.columns(2)
+    if col_prev.button("◀ 이전", key="search_prev_button", disabled=page == 0):
+        st.session_state["search_page"] = page - 1
+        st.rerun()
+    if col_next.button("다음 ▶", key="search_next_button", disabled=page + 1 >= total_pages):
+        st.session_state["search_page"] = page + 1
+        st.rerun()
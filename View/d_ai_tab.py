@@ -1,8 +1,17 @@
+import os
+import uuid
 import streamlit as st
-import requests
+import time
 from azure.storage.blob import BlobServiceClient
 from openai import AzureOpenAI
-import tempfile, os, docx
+from Service import blob_inventory
+from Service.ingest import get_artifact
+from Service.gpt_stream import stream_completion, format_stats
+from Service.retrieval import search, select_within_budget
+from Service.token_budget import fit_parts, budget_table, count_tokens
+from Service.pipeline import run_concurrently
+from Service import http_client, jobs, doc_store
+from View.job_view import follow_job, stop_button
 
 # Azure 설정 변수
 search_service_name = None
@@ -13,6 +22,40 @@ gpt_client = None
 deployment_name = None
 lang_search_key = None
 
+# 분석 시작 시 병렬 단계별 제한 시간 (초)
+DOCUMENT_TIMEOUT = 120
+WEB_SEARCH_TIMEOUT = 30
+
+# 후속 질문에 함께 보낼 최근 대화 수 / 이전 답변 최대 글자 수
+CHAT_RECENT_TURNS = 3
+CHAT_TURN_MAX_CHARS = 1500
+CHAT_TOKEN_BUDGET = 12000      # 질문 1회 입력 토큰 상한
+CHAT_HISTORY_MAX_TURNS = int(os.getenv("CHAT_HISTORY_MAX_TURNS", "10"))      # 세션에 원문으로 남길 최근 대화 수
+CHAT_SUMMARY_MAX_TOKENS = int(os.getenv("CHAT_SUMMARY_MAX_TOKENS", "800"))   # 오래된 대화 요약의 최대 토큰
+CHAT_SUMMARY_LINE_CHARS = 200  # 요약에 남길 질문/답변 앞부분 글자 수
+EXTERNAL_MIN_TOKENS = 1000     # 분석 시 외부 정보를 줄여도 남겨둘 최소 토큰
+
+DEVELOPER_PROMPT = """
+                너는 금융권 RFP 문서를 참고하여 제안서를 작성하는 전문가다.  
+                - 금융 IT 시스템, 최신 기술 트렌드, 규제 환경에 정통하다.  
+                - RFP 요구사항을 정확히 분석해, 실현 가능한 솔루션과 명확한 근거를 제시한다.  
+                - 제안서는 논리적 구조(요구사항, 솔루션, 일정, 예산, 리스크 등)로 작성하며, 근거와 데이터, 표를 활용해 신뢰도를 높인다.  
+                - 복잡한 용어는 쉽게 풀어 설명하고, 허위·과장·비현실적 내용은 배제한다.  
+                - 법적·윤리적 기준과 금융 규제를 최대한 준수한다.  
+                - 가능하다면 실제 금융권 RFP 사례를 참고해 설득력 있는 제안서를 작성하라.
+            """
+# 다른 화면으로 이동했다 돌아와도 유지할 위젯 값 (View.navigation에서 사용)
+STATE_KEYS = ["rag_file", "rag_prompt", "rag_keyword", "rag_bypass_cache", "chat_input"]
+DEFAULT_PROMPT = "1. 전체 내용을 간결한 한 단락으로 요약하세요.\n" \
+    "2. 문서에 언급된 핵심 주제 또는 도메인을 도출하고 정리하세요.\n" \
+    "3. 제안요청의 목적과 배경을 간단명료하게 설명하세요.\n" \
+    "4. 업무적 요구사항을 종합적으로 분석하여 자체적으로 항목을 만들어 구분된 조견표 형태로 출력하세요.\n" \
+    "5. 기술적 요구사항을 기능/비기능/운영/보안와 자체적으로 항목을 만들어 항목별로 구분된 조견표 형태로 출력하세요.\n" \
+    "6. 이 문서의 흐름에 맞춰 예상되는 목차 구조를 제안하세요 (예: 개요 → 요구사항 → 제안서 구성).\n" \
+    "7. 적합한 IT 기술 또는 유관 솔루션 중 본 문서의 요구사항과 연관된 추천 기술을 제시해주세요.\n" \
+    "8. 외부 검색 결과를 활용해 문서의 이해도를 높여주세요."
+CHAT_SYSTEM_PROMPT = "너는 금융 RFP 분석 전문가이며, 문서와 외부 정보를 함께 활용해 답변해요."
+
 def init_blob_service_d(client: BlobServiceClient):
     global blob_service_client
     blob_service_client = client
@@ -22,17 +65,33 @@ def init_serach_d(service_name, api_key):
     search_service_name = service_name
     search_api_key = api_key
 
-def init_gpt_d(endpoint, key, deployment):
+def init_gpt_d(client: AzureOpenAI, deployment):
     global gpt_client, deployment_name
-    # gpt_client = AzureOpenAI(api_key=key, api_version="2024-07-18-preview", azure_endpoint=endpoint)
-    # gpt_client = AzureOpenAI(api_key=key, api_version="2024-07-18", azure_endpoint=endpoint)
-    gpt_client = AzureOpenAI(api_key=key, api_version="2024-04-01-preview", azure_endpoint=endpoint)
+    gpt_client = client
     deployment_name = deployment
 
 def init_get_key(lang_key):
     global lang_search_key
     lang_search_key = lang_key
 
+def fetch_external_info(keyword, api_key):
+    # 🌐 LangSearch 검색 (POST 방식) → (요약 텍스트, 결과 건수)
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    }
+    body = {
+        "query": keyword,
+        "freshness": "noLimit",
+        "summary": True,
+        "count": 5
+    }
+    resp = http_client.post("langsearch", "https://api.langsearch.com/v1/web-search", headers=headers, json=body)
+    if resp.status_code != 200:
+        raise RuntimeError(f"LangSearch 실패: 상태코드 {resp.status_code}")
+    results = resp.json().get("results", [])
+    return "\n".join([r.get("summary", "") for r in results]), len(results)
+
 def ai_tab():
     st.header("🌐 LangSearch + 문서 기반 GPT 분석 (RAG 구조)")
 
@@ -42,127 +101,51 @@ def ai_tab():
         return
 
     # RFP 문서 선택
-    container_client = blob_service_client.get_container_client("word-data")
-    docx_files = [blob.name for blob in container_client.list_blobs() if blob.name.endswith(".docx")]
+    docx_files = [blob["name"] for blob in blob_inventory.list_docx(blob_service_client, "word-data")]
 
     if not docx_files:
         st.warning("📁 업로드된 RFP 문서가 없습니다.")
         return
 
-    selected_file = st.selectbox("📄 요약할 문서를 선택하세요", docx_files)
+    if st.session_state.get("rag_file") not in docx_files:
+        st.session_state.pop("rag_file", None)  # 삭제된 문서가 선택되어 있던 경우
+    selected_file = st.selectbox("📄 요약할 문서를 선택하세요", docx_files, key="rag_file")
     
-    user_prompt = st.text_area("GPT에게 요청할 작업 내용을 입력하세요", 
-        value="1. 전체 내용을 간결한 한 단락으로 요약하세요.\n" \
-            "2. 문서에 언급된 핵심 주제 또는 도메인을 도출하고 정리하세요.\n" \
-            "3. 제안요청의 목적과 배경을 간단명료하게 설명하세요.\n" \
-            "4. 업무적 요구사항을 종합적으로 분석하여 자체적으로 항목을 만들어 구분된 조견표 형태로 출력하세요.\n" \
-            "5. 기술적 요구사항을 기능/비기능/운영/보안와 자체적으로 항목을 만들어 항목별로 구분된 조견표 형태로 출력하세요.\n" \
-            "6. 이 문서의 흐름에 맞춰 예상되는 목차 구조를 제안하세요 (예: 개요 → 요구사항 → 제안서 구성).\n" \
-            "7. 적합한 IT 기술 또는 유관 솔루션 중 본 문서의 요구사항과 연관된 추천 기술을 제시해주세요.\n" \
-            "8. 외부 검색 결과를 활용해 문서의 이해도를 높여주세요.",
-        height=150
-    )
-    keyword = st.text_input("🌐 외부 정보 검색 키워드를 입력하세요", value="금융")
+    st.session_state.setdefault("rag_prompt", DEFAULT_PROMPT)
+    user_prompt = st.text_area("GPT에게 요청할 작업 내용을 입력하세요", height=150, key="rag_prompt")
+    st.session_state.setdefault("rag_keyword", "금융")
+    keyword = st.text_input("🌐 외부 정보 검색 키워드를 입력하세요", key="rag_keyword")
     # langsearch_api_key = st.text_input("🔑 LangSearch API 키 입력", type="password")
     langsearch_api_key = lang_search_key
 
+    bypass_cache = st.checkbox("♻️ 캐시된 GPT 응답 무시하고 새로 생성", key="rag_bypass_cache")
+
     # 프롬프트 입력 & 외부 검색어
-    if st.button("🚀 분석 시작", key="rag_analysis_button"):        
+    if st.button("🚀 분석 시작", key="rag_analysis_button"):
         try:
-            # 🔽 문서 다운로드 및 텍스트 추출
-            blob = blob_service_client.get_blob_client("word-data", selected_file)
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".docx") as tmp:
-                tmp.write(blob.download_blob().readall())
-                tmp_path = tmp.name
-
-            doc = docx.Document(tmp_path)
-            paragraphs = [p.text.strip() for p in doc.paragraphs if p.text.strip()]
-            document_text = "\n".join(paragraphs)
-            os.remove(tmp_path)
-
-            st.success("✅ 문서 텍스트 추출 완료")
-            st.write(f"📏 문서 길이: {len(document_text)}자")
-
-            # 🌐 LangSearch 검색 (POST 방식)
-            external_info = ""
-            try:
-                headers = {
-                    "Authorization": f"Bearer {langsearch_api_key}",
-                    "Content-Type": "application/json"
-                }
-                body = {
-                    "query": keyword,
-                    "freshness": "noLimit",
-                    "summary": True,
-                    "count": 5
-                }
-                resp = requests.post("https://api.langsearch.com/v1/web-search", headers=headers, json=body)
-                if resp.status_code == 200:
-                    results = resp.json().get("results", [])
-                    external_info = "\n".join([r.get("summary", "") for r in results])
-                    st.info(f"🌐 외부 정보 {len(results)}건 수집 완료")
-                else:
-                    st.warning(f"LangSearch 실패: 상태코드 {resp.status_code}")
-            except Exception as e:
-                st.error(f"LangSearch 호출 오류: {e}")
-
-            # 🤖 GPT 프롬프트 구성
-            gpt_prompt = f"""
-                당신은 금융 RFP를 분석하는 전문가입니다.
-                아래는 실제 문서 내용입니다:
-                \"\"\"{document_text}\"\"\"
-                아래는 외부 검색으로 수집된 배경 정보입니다:
-                \"\"\"{external_info}\"\"\"
-                사용자 요청:
-                {user_prompt}
-                전체 문서와 외부 배경을 반영하여 step-by-step으로 분석하고 응답하세요.
-                """
-
-            with st.expander("📨 GPT 프롬프트 확인", expanded=False):
-                st.code(gpt_prompt[:1200] + "..." if len(gpt_prompt) > 1200 else gpt_prompt)
-
-            developer = """
-                너는 금융권 RFP 문서를 참고하여 제안서를 작성하는 전문가다.  
-                - 금융 IT 시스템, 최신 기술 트렌드, 규제 환경에 정통하다.  
-                - RFP 요구사항을 정확히 분석해, 실현 가능한 솔루션과 명확한 근거를 제시한다.  
-                - 제안서는 논리적 구조(요구사항, 솔루션, 일정, 예산, 리스크 등)로 작성하며, 근거와 데이터, 표를 활용해 신뢰도를 높인다.  
-                - 복잡한 용어는 쉽게 풀어 설명하고, 허위·과장·비현실적 내용은 배제한다.  
-                - 법적·윤리적 기준과 금융 규제를 최대한 준수한다.  
-                - 가능하다면 실제 금융권 RFP 사례를 참고해 설득력 있는 제안서를 작성하라.
-            """
-
-            # 🧠 GPT 호출
-            gpt_response = gpt_client.chat.completions.create(
-                model=deployment_name,
-                messages=[
-                    {"role": "system", "content": developer},
-                    {"role": "user", "content": gpt_prompt}
-                ]
-            )            
-
-            if gpt_response:
-                with st.expander("📌 GPT 분석 결과", expanded=False):
-                    if gpt_response:
-                        content = gpt_response.choices[0].message.content.strip()
-                        st.markdown(content if content else "응답이 비어 있어요.")
-                    else:
-                        st.error("GPT 응답 실패")
-            else:
-                st.error("GPT 호출 실패")
-
-            st.session_state.document_text = document_text
-            st.session_state.external_info = external_info
-
+            etag = blob_inventory.get_etag(blob_service_client, "word-data", selected_file)
+            # ⚙️ 분석은 백그라운드 작업으로 실행 → rerun되어도 같은 작업에 다시 연결
+            st.session_state["rag_job_id"] = jobs.submit(
+                "rag_analysis",
+                lambda job: _run_analysis(job, selected_file, etag, user_prompt, keyword, langsearch_api_key, not bypass_cache),
+                key=("rag_analysis", selected_file, etag, user_prompt, keyword, bypass_cache),
+                force=bypass_cache,
+            )
         except Exception as e:
             st.error(f"오류 발생: {e}")
 
+    job_id = st.session_state.get("rag_job_id")
+    if job_id:
+        _show_analysis_job(job_id)
+
     # 초기 설정        
     # if "chat_input" not in st.session_state:
     #     st.session_state.chat_input = ""
     if "chat_history" not in st.session_state:
         st.session_state.chat_history = []
+        st.session_state.chat_summary = ""
     
-    if "document_text" in st.session_state and "external_info" in st.session_state:
+    if "rag_doc_handle" in st.session_state:
         st.subheader("💬 ChatBot 대화")     
 
         # 질문 입력 UI
@@ -171,31 +154,288 @@ def ai_tab():
         if st.button("💬 질문하기", key="chat_langsearch_button"):
             question = st.session_state["chat_input"].strip()
             if question:
-                chat_prompt = f"문서: {st.session_state.document_text}\n외부정보: {st.session_state.external_info}\n질문: {question}"
-                chat_response = gpt_client.chat.completions.create(
-                    model=deployment_name,
-                    messages=[
-                        {"role": "system", "content": "너는 금융 RFP 분석 전문가이며, 문서와 외부 정보를 함께 활용해 답변해요."},
-                        {"role": "user", "content": chat_prompt}
-                    ]
-                )
-                if chat_response:
-                    response_text = chat_response.choices[0].message.content.strip()
-                    # 히스토리 저장
-                    st.session_state.chat_history.append({
-                        "question": question,
-                        "answer": response_text
-                    })
-                else:
-                    st.warning("Chat 응답이 비어 있어요.")
+                # 문서 본문/인덱스는 공용 저장소에서 핸들로 조회 (세션에는 핸들만 보관)
+                holder = _holder()
+                doc_index = doc_store.get_document(blob_service_client, st.session_state.rag_doc_handle, holder)["index"]
+                external_info = doc_store.get_text(st.session_state.rag_external_handle, holder) or ""
+                history = list(st.session_state.chat_history)
+                summary = st.session_state.chat_summary
+                st.session_state["chat_job_id"] = jobs.submit(
+                    "chat", lambda job: _run_chat(job, doc_index, external_info, history, summary, question, not bypass_cache))
+
+        chat_job_id = st.session_state.get("chat_job_id")
+        if chat_job_id:
+            _show_chat_job(chat_job_id)
 
     # 이전 대화 기록 출력
     #   대화 기록 출력
     st.markdown("---")
     st.markdown("### 🗨️ 대화 기록")
+    if st.session_state.chat_summary:
+        with st.expander("📜 이전 대화 요약", expanded=False):
+            st.text(st.session_state.chat_summary)
     for idx, qa in enumerate(st.session_state.chat_history[::-1]):  # 최신 순
         st.markdown(f"**🟢 질문 {len(st.session_state.chat_history) - idx}:** {qa['question']}")
         st.markdown(f"**🧠 답변:** {qa['answer']}")
         st.markdown("---")  # 구분선으로 메시지 정리
 
     
+
+
+def _run_analysis(job, selected_file, etag, user_prompt, keyword, langsearch_api_key, use_cache):
+    # 작업 스레드에서 실행 (st.* 호출 없이 job에 진행 상황/중간 결과만 기록)
+    # ⚡ 문서 다운로드/파싱과 외부 검색은 서로 독립적이므로 동시에 실행
+    job.set_progress("문서 로드 + 외부 검색", message="문서 로드 + 외부 검색 동시 진행 중...")
+    pipeline_start = time.perf_counter()
+    steps = run_concurrently({
+        "문서 로드 (다운로드+파싱)": (lambda: get_artifact(blob_service_client, "word-data", selected_file, etag), DOCUMENT_TIMEOUT),
+        "외부 검색 (LangSearch)": (lambda: fetch_external_info(keyword, langsearch_api_key), WEB_SEARCH_TIMEOUT),
+    })
+    timings = {name: step["elapsed"] for name, step in steps.items()}
+    timings["병렬 단계 전체"] = time.perf_counter() - pipeline_start
+
+    document_step = steps["문서 로드 (다운로드+파싱)"]
+    if document_step["error"]:
+        raise document_step["error"]
+    artifact = document_step["value"]
+    document_text = "\n".join(artifact["paragraphs"])
+
+    # 🌐 외부 검색 실패는 분석을 막지 않음
+    external_info, result_count, search_error = "", 0, None
+    search_step = steps["외부 검색 (LangSearch)"]
+    if search_step["error"]:
+        search_error = str(search_step["error"])
+    else:
+        external_info, result_count = search_step["value"]
+    etag = artifact["source_etag"]  # 목록의 etag가 오래됐으면 get_artifact가 실제 etag로 만든 결과
+    job.publish(file=selected_file, etag=etag, text_length=len(document_text),
+                external_info=external_info, result_count=result_count, search_error=search_error)
+
+    # 🔎 청크 검색 인덱스 (예산 초과 시 문서 선별용) → 공용 저장소에 올려 두면 후속 질문 세션이 그대로 재사용
+    doc_handle = doc_store.acquire_document(blob_service_client, "word-data", selected_file, etag, job.id, artifact=artifact)
+    doc_index = doc_store.get(doc_handle)["index"]
+    doc_store.release(doc_handle, job.id)
+
+    # 🧮 전송 전 토큰 예산 점검: 외부 정보를 먼저 줄이고, 그래도 넘으면 요청과 관련된 문서 부분만 전달
+    budget_parts = {"system": DEVELOPER_PROMPT, "document": document_text, "external": external_info, "instruction": user_prompt}
+    budget_report = fit_parts(budget_parts, trim_order=("external",), min_tokens={"external": EXTERNAL_MIN_TOKENS})
+    selected_count = None
+    if not budget_report["fits"]:
+        document_budget = budget_report["budget"] - (budget_report["total"] - budget_report["after"]["document"])
+        selected = select_within_budget(doc_index, f"{user_prompt}\n{keyword}", document_budget)
+        selected_count = len(selected)
+        budget_parts = dict(budget_report["parts"], document="\n".join(selected))
+        original_tokens = budget_report["before"]
+        budget_report = fit_parts(budget_parts)
+        budget_report["before"] = original_tokens  # 표에는 원본 크기를 표시
+
+    # 🤖 GPT 프롬프트 구성
+    gpt_prompt = f"""
+                당신은 금융 RFP를 분석하는 전문가입니다.
+                아래는 실제 문서 내용입니다:
+                \"\"\"{budget_report["parts"]["document"]}\"\"\"
+                아래는 외부 검색으로 수집된 배경 정보입니다:
+                \"\"\"{budget_report["parts"]["external"]}\"\"\"
+                사용자 요청:
+                {user_prompt}
+                전체 문서와 외부 배경을 반영하여 step-by-step으로 분석하고 응답하세요.
+                """
+    job.publish(budget={"table": budget_table(budget_report), "total": budget_report["total"],
+                        "budget": budget_report["budget"], "cost": budget_report["cost"]},
+                selected_count=selected_count, chunk_count=len(doc_index["chunks"]),
+                prompt_preview=gpt_prompt[:1200] + "..." if len(gpt_prompt) > 1200 else gpt_prompt)
+
+    # 🧠 GPT 호출 (스트리밍)
+    prompt_ready = time.perf_counter()
+    job.set_progress("OpenAI 응답 대기")
+    gpt_response = stream_completion(
+        gpt_client, deployment_name,
+        messages=[
+            {"role": "system", "content": DEVELOPER_PROMPT},
+            {"role": "user", "content": gpt_prompt}
+        ],
+        on_update=job.stream_writer(),
+        use_cache=use_cache,
+        on_wait=job.wait_writer()
+    )
+
+    # ⏱️ 단계별 소요 시간
+    timings["프롬프트 구성"] = prompt_ready - pipeline_start - timings["병렬 단계 전체"]
+    if gpt_response["ttft"] is not None:
+        timings["GPT 첫 토큰"] = gpt_response["ttft"]
+    timings["GPT 전체 응답"] = gpt_response["elapsed"]
+    return dict(gpt_response, timings=timings)
+
+def _show_analysis_job(job_id):
+    stop_button(job_id, key="rag_stop_button")
+    document_area = st.container()
+    status_text = st.empty()
+    with st.expander("📌 GPT 분석 결과", expanded=True):
+        result_body = st.empty()
+
+    shown = set()
+    def on_poll(job):
+        data = job["data"]
+        if "text_length" in data and "document" not in shown:
+            shown.add("document")
+            with document_area:
+                st.success(f"✅ 문서 텍스트 추출 완료 ({data['file']})")
+                st.write(f"📏 문서 길이: {data['text_length']}자")
+                if data["search_error"]:
+                    st.warning(f"LangSearch 호출 오류: {data['search_error']}")
+                else:
+                    st.info(f"🌐 외부 정보 {data['result_count']}건 수집 완료")
+        if "budget" in data and "budget" not in shown:
+            shown.add("budget")
+            budget = data["budget"]
+            with document_area:
+                if data["selected_count"] is not None:
+                    st.info(f"📉 문서가 입력 예산({budget['budget']:,} tokens)을 초과하여 "
+                            f"요청과 관련도 높은 {data['selected_count']}/{data['chunk_count']}개 청크만 전달합니다.")
+                with st.expander(f"🧮 전송 전 토큰 예산: {budget['total']:,} / {budget['budget']:,} tokens", expanded=False):
+                    st.table(budget["table"])
+                    st.caption(f"예상 입력 비용: ${budget['cost']:.3f}")
+                with st.expander("📨 GPT 프롬프트 확인", expanded=False):
+                    st.code(data["prompt_preview"])
+
+    job = follow_job(job_id, status_text, result_body, on_poll=on_poll)
+    if job is None:
+        st.session_state.pop("rag_job_id", None)
+        status_text.empty()
+        return
+    if job["status"] == jobs.CANCELLED:
+        status_text.caption("⏹️ 작업이 중지되었습니다.")
+        return
+    if job["status"] == jobs.ERROR:
+        status_text.empty()
+        st.error(f"오류 발생: {job['error']}")
+        return
+
+    gpt_response = job["result"]
+    status_text.caption(format_stats(gpt_response))
+    if not gpt_response["content"].strip():
+        result_body.markdown("응답이 비어 있어요.")
+    timings = gpt_response["timings"]
+    with st.expander("⏱️ 단계별 소요 시간", expanded=False):
+        st.table({"단계": list(timings), "소요 시간(초)": [round(v, 3) for v in timings.values()]})
+
+    # 💬 후속 질문용 문서는 작업마다 한 번만 공용 저장소에서 핸들로 받음 (같은 문서를 보는 세션끼리 공유)
+    if st.session_state.get("rag_session_job_id") != job_id:
+        data = job["data"]
+        holder = _holder()
+        try:
+            doc_handle = doc_store.acquire_document(blob_service_client, "word-data", data["file"], data["etag"], holder)
+            external_handle = doc_store.acquire_text(data["external_info"], holder)
+        except Exception as e:
+            st.error(f"오류 발생: {e}")
+            return
+        for key in ("rag_doc_handle", "rag_external_handle"):
+            old_handle = st.session_state.get(key)
+            if old_handle is not None and old_handle not in (doc_handle, external_handle):
+                doc_store.release(old_handle, holder)
+        st.session_state.rag_doc_handle = doc_handle
+        st.session_state.rag_external_handle = external_handle
+        st.session_state["rag_session_job_id"] = job_id
+
+def _holder():
+    # 공용 문서 저장소에서 이 세션을 구분하는 id
+    if "doc_store_holder" not in st.session_state:
+        st.session_state.doc_store_holder = uuid.uuid4().hex
+    return st.session_state.doc_store_holder
+
+def _compact_turn(qa):
+    question = qa["question"][:CHAT_SUMMARY_LINE_CHARS]
+    answer = " ".join(qa["answer"].split())[:CHAT_SUMMARY_LINE_CHARS]
+    return f"- Q: {question} / A: {answer}"
+
+def _record_turn(question, answer):
+    # 최근 CHAT_HISTORY_MAX_TURNS턴만 원문으로 두고, 밀려난 대화는 한 줄 요약으로 합침 (요약도 토큰 상한 유지)
+    history = st.session_state.chat_history
+    history.append({"question": question, "answer": answer})
+    lines = st.session_state.chat_summary.splitlines()
+    while len(history) > CHAT_HISTORY_MAX_TURNS:
+        lines.append(_compact_turn(history.pop(0)))
+    while lines and count_tokens("\n".join(lines)) > CHAT_SUMMARY_MAX_TOKENS:
+        lines.pop(0)
+    st.session_state.chat_summary = "\n".join(lines)
+
+def _run_chat(job, doc_index, external_info, chat_history, chat_summary, question, use_cache):
+    # 문서 전체 대신 질문과 관련된 상위 청크만 전달
+    hits = search(doc_index, question)
+
+    # 🧮 전송 전 토큰 예산: 오래된 대화부터 빼고, 그래도 넘으면 외부 정보 → 문서 청크 순으로 줄임
+    context = "\n---\n".join(chunk for _, _, chunk in hits)
+    turns = chat_history[-CHAT_RECENT_TURNS:]
+    while True:
+        history = "\n".join(qa["question"] + qa["answer"][:CHAT_TURN_MAX_CHARS] for qa in turns)
+        budget_report = fit_parts(
+            {"system": CHAT_SYSTEM_PROMPT, "context": context, "external": external_info,
+             "summary": chat_summary, "history": history, "question": question},
+            budget=CHAT_TOKEN_BUDGET, trim_order=("summary", "external", "context"))
+        if (budget_report["fits"] and "context" not in budget_report["trimmed"]) or not turns:
+            break
+        turns = turns[1:]
+    fitted = budget_report["parts"]
+
+    chat_prompt = f"문서(관련 부분): {fitted['context']}\n외부정보: {fitted['external']}\n질문: {question}"
+    messages = [{"role": "system", "content": CHAT_SYSTEM_PROMPT}]
+    if fitted["summary"]:
+        messages.append({"role": "system", "content": f"이전 대화 요약:\n{fitted['summary']}"})
+    for qa in turns:
+        messages.append({"role": "user", "content": qa["question"]})
+        messages.append({"role": "assistant", "content": qa["answer"][:CHAT_TURN_MAX_CHARS]})
+    messages.append({"role": "user", "content": chat_prompt})
+    job.publish(question=question, hits=[[chunk_no, score, chunk[:300]] for chunk_no, score, chunk in hits],
+                total=budget_report["total"], turns=len(turns), trimmed=budget_report["trimmed"])
+
+    job.set_progress("OpenAI 응답 대기")
+    return stream_completion(
+        gpt_client, deployment_name,
+        messages=messages,
+        on_update=job.stream_writer(),
+        use_cache=use_cache,
+        on_wait=job.wait_writer()
+    )
+
+def _show_chat_job(job_id):
+    # 답변이 끝나면 한 번만 대화 기록에 추가 (rerun마다 다시 추가하지 않음)
+    if st.session_state.get("chat_recorded_job_id") == job_id:
+        return
+    stop_button(job_id, key="chat_stop_button")
+    hits_area = st.container()
+    answer_status = st.empty()
+    answer_body = st.empty()
+
+    shown = set()
+    def on_poll(job):
+        data = job["data"]
+        if "hits" in data and "hits" not in shown:
+            shown.add("hits")
+            with hits_area:
+                with st.expander(f"🔎 검색된 문서 청크 ({len(data['hits'])}건)", expanded=False):
+                    for rank, (chunk_no, score, chunk) in enumerate(data["hits"], 1):
+                        st.markdown(f"**{rank}위 · 청크 {chunk_no + 1} · BM25 {score:.2f}**")
+                        st.caption(chunk + ("..." if len(chunk) >= 300 else ""))
+                st.caption(f"📨 전송 프롬프트 약 {data['total']:,} / {CHAT_TOKEN_BUDGET:,} tokens "
+                           f"(이전 대화 {data['turns']}턴{', 축소: ' + ', '.join(data['trimmed']) if data['trimmed'] else ''})")
+
+    job = follow_job(job_id, answer_status, answer_body, on_poll=on_poll)
+    if job is None or job["status"] == jobs.CANCELLED:
+        answer_status.caption("⏹️ 작업이 중지되었습니다." if job else "")
+        st.session_state["chat_recorded_job_id"] = job_id
+        return
+    if job["status"] == jobs.ERROR:
+        answer_status.empty()
+        st.error(f"오류 발생: {job['error']}")
+        st.session_state["chat_recorded_job_id"] = job_id
+        return
+
+    response_text = job["result"]["content"].strip()
+    st.session_state["chat_recorded_job_id"] = job_id
+    if response_text:
+        # 히스토리 저장 (기록 영역에 다시 출력되므로 스트리밍 영역은 정리)
+        answer_body.empty()
+        answer_status.empty()
+        _record_turn(job["data"]["question"], response_text)
+    else:
+        st.warning("Chat 응답이 비어 있어요.")
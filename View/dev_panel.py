@@ -0,0 +1,44 @@
+import os
+import streamlit as st
+from Service import tracing, clients, doc_store
+
+# 사이드바 개발자 패널: 최근 span을 구간별로 집계해 p50/p95 표시
+DEV_PANEL_DEFAULT = os.getenv("DEV_PANEL", "0") == "1"
+
+def dev_panel():
+    with st.sidebar:
+        if not st.checkbox("🛠️ 개발자 패널 (구간별 소요 시간)", value=DEV_PANEL_DEFAULT, key="dev_panel_enabled"):
+            return
+        if not tracing.TRACE_ENABLED:
+            st.info("TRACE_ENABLED=0 으로 계측이 꺼져 있습니다.")
+            return
+
+        rows = tracing.summary()
+        if not rows:
+            st.caption("아직 기록된 구간이 없습니다.")
+        else:
+            st.dataframe(
+                [{k: row[k] for k in ("stage", "count", "p50_ms", "p95_ms", "max_ms", "errors")} for row in rows],
+                hide_index=True)
+            with st.expander("토큰 · 비용 · 캐시"):
+                st.dataframe(
+                    [{k: row[k] for k in ("stage", "tokens", "cost_usd", "bytes", "retries", "cache_hits")}
+                     for row in rows if row["tokens"] or row["bytes"] or row["retries"] or row["cache_hits"]],
+                    hide_index=True)
+            with st.expander("최근 span"):
+                st.json(tracing.recent(20)[::-1], expanded=False)
+
+        with st.expander("클라이언트 상태"):
+            st.dataframe([dict(name=name, **status) for name, status in clients.health().items()], hide_index=True)
+            if st.button("다시 점검", key="dev_panel_health_check"):
+                for name in clients.health():
+                    clients.check(name)
+                st.rerun()
+
+        store = doc_store.stats()
+        st.caption(f"📚 공용 문서 저장소: {store['entries']}건 · 사용 중 {store['referenced']}건 · "
+                   f"{store['mb']}MB · 재사용 {store['hit']} · 제거 {store['evicted']}")
+        st.caption(f"📝 {tracing.TRACE_PATH}")
+        if st.button("집계 초기화", key="dev_panel_clear"):
+            tracing.clear()
+            st.rerun()
@@ -0,0 +1,127 @@
+import csv
+import io
+import streamlit as st
+from azure.ai.textanalytics import TextAnalyticsClient
+from azure.storage.blob import BlobServiceClient
+from openai import AzureOpenAI
+from Service import blob_inventory, jobs
+from Service.batch import run_batch, BATCH_LLM_CONCURRENCY
+from View.job_view import follow_job, stop_button
+
+blob_service_client = None
+language_client = None
+gpt_client = None
+deployment_name = None
+
+CONTAINER_NAME = "word-data"
+
+# 다른 화면으로 이동했다 돌아와도 유지할 위젯 값 (View.navigation에서 사용)
+STATE_KEYS = ["batch_files", "batch_bypass_cache"]
+
+
+def init_blob_service_e(client: BlobServiceClient):
+    global blob_service_client
+    blob_service_client = client
+
+def init_language_client_e(client: TextAnalyticsClient):
+    global language_client
+    language_client = client
+
+def init_gpt_e(client: AzureOpenAI, deployment):
+    global gpt_client, deployment_name
+    gpt_client = client
+    deployment_name = deployment
+
+def _to_csv(rows):
+    buffer = io.StringIO()
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    writer = csv.DictWriter(buffer, fieldnames=columns)
+    writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue().encode("utf-8-sig")  # 엑셀에서 한글이 깨지지 않도록 BOM 포함
+
+def batch_tab():
+    st.header("📊 RFP 일괄 분석 & 비교")
+
+    if not blob_service_client or not language_client or not gpt_client:
+        st.error("클라이언트 초기화 오류")
+        return
+
+    inventory = blob_inventory.list_docx(blob_service_client, CONTAINER_NAME)
+    docx_files = [blob["name"] for blob in inventory]
+    if not docx_files:
+        st.info("📂 업로드된 문서가 없습니다.")
+        return
+
+    if "batch_files" in st.session_state:
+        st.session_state["batch_files"] = [name for name in st.session_state["batch_files"] if name in docx_files]
+    selected_files = st.multiselect("비교할 문서를 선택하세요", docx_files, key="batch_files")
+    bypass_cache = st.checkbox("♻️ 캐시된 GPT 응답 무시하고 새로 생성", key="batch_bypass_cache")
+    st.caption(f"문서별 분석은 동시에 진행되며, Language/GPT 호출은 최대 {BATCH_LLM_CONCURRENCY}건씩 실행됩니다.")
+
+    if st.button("📊 일괄 분석 시작", key="batch_button"):
+        if not selected_files:
+            st.warning("📄 비교할 문서를 하나 이상 선택해 주세요.")
+        else:
+            etags = {blob["name"]: blob["etag"] for blob in inventory}
+            documents = [(name, etags.get(name)) for name in selected_files]
+            st.session_state["batch_job_id"] = jobs.submit(
+                "batch",
+                lambda job: run_batch(job, blob_service_client, CONTAINER_NAME, documents,
+                                      language_client, gpt_client, deployment_name, use_cache=not bypass_cache),
+                key=("batch", tuple(documents), bypass_cache),
+                force=bypass_cache,
+            )
+
+    job_id = st.session_state.get("batch_job_id")
+    if job_id:
+        _show_batch_job(job_id)
+
+def _show_result(result):
+    title = f"📄 {result['name']} ({result['elapsed']:.1f}초)"
+    with st.expander(("❌ " if result["error"] else "") + title, expanded=False):
+        if result["error"]:
+            st.error(result["error"])
+            return
+        st.markdown("**🔑 핵심 키워드:** " + ", ".join(result["key_phrases"]))
+        st.table({"항목": list(result["fields"]), "내용": list(result["fields"].values())})
+        st.caption(" · ".join(f"{stage} {seconds:.2f}초" for stage, seconds in result["timings"].items())
+                   + (" · 💾 캐시된 응답" if result["cached"] else ""))
+
+def _show_batch_job(job_id):
+    # 문서가 끝나는 대로 결과를 추가하고, 모두 끝나면 비교표를 표시
+    stop_button(job_id, key="batch_stop_button")
+    progress_area = st.empty()
+    status_text = st.empty()
+    results_area = st.container()
+
+    shown = set()
+    def on_poll(job):
+        data = job["data"]
+        results = data.get("results", {})
+        if data.get("total"):
+            progress_area.progress(len(results) / data["total"], text=f"{len(results)}/{data['total']}개 문서 완료")
+        for name, result in results.items():
+            if name not in shown:
+                shown.add(name)
+                with results_area:
+                    _show_result(result)
+
+    job = follow_job(job_id, status_text, on_poll=on_poll)
+    if job is None:
+        st.session_state.pop("batch_job_id", None)
+        return
+    status_text.empty()
+    if job["status"] == jobs.CANCELLED:
+        st.caption("⏹️ 작업이 중지되었습니다. 완료된 문서 결과만 표시합니다.")
+        return
+    if job["status"] == jobs.ERROR:
+        st.error(f"일괄 분석 오류: {job['error']}")
+        return
+
+    result = job["result"]
+    st.subheader("📋 비교표")
+    st.dataframe(result["table"], hide_index=True)
+    st.download_button("⬇️ 비교표 CSV 다운로드", _to_csv(result["table"]), file_name="rfp_comparison.csv",
+                       mime="text/csv", key="batch_download")
+    st.caption(f"⏱️ 전체 {result['elapsed']:.1f}초 (문서별 소요 시간 합계 {result['serial_elapsed']:.1f}초)")
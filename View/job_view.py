@@ -0,0 +1,45 @@
+import time
+import streamlit as st
+from Service import jobs
+from Service.gpt_stream import format_stats
+
+# 백그라운드 작업 진행 상황 표시 (rerun되어도 session_state의 작업 id로 다시 이어서 표시)
+POLL_INTERVAL = 0.25
+
+
+def job_status_text(job: dict) -> str:
+    if job["status"] == jobs.QUEUED:
+        position = jobs.queue_position(job["id"])
+        return f"⏳ 작업 대기 중... (대기열 {position + 1}번째)" if position >= 0 else "⏳ 작업 대기 중..."
+    progress = job["progress"]
+    if job["partial"]:
+        return format_stats(job["stats"])
+    if progress.get("message"):
+        return progress["message"]
+    if progress.get("total"):
+        return f"🧩 {progress['stage']} {progress['done']}/{progress['total']}"
+    return f"⏳ {progress.get('stage') or '작업 실행 중'}..."
+
+def follow_job(job_id: str, status, body=None, on_poll=None) -> dict:
+    # 작업이 끝날 때까지 상태 표시줄(status)과 스트리밍 본문(body)을 갱신, on_poll(job)로 단계별 결과를 추가 표시
+    # 사용자가 다른 위젯을 누르면 Streamlit이 이 루프를 중단하고 rerun → 다음 실행에서 같은 작업에 다시 연결됨
+    while True:
+        job = jobs.get(job_id)
+        if job is None:
+            return None
+        if on_poll:
+            on_poll(job)
+        if job["status"] in jobs.FINISHED:
+            if body is not None and job["result"] and job["result"].get("content") is not None:
+                body.markdown(job["result"]["content"])
+            return job
+        if body is not None and job["partial"]:
+            body.markdown(job["partial"] + " ▌")
+        status.caption(job_status_text(job))
+        time.sleep(POLL_INTERVAL)
+
+def stop_button(job_id: str, key: str):
+    # 진행 중인 작업 중지 (다음 진행 보고 시점에 중단)
+    job = jobs.get(job_id)
+    if job and job["status"] not in jobs.FINISHED and st.button("⏹️ 작업 중지", key=key):
+        jobs.cancel(job_id)
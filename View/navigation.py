@@ -0,0 +1,54 @@
+import os
+import streamlit as st
+from Service import tracing
+from View import b_summary_tab, c_search_tab, d_ai_tab, e_batch_tab
+from View.a_upload_tab import upload_tab
+from View.b_summary_tab import summary_tab
+from View.c_search_tab import search_tab
+from View.d_ai_tab import ai_tab
+from View.e_batch_tab import batch_tab
+
+# 화면 전환 방식
+# - pages (기본): 사이드바에서 고른 화면 하나만 실행 → rerun 비용이 탭 하나 분량
+# - tabs: 기존 st.tabs 방식 (모든 화면을 매번 실행)
+NAV_MODE = os.getenv("NAV_MODE", "pages")
+
+# (url 경로, 제목, 아이콘, 화면 함수, span 이름)
+VIEWS = [
+    ("upload", "파일업로드", "📁", upload_tab, "tab.upload"),
+    ("summary", "요약+openAI", "🧪", summary_tab, "tab.summary"),
+    ("search", "문서 내 검색", "🔎", search_tab, "tab.search"),
+    ("ai", "AI Chat 검색", "🌐", ai_tab, "tab.ai"),
+    ("batch", "일괄 비교", "📊", batch_tab, "tab.batch"),
+]
+
+# 화면에 없는 위젯의 값은 Streamlit이 run이 끝날 때 지우므로, 화면별로 유지할 key를 모아 둠
+STATE_KEYS = b_summary_tab.STATE_KEYS + c_search_tab.STATE_KEYS + d_ai_tab.STATE_KEYS + e_batch_tab.STATE_KEYS
+
+
+def keep_widget_state(keys=STATE_KEYS):
+    # 위젯 값을 세션 값으로 다시 대입 → 다른 화면으로 이동해도 사라지지 않고 돌아오면 그대로 복원
+    for key in keys:
+        if key in st.session_state:
+            st.session_state[key] = st.session_state[key]
+
+def _traced(view, span_name):
+    # 탭별 실행 시간도 span으로 기록 (하위 호출은 이 span 아래에 연결됨)
+    def run():
+        with tracing.span(span_name):
+            view()
+    return run
+
+def render_views(mode: str = None):
+    mode = mode or NAV_MODE
+    if mode == "tabs":
+        tabs = st.tabs([title for _, title, _, _, _ in VIEWS])
+        for tab, (_, _, _, view, span_name) in zip(tabs, VIEWS):
+            with tab:
+                _traced(view, span_name)()
+        return
+
+    keep_widget_state()
+    pages = [st.Page(_traced(view, span_name), title=title, icon=icon, url_path=path, default=(i == 0))
+             for i, (path, title, icon, view, span_name) in enumerate(VIEWS)]
+    st.navigation(pages, position="sidebar").run()
@@ -0,0 +1,79 @@
+import gc
+import time
+import argparse
+from Service.chunker import chunk_paragraphs, LANGUAGE_MAX_ELEMENTS
+from Service.docx_extract import extract_bytes
+from Service.ingest import LANGUAGE_CHUNK_CHARS
+from Service.map_reduce import MAP_CHUNK_TOKENS
+from Service.retrieval import RETRIEVAL_CHUNK_TOKENS, RETRIEVAL_OVERLAP_TOKENS
+from Service.token_budget import count_tokens
+from benchmarks.synthetic_rfp import make_rfp
+
+# 공용 청크 분할기 처리량 측정 (앱에서 쓰는 세 가지 설정) + 크기 상한/빈 청크 검사
+# 문서 크기가 커져도 MB/s가 비슷하게 유지되면 입력 길이에 선형
+# 실행: python -m benchmarks.bench_chunker --pages 50 200 500
+CONFIGS = {
+    "language": dict(max_size=LANGUAGE_CHUNK_CHARS, size_fn=len, max_chars=LANGUAGE_MAX_ELEMENTS, content_defined=True),
+    "retrieval": dict(max_size=RETRIEVAL_CHUNK_TOKENS, size_fn=count_tokens, overlap=RETRIEVAL_OVERLAP_TOKENS),
+    "map": dict(max_size=MAP_CHUNK_TOKENS, size_fn=count_tokens, content_defined=True),
+}
+
+
+def legacy_chunks(paragraphs, max_chars):
+    # 이전 요약 탭 방식 (비교용): 글자 수 기준, 긴 단락도 그대로 한 청크
+    chunks = []
+    current = ""
+    for para in paragraphs:
+        if len(current) + len(para) >= max_chars and current:
+            chunks.append(current)
+            current = ""
+        current += para + "\n"
+    if current:
+        chunks.append(current)
+    return chunks
+
+def long_paragraphs(paragraphs, every=50, repeat=40):
+    # 표/부록을 한 단락으로 붙여 넣은 문서처럼 일부 단락을 Language 한도보다 길게 만듦
+    return [" ".join([p] * repeat) if i % every == 0 else p for i, p in enumerate(paragraphs)]
+
+def measure(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+def check(chunks, config):
+    size_fn = config["size_fn"]
+    assert all(chunk.strip() for chunk in chunks), "빈 청크가 있습니다"
+    assert max(size_fn(chunk) for chunk in chunks) <= config["max_size"], "크기 상한을 넘는 청크가 있습니다"
+    if config.get("max_chars"):
+        assert max(len(chunk) for chunk in chunks) <= config["max_chars"], "서비스 글자 수 한도를 넘는 청크가 있습니다"
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, nargs="+", default=[50, 200, 500])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'pages':>6} {'input':>9} {'config':>10} {'chunks':>7} {'time(s)':>8} {'MB/s':>7} {'para/s':>9} {'max size':>9}")
+    for pages in args.pages:
+        paragraphs = long_paragraphs(extract_bytes(make_rfp(pages)))
+        mb = sum(len(p.encode("utf-8")) for p in paragraphs) / 1024 / 1024
+        label = f"{mb:.2f}MB"
+
+        chunks, seconds = measure(lambda: legacy_chunks(paragraphs, LANGUAGE_CHUNK_CHARS), args.repeat)
+        over = sum(len(c) > LANGUAGE_MAX_ELEMENTS for c in chunks)
+        print(f"{pages:>6} {label:>9} {'legacy':>10} {len(chunks):>7} {seconds:>8.3f} {mb / seconds:>7.1f} "
+              f"{len(paragraphs) / seconds:>9.0f} {max(map(len, chunks)):>9}  (5120자 초과 {over}개)")
+
+        for name, config in CONFIGS.items():
+            chunks, seconds = measure(lambda: chunk_paragraphs(paragraphs, **config), args.repeat)
+            check(chunks, config)
+            print(f"{pages:>6} {label:>9} {name:>10} {len(chunks):>7} {seconds:>8.3f} {mb / seconds:>7.1f} "
+                  f"{len(paragraphs) / seconds:>9.0f} {max(map(config['size_fn'], chunks)):>9}")
+
+if __name__ == "__main__":
+    main()
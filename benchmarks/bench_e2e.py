@@ -0,0 +1,235 @@
+import os
+import sys
+import json
+import time
+import tempfile
+import argparse
+import platform
+import tracemalloc
+
+# 오프라인 종단 간 벤치마크: 실제 탭 코드를 Streamlit AppTest로 실행하고 Azure 호출은 benchmarks.fakes로 대체
+# 실행: python -m benchmarks.bench_e2e --pages 10 100 500
+#       python -m benchmarks.bench_e2e --save-baseline          (기준값 저장)
+#       python -m benchmarks.bench_e2e --latency openai_ttft=1.5 language=0.6
+# 기준값 파일이 있으면 자동으로 비교하고, 회귀가 있으면 종료 코드 1
+
+# 캐시 위치와 할당량은 Service 모듈을 import하기 전에 정해야 함 (모듈 로드 시 환경 변수를 읽음)
+_WORK_DIR = tempfile.mkdtemp(prefix="bench_e2e_")
+os.environ.setdefault("DOC_CACHE_DIR", os.path.join(_WORK_DIR, "docx_text"))
+os.environ.setdefault("COMPLETION_CACHE_PATH", os.path.join(_WORK_DIR, "completions.sqlite3"))
+os.environ.setdefault("LOCAL_INDEX_DIR", os.path.join(_WORK_DIR, "local_index"))
+os.environ.setdefault("TRACE_PATH", os.path.join(_WORK_DIR, "spans.jsonl"))
+os.environ.setdefault("JOB_DIR", os.path.join(_WORK_DIR, "jobs"))
+os.environ.setdefault("OPENAI_TPM", "100000000")   # 벤치마크는 앱 처리 시간을 재므로 할당량 대기는 제외
+
+from streamlit.testing.v1 import AppTest
+from benchmarks import fakes
+from benchmarks.synthetic_rfp import make_rfp
+from Service import http_client, blob_inventory, search_client, tracing
+
+CONTAINER = "word-data"
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "e2e.json")
+APP_TIMEOUT = 900
+
+
+def _upload_app():
+    from View.a_upload_tab import upload_tab
+    upload_tab()
+
+def _summary_app():
+    from View.b_summary_tab import summary_tab
+    summary_tab()
+
+def _search_app():
+    from View.c_search_tab import search_tab
+    search_tab()
+
+def _ai_app():
+    from View.d_ai_tab import ai_tab
+    ai_tab()
+
+
+def install_fakes(service):
+    # main.py의 init_* 대신 각 탭의 모듈 전역에 가짜 클라이언트를 주입
+    from View import a_upload_tab, b_summary_tab, c_search_tab, d_ai_tab
+    language = fakes.FakeTextAnalyticsClient()
+    gpt = fakes.FakeAzureOpenAI()
+    a_upload_tab.blob_service_client = service
+    a_upload_tab.language_client = language
+    b_summary_tab.blob_service_client = service
+    b_summary_tab.language_client = language
+    b_summary_tab.gpt_client = gpt
+    b_summary_tab.deployment_name = "bench"
+    c_search_tab.blob_service_client = service
+    c_search_tab.search_service_name = "https://bench.search.windows.net"
+    c_search_tab.search_api_key = "bench"
+    d_ai_tab.blob_service_client = service
+    d_ai_tab.gpt_client = gpt
+    d_ai_tab.deployment_name = "bench"
+    d_ai_tab.lang_search_key = "bench"
+    http_client._send = fakes.fake_send(service, CONTAINER)
+    blob_inventory.invalidate()
+    search_client.invalidate()
+
+def _check(at, stage):
+    if at.exception:
+        raise RuntimeError(f"{stage}: {at.exception[0].message}")
+    if at.error:
+        raise RuntimeError(f"{stage}: {at.error[0].value}")
+
+def measure(stage, action, trace_memory):
+    before = fakes.snapshot()
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        action()
+    finally:
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else 0
+        if trace_memory:
+            tracemalloc.stop()
+    after = fakes.snapshot()
+    return {
+        "seconds": round(elapsed, 3),
+        "peak_mb": round(peak / 1024 / 1024, 1),
+        "calls": {name: after[name] - before.get(name, 0) for name in after if after[name] != before.get(name, 0)},
+    }
+
+def run_scenario(pages, trace_memory):
+    service = fakes.FakeBlobServiceClient()
+    install_fakes(service)
+    name = f"bench_rfp_{pages}p.docx"
+    data = make_rfp(pages, seed=pages)
+    results = {}
+
+    def upload():
+        at = AppTest.from_function(_upload_app, default_timeout=APP_TIMEOUT).run()
+        at.file_uploader[0].set_value((name, data, DOCX_MIME)).run()
+        _check(at, "upload")
+
+    summary = AppTest.from_function(_summary_app, default_timeout=APP_TIMEOUT)
+    def summary_run():
+        summary.run()
+        summary.selectbox[0].set_value(name).run()
+        summary.button(key="summary_button").click().run()
+        _check(summary, "summary")
+
+    def summary_rerun():
+        # 같은 문서를 다시 요약 (artifact/응답 캐시 효과)
+        summary.button(key="summary_button").click().run()
+        _check(summary, "summary_warm")
+
+    search = AppTest.from_function(_search_app, default_timeout=APP_TIMEOUT)
+    def search_with(backend):
+        def run():
+            search.run()
+            search.text_input[0].input("보안 요구사항")
+            search.radio(key="search_backend").set_value(backend)
+            search.button(key="search_basic_button").click().run()
+            _check(search, f"search {backend}")
+        return run
+
+    ai = AppTest.from_function(_ai_app, default_timeout=APP_TIMEOUT)
+    def analysis():
+        ai.run()
+        ai.selectbox[0].set_value(name).run()
+        ai.button(key="rag_analysis_button").click().run()
+        _check(ai, "ai")
+
+    def chat():
+        ai.text_input(key="chat_input").input("보안 요구사항 중 암호화 관련 항목은?")
+        ai.button(key="chat_langsearch_button").click().run()
+        _check(ai, "chat")
+
+    stages = [
+        ("upload", upload),
+        ("summary", summary_run),
+        ("summary_warm", summary_rerun),
+        ("search_azure", search_with("Azure Search")),
+        ("search_local", search_with("로컬 인덱스")),
+        ("search_hybrid", search_with("하이브리드")),
+        ("ai_analysis", analysis),
+        ("ai_chat", chat),
+    ]
+    for stage, action in stages:
+        results[f"{pages}p/{stage}"] = measure(stage, action, trace_memory)
+    results[f"{pages}p/upload"]["size_mb"] = round(len(data) / 1024 / 1024, 2)
+    return results
+
+def compare(results, baseline, tolerance):
+    # 시간/메모리는 허용 비율(+0.05초/1MB 여유) 초과 시, 외부 호출 횟수는 늘어나면 회귀
+    regressions = []
+    for key, current in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if current["seconds"] > base["seconds"] * (1 + tolerance) + 0.05:
+            regressions.append(f"{key}: {base['seconds']:.3f}s → {current['seconds']:.3f}s")
+        if base["peak_mb"] and current["peak_mb"] > base["peak_mb"] * (1 + tolerance) + 1:
+            regressions.append(f"{key}: peak {base['peak_mb']}MB → {current['peak_mb']}MB")
+        for name, count in current["calls"].items():
+            if count > base["calls"].get(name, 0) and not name.endswith("_tokens") and not name.endswith("_documents"):
+                regressions.append(f"{key}: {name} 호출 {base['calls'].get(name, 0)} → {count}")
+    return regressions
+
+def print_table(results, baseline):
+    print(f"{'stage':<22} {'seconds':>8} {'base':>8} {'peak(MB)':>9}  calls")
+    for key, r in results.items():
+        base = baseline.get(key, {}).get("seconds")
+        base_text = f"{base:.3f}" if base is not None else "-"
+        calls = ", ".join(f"{k}={v}" for k, v in sorted(r["calls"].items()))
+        print(f"{key:<22} {r['seconds']:>8.3f} {base_text:>8} {r['peak_mb']:>9.1f}  {calls}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--latency", nargs="*", default=[], help="이름=초 (예: openai_ttft=1.0 language=0.5)")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="모든 지연에 곱할 배수 (0이면 지연 없음)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--no-memory", action="store_true", help="tracemalloc 끄기 (측정 부하 제거)")
+    parser.add_argument("--spans", action="store_true", help="구간(span)별 p50/p95 집계도 출력")
+    args = parser.parse_args()
+
+    fakes.set_latency(**dict(item.split("=", 1) for item in args.latency))
+    fakes.scale_latency(args.latency_scale)
+
+    results = {}
+    for pages in args.pages:
+        results.update(run_scenario(pages, not args.no_memory))
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved.get("latency") != fakes.LATENCY:
+            print("⚠️ 기준값과 지연 설정이 달라 시간 비교 결과는 참고용입니다.")
+        baseline = saved["results"]
+    print_table(results, baseline)
+    if args.spans:
+        print(f"\n{'span':<24} {'count':>6} {'p50(ms)':>9} {'p95(ms)':>9} {'tokens':>9}")
+        for row in tracing.summary():
+            print(f"{row['stage']:<24} {row['count']:>6} {row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['tokens']:>9}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"python": platform.python_version(), "latency": fakes.LATENCY, "results": results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"기준값 저장: {args.baseline}")
+        return
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("\n❌ 회귀 감지")
+        for line in regressions:
+            print(f"  - {line}")
+        sys.exit(1)
+    if baseline:
+        print("\n✅ 기준값 대비 회귀 없음")
+
+if __name__ == "__main__":
+    main()
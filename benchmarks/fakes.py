@@ -0,0 +1,256 @@
+import json
+import time
+import types
+import hashlib
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from azure.core.exceptions import ResourceNotFoundError, ResourceModifiedError, ResourceExistsError
+
+# 오프라인 벤치마크용 가짜 Azure 클라이언트
+# - 앱 코드가 실제로 호출하는 메서드만 구현 (BlobServiceClient, TextAnalyticsClient, AzureOpenAI, HTTP 전송)
+# - 호출마다 LATENCY에 설정한 지연(초)을 넣고, 호출 횟수를 calls에 집계
+LATENCY = {
+    "blob_list": 0.05,
+    "blob_download": 0.05,       # 요청당 고정 지연
+    "blob_download_mb": 0.02,    # MB당 추가 지연
+    "blob_upload": 0.05,
+    "blob_block": 0.01,
+    "language": 0.3,             # Language 배치 요청당
+    "openai_ttft": 0.5,          # 첫 토큰까지
+    "openai_token": 0.002,       # 출력 토큰당
+    "search": 0.1,
+    "langsearch": 0.2,
+}
+OUTPUT_TOKENS = 200
+
+calls = Counter()
+_calls_lock = threading.Lock()
+
+
+def set_latency(**values):
+    for name, value in values.items():
+        if name not in LATENCY:
+            raise KeyError(f"알 수 없는 지연 항목: {name}")
+        LATENCY[name] = float(value)
+
+def scale_latency(factor: float):
+    for name in LATENCY:
+        LATENCY[name] *= factor
+
+def _hit(name, delay=None):
+    with _calls_lock:
+        calls[name] += 1
+    delay = LATENCY.get(name, 0.0) if delay is None else delay
+    if delay > 0:
+        time.sleep(delay)
+
+def snapshot() -> dict:
+    with _calls_lock:
+        return dict(calls)
+
+
+# ---------------- Blob Storage ----------------
+
+class _Downloader:
+    def __init__(self, data):
+        self._data = data
+
+    def readall(self):
+        return self._data
+
+    def readinto(self, stream):
+        stream.write(self._data)
+        return len(self._data)
+
+
+class FakeBlobClient:
+    def __init__(self, service, container, name):
+        self._service = service
+        self._container = container
+        self.blob_name = name
+
+    @property
+    def _store(self):
+        return self._service.containers.setdefault(self._container, {})
+
+    def _entry(self):
+        entry = self._store.get(self.blob_name)
+        if entry is None:
+            raise ResourceNotFoundError(f"{self.blob_name} 없음")
+        return entry
+
+    def _put(self, data, metadata):
+        etag = f'"0x{hashlib.md5(data).hexdigest()[:16].upper()}"'
+        self._store[self.blob_name] = {"data": data, "etag": etag, "metadata": dict(metadata or {}),
+                                       "last_modified": datetime.now(timezone.utc)}
+        return {"etag": etag}
+
+    def get_blob_properties(self, **kwargs):
+        entry = self._entry()
+        return types.SimpleNamespace(name=self.blob_name, size=len(entry["data"]), etag=entry["etag"],
+                                     metadata=entry["metadata"], last_modified=entry["last_modified"])
+
+    def download_blob(self, etag=None, match_condition=None, **kwargs):
+        entry = self._entry()
+        if etag is not None and etag != entry["etag"]:
+            raise ResourceModifiedError("etag 불일치")
+        _hit("blob_download", LATENCY["blob_download"] + LATENCY["blob_download_mb"] * len(entry["data"]) / 1024 / 1024)
+        return _Downloader(entry["data"])
+
+    def upload_blob(self, data, overwrite=False, metadata=None, **kwargs):
+        if not overwrite and self.blob_name in self._store:
+            raise ValueError(f"{self.blob_name} 이미 존재")
+        _hit("blob_upload")
+        return self._put(bytes(data), metadata)
+
+    def stage_block(self, block_id, data, **kwargs):
+        _hit("blob_block")
+        self._service.staged[(self._container, self.blob_name, block_id)] = bytes(data)
+
+    def commit_block_list(self, block_list, metadata=None, **kwargs):
+        _hit("blob_upload")
+        data = b"".join(self._service.staged.pop((self._container, self.blob_name, block.id)) for block in block_list)
+        return self._put(data, metadata)
+
+    def delete_blob(self, **kwargs):
+        self._entry()
+        _hit("blob_delete", 0.0)
+        del self._store[self.blob_name]
+
+    def exists(self, **kwargs):
+        return self.blob_name in self._store
+
+
+class FakeContainerClient:
+    def __init__(self, service, container):
+        self._service = service
+        self.container_name = container
+
+    def list_blobs(self, name_starts_with=None, include=None, **kwargs):
+        _hit("blob_list")
+        store = self._service.containers.get(self.container_name, {})
+        return [FakeBlobClient(self._service, self.container_name, name).get_blob_properties()
+                for name in sorted(store) if not name_starts_with or name.startswith(name_starts_with)]
+
+    def get_blob_client(self, blob):
+        return FakeBlobClient(self._service, self.container_name, blob)
+
+
+class FakeBlobServiceClient:
+    def __init__(self):
+        self.containers = {}
+        self.staged = {}
+
+    def get_container_client(self, container):
+        return FakeContainerClient(self, container)
+
+    def create_container(self, container, **kwargs):
+        if container in self.containers:
+            raise ResourceExistsError(f"{container} 있음")
+        self.containers[container] = {}
+
+    def get_blob_client(self, container, blob):
+        return FakeBlobClient(self, container, blob)
+
+    def get_account_information(self, **kwargs):
+        return {"sku_name": "Standard_LRS", "account_kind": "StorageV2"}
+
+
+# ---------------- Language (TextAnalytics) ----------------
+
+class FakeTextAnalyticsClient:
+    def extract_key_phrases(self, documents, **kwargs):
+        _hit("language")
+        with _calls_lock:
+            calls["language_documents"] += len(documents)
+        return [types.SimpleNamespace(id=doc["id"], is_error=False,
+                                      key_phrases=sorted(set(doc["text"].split()), key=len, reverse=True)[:10])
+                for doc in documents]
+
+    def begin_extract_summary(self, documents, max_sentence_count=3, **kwargs):
+        _hit("language")
+        with _calls_lock:
+            calls["language_documents"] += len(documents)
+        results = [types.SimpleNamespace(id=doc["id"], is_error=False,
+                                         sentences=[types.SimpleNamespace(text=s.strip() + ".")
+                                                    for s in doc["text"].split(".")[:max_sentence_count] if s.strip()])
+                   for doc in documents]
+        return types.SimpleNamespace(result=lambda: iter(results))
+
+
+# ---------------- Azure OpenAI ----------------
+
+class _Completions:
+    def create(self, model=None, messages=None, stream=False, max_tokens=None, **kwargs):
+        from Service.token_budget import count_tokens
+        prompt_tokens = sum(count_tokens(m["content"]) for m in messages)
+        with _calls_lock:
+            calls["openai"] += 1
+            calls["openai_prompt_tokens"] += prompt_tokens
+        output_tokens = min(max_tokens or OUTPUT_TOKENS, OUTPUT_TOKENS)
+        words = [f"요약{i}" for i in range(output_tokens)]
+        usage = types.SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=output_tokens,
+                                      total_tokens=prompt_tokens + output_tokens)
+        time.sleep(LATENCY["openai_ttft"])
+        if not stream:
+            time.sleep(LATENCY["openai_token"] * output_tokens)
+            message = types.SimpleNamespace(content="## 요약\n" + " ".join(words))
+            return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message, finish_reason="stop")], usage=usage)
+
+        def chunks():
+            for word in words:
+                time.sleep(LATENCY["openai_token"])
+                delta = types.SimpleNamespace(content=word + " ")
+                yield types.SimpleNamespace(choices=[types.SimpleNamespace(delta=delta, finish_reason=None)], usage=None)
+            # 실제 API처럼 stream_options={"include_usage": True}를 요청한 경우에만 마지막 usage 청크를 보냄
+            if (kwargs.get("stream_options") or {}).get("include_usage"):
+                yield types.SimpleNamespace(choices=[], usage=usage)
+        return chunks()
+
+
+class FakeAzureOpenAI:
+    def __init__(self, **kwargs):
+        self.chat = types.SimpleNamespace(completions=_Completions())
+
+
+# ---------------- HTTP (Azure Search, LangSearch) ----------------
+
+class FakeResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self._payload = payload
+        self.text = json.dumps(payload, ensure_ascii=False)
+        self.content = self.text.encode("utf-8")
+        self.headers = {}
+
+    def json(self):
+        return self._payload
+
+
+def fake_send(blob_service: FakeBlobServiceClient, container: str):
+    # http_client._send 대체: URL로 Azure Search 조회/문서 조회/LangSearch를 구분
+    def send(method, url, timeout, json=None, **kwargs):
+        if "api.langsearch.com" in url:
+            _hit("langsearch")
+            query = (json or {}).get("query", "")
+            return FakeResponse(200, {"results": [
+                {"name": f"{query} 동향 {i}", "url": f"https://example.com/{i}", "summary": f"{query} 관련 기사 요약 {i}. " * 20}
+                for i in range((json or {}).get("count", 5))]})
+        if method == "GET" and "/docs" not in url:
+            # 인덱스 스키마 조회
+            _hit("search_schema")
+            return FakeResponse(200, {"fields": [{"name": name, "retrievable": True, "key": name == "metadata_storage_path"}
+                                                 for name in ("metadata_storage_path", "metadata_storage_name", "title", "content")]})
+        _hit("search")
+        names = sorted(n for n in blob_service.containers.get(container, {}) if n.endswith(".docx"))
+        if method == "GET":
+            return FakeResponse(200, {"content": "본문 " * 2000})
+        body = json or {}
+        skip, top = body.get("skip", 0), body.get("top", 50)
+        hits = [{"metadata_storage_path": f"key{i}", "metadata_storage_name": name, "title": name,
+                 "@search.score": 1.0 / (i + 1),
+                 "@search.highlights": {"content": [f"**{body.get('search', '')}** 관련 문장"]}}
+                for i, name in enumerate(names)]
+        return FakeResponse(200, {"@odata.count": len(hits), "value": hits[skip:skip + top]})
+    return send
@@ -0,0 +1,42 @@
+import io
+import random
+import docx
+
+# 벤치마크용 가상 한국어 RFP .docx 생성기 (페이지당 단락 수와 표 비율은 실제 금융권 RFP를 대략 흉내냄)
+PARAGRAPHS_PER_PAGE = 18
+TABLE_EVERY_PAGES = 3
+TABLE_ROWS = 12
+
+_SECTIONS = ["사업 개요", "추진 배경 및 목적", "사업 범위", "업무 요구사항", "기술 요구사항",
+             "보안 요구사항", "운영 및 유지보수", "프로젝트 관리", "제안서 작성 지침", "평가 기준"]
+_SUBJECTS = ["차세대 계정계 시스템", "모바일 뱅킹 플랫폼", "통합 인증 서비스", "데이터 분석 포털",
+             "클라우드 전환 인프라", "이상거래 탐지 시스템", "고객 상담 챗봇", "API 게이트웨이"]
+_VERBS = ["구축하여야 한다", "제공하여야 한다", "준수하여야 한다", "지원하여야 한다", "제시하여야 한다"]
+_DETAILS = ["전자금융감독규정", "개인정보보호법", "24시간 무중단 운영", "초당 3,000건 이상의 거래 처리",
+            "이중화 구성", "암호화 모듈 KCMVP 인증", "DR 센터 실시간 복제", "접근 통제 및 감사 로그"]
+
+
+def _sentence(rng):
+    return (f"제안사는 {rng.choice(_SUBJECTS)}에 대해 {rng.choice(_DETAILS)}을(를) 고려한 방안을 "
+            f"{rng.choice(_VERBS)}. Requirement ID REQ-{rng.randint(1, 999):03d} 참조.")
+
+def make_rfp(pages: int, seed: int = 0) -> bytes:
+    rng = random.Random(seed)
+    document = docx.Document()
+    for page in range(pages):
+        if page % 5 == 0:
+            document.add_heading(f"{page // 5 + 1}. {_SECTIONS[(page // 5) % len(_SECTIONS)]}", level=1)
+        for _ in range(PARAGRAPHS_PER_PAGE):
+            document.add_paragraph(" ".join(_sentence(rng) for _ in range(rng.randint(1, 3))))
+        if page % TABLE_EVERY_PAGES == 0:
+            # 요구사항 조견표
+            table = document.add_table(rows=TABLE_ROWS, cols=4)
+            for r, row in enumerate(table.rows):
+                values = (["요구사항 ID", "구분", "요구사항 명", "상세 내용"] if r == 0 else
+                          [f"SFR-{page:03d}-{r:02d}", rng.choice(["기능", "비기능", "보안", "운영"]),
+                           rng.choice(_SUBJECTS), _sentence(rng)])
+                for cell, value in zip(row.cells, values):
+                    cell.text = value
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
@@ -1,54 +1,54 @@
 import streamlit as st
-from azure.storage.blob import BlobServiceClient
-import os
-from dotenv import load_dotenv
+from Service import clients
 
 # streamlit run .\main.py
-# 환경 변수에서 OpenAI API 키를 가져옵니다.
-load_dotenv()
-
-os.system('cls' if os.name == 'nt' else 'clear') # nt는 윈도우 옛날 버전 이름
-
-azure_connection_string = os.getenv("AZURE_CONNECTION_STRING")
-openai_api_key = os.getenv("OPENAI_API_KEY")
-openai_endpoint = os.getenv("OPENAI_ENDPOINT")
-chat_deployment_name = os.getenv("CHAT_DEPLOYMENT_NAME")
-language_endpoint = os.getenv("LANGUAGE_ENDPOINT")
-language_api_key = os.getenv("LANGUAGE_API_KEY")
-search_service_name = os.getenv("SEARCH_SERVICE_NAME")
-serach_api_key = os.getenv("SEARCH_API_KEY")
-lang_search_key = os.getenv("LANG_SEARCH_KEY")
-
-# Blob 클라이언트 생성
-blob_service_client = BlobServiceClient.from_connection_string(azure_connection_string)
+# 환경 변수(.env)는 Service.clients가 프로세스당 한 번만 읽음
 
 # 각 탭에 클라이언트 전달
-from View.a_upload_tab import init_blob_service_a, upload_tab
-from View.b_summary_tab import init_language_client, init_blob_service_b, init_gpt_b, summary_tab
-from View.c_search_tab import init_serach_c, search_tab
-from View.d_ai_tab import init_gpt_d, init_get_key, init_blob_service_d, init_serach_d, ai_tab
-
-init_blob_service_a(blob_service_client)
-init_blob_service_b(blob_service_client)
-init_blob_service_d(blob_service_client)
-init_serach_c(service_name=search_service_name,api_key=serach_api_key)
-init_serach_d(service_name=search_service_name,api_key=serach_api_key)
-init_language_client(endpoint=language_endpoint, key=language_api_key)
-init_gpt_b(endpoint=openai_endpoint, key=openai_api_key, deployment=chat_deployment_name)
-init_gpt_d(endpoint=openai_endpoint, key=openai_api_key, deployment=chat_deployment_name)
-init_get_key(lang_key=lang_search_key)
+from View.a_upload_tab import init_blob_service_a, init_language_client_a
+from View.b_summary_tab import init_language_client, init_blob_service_b, init_gpt_b
+from View.c_search_tab import init_serach_c, init_blob_service_c
+from View.d_ai_tab import init_gpt_d, init_get_key, init_blob_service_d, init_serach_d
+from View.e_batch_tab import init_blob_service_e, init_language_client_e, init_gpt_e
+from View.navigation import render_views
+from View.dev_panel import dev_panel
+
+
+@st.cache_resource
+def init_clients():
+    # rerun마다 다시 실행되지 않도록 프로세스당 한 번만 주입 (모든 세션이 같은 클라이언트와 연결 풀을 공유)
+    # 실제 클라이언트는 처음 사용될 때 만들어지고, 시작 직후 백그라운드에서 미리 생성/예열
+    blob_service_client = clients.lazy("blob")
+    language_client = clients.lazy("language")
+    gpt_client = clients.lazy("openai")
+    chat_deployment_name = clients.setting("CHAT_DEPLOYMENT_NAME")
+    search_service_name = clients.setting("SEARCH_SERVICE_NAME")
+    serach_api_key = clients.setting("SEARCH_API_KEY")
+
+    init_blob_service_a(blob_service_client)
+    init_blob_service_b(blob_service_client)
+    init_blob_service_d(blob_service_client)
+    init_blob_service_c(blob_service_client)
+    init_serach_c(service_name=search_service_name, api_key=serach_api_key)
+    init_serach_d(service_name=search_service_name, api_key=serach_api_key)
+    init_language_client_a(language_client)
+    init_language_client(language_client)
+    init_gpt_b(gpt_client, deployment=chat_deployment_name)
+    init_gpt_d(gpt_client, deployment=chat_deployment_name)
+    init_blob_service_e(blob_service_client)
+    init_language_client_e(language_client)
+    init_gpt_e(gpt_client, deployment=chat_deployment_name)
+    init_get_key(lang_key=clients.setting("LANG_SEARCH_KEY"))
+    clients.warm_up()
+    return True
+
+init_clients()
 
 
 # 🧭 Streamlit UI 구성
 st.title("📘 RFP 기반 제안 작성 자료 정리 및 문서 Q&A 지원 시스템")
 
-tabs = st.tabs(["파일업로드", "요약+openAI", "문서 내 검색", "AI Chat 검색"])
+# 기본은 선택한 화면 하나만 실행 (NAV_MODE=tabs 이면 기존 탭 방식)
+render_views()
 
-with tabs[0]:
-    upload_tab()
-with tabs[1]:
-    summary_tab()
-with tabs[2]:
-    search_tab()
-with tabs[3]:
-    ai_tab()
\ No newline at end of file
+dev_panel()
@@ -0,0 +1,123 @@
+import random
+from Service.chunker import chunk_paragraphs, split_sentences, LANGUAGE_MAX_ELEMENTS
+from Service.token_budget import count_tokens
+
+# 공용 청크 분할기 단위 테스트
+# 실행: python -m pytest -q
+
+
+def _paragraphs(count, seed=0):
+    rng = random.Random(seed)
+    words = ["제안서", "요구사항", "시스템", "보안", "일정", "인력", "the", "service", "data", "report"]
+    paragraphs = []
+    for i in range(count):
+        sentences = [" ".join(rng.choice(words) for _ in range(rng.randint(4, 12))) + "." for _ in range(rng.randint(1, 4))]
+        paragraphs.append(f"{i}번 단락 " + " ".join(sentences))
+    return paragraphs
+
+def _words(text):
+    return text.split()
+
+
+def test_split_sentences_korean_and_english():
+    text = "사업 범위는 다음과 같다. 일정은 6개월이다! 예산은? The kickoff is in May. It ends in June."
+    assert split_sentences(text) == [
+        "사업 범위는 다음과 같다.", "일정은 6개월이다!", "예산은?", "The kickoff is in May.", "It ends in June.",
+    ]
+
+def test_split_sentences_keeps_abbreviations():
+    text = ("Mr. Kim met Dr. Lee at Acme Inc. last week. Tools, e.g. Word and Excel, are allowed. "
+            "The U.S. office (i.e. HQ) signs. J. Smith approves it. 1. 범위 2. 일정")
+    assert split_sentences(text) == [
+        "Mr. Kim met Dr. Lee at Acme Inc. last week.",
+        "Tools, e.g. Word and Excel, are allowed.",
+        "The U.S. office (i.e. HQ) signs.",
+        "J. Smith approves it.",
+        "1. 범위 2. 일정",
+    ]
+
+def test_split_sentences_korean_single_syllable_words():
+    # 한 글자 한국어 단어나 소수 뒤의 마침표는 약어가 아니라 문장 끝
+    text = "총 사업비는 5억 원. 기간은 6개월이다. 투입 인력은 12명. 예산은 3.5억. 1. 범위 A. 일정"
+    assert split_sentences(text) == [
+        "총 사업비는 5억 원.", "기간은 6개월이다.", "투입 인력은 12명.", "예산은 3.5억.", "1. 범위 A. 일정",
+    ]
+
+def test_split_sentences_quotes_and_bullets():
+    text = '그는 "완료했다." 라고 말했다. ○ 첫 항목 ○ 둘째 항목'
+    assert split_sentences(text) == ['그는 "완료했다."', "라고 말했다.", "○ 첫 항목", "○ 둘째 항목"]
+
+def test_split_sentences_long_word_before_dot():
+    text = "x" * 40 + ". 다음 문장"
+    assert split_sentences(text) == ["x" * 40 + ".", "다음 문장"]
+
+
+def test_chunks_within_max_size():
+    paragraphs = _paragraphs(200)
+    for size_fn, max_size in ((len, 300), (count_tokens, 120)):
+        chunks = chunk_paragraphs(paragraphs, max_size, size_fn=size_fn)
+        assert chunks
+        assert all(size_fn(chunk) <= max_size for chunk in chunks)
+        assert _words("".join(chunks)) == _words("\n".join(paragraphs))
+
+def test_overlap_repeats_tail_of_previous_chunk():
+    paragraphs = _paragraphs(200, seed=1)
+    max_size, overlap = 120, 30
+    chunks = chunk_paragraphs(paragraphs, max_size, size_fn=count_tokens, overlap=overlap)
+    assert len(chunks) > 5
+    assert all(count_tokens(chunk) <= max_size for chunk in chunks)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        previous_sentences = split_sentences(previous)
+        sentences = split_sentences(chunk)
+        # 다음 청크는 앞 청크의 끝 문장들로 시작하고, 그 뒤에 새 내용이 있음
+        carried = 0
+        while carried < len(sentences) and sentences[:carried + 1] == previous_sentences[-(carried + 1):]:
+            carried += 1
+        assert carried < len(sentences)
+        assert count_tokens(" ".join(sentences[:carried])) <= overlap
+    # overlap을 빼고 이어 붙이면 원문과 같음
+    without_overlap = [split_sentences(chunks[0])]
+    for previous, chunk in zip(chunks, chunks[1:]):
+        previous_sentences, sentences = split_sentences(previous), split_sentences(chunk)
+        carried = max((n for n in range(len(sentences)) if sentences[:n] == previous_sentences[len(previous_sentences) - n:]),
+                      default=0)
+        without_overlap.append(sentences[carried:])
+    assert _words(" ".join(s for group in without_overlap for s in group)) == _words(" ".join(paragraphs))
+
+def test_overlap_disabled_has_no_repetition():
+    paragraphs = _paragraphs(100, seed=2)
+    chunks = chunk_paragraphs(paragraphs, 200)
+    assert _words("".join(chunks)) == _words("\n".join(paragraphs))
+
+def test_max_chars_hard_split():
+    # 문장 경계도 공백도 드문 긴 단락 (표를 붙여 넣은 경우)
+    long_word = "가" * 700
+    paragraph = " ".join([long_word] * 20)
+    chunks = chunk_paragraphs(["머리말", paragraph, "맺음말"], 10_000, max_chars=LANGUAGE_MAX_ELEMENTS)
+    assert len(chunks) > 2
+    assert all(len(chunk) <= LANGUAGE_MAX_ELEMENTS for chunk in chunks)
+    assert "".join(_words("".join(chunks))) == "".join(_words("머리말 " + paragraph + " 맺음말"))
+
+def test_hard_split_without_spaces():
+    paragraph = "나" * 3000
+    chunks = chunk_paragraphs([paragraph], 1000)
+    assert all(len(chunk) <= 1000 for chunk in chunks)
+    assert "".join(chunk.strip() for chunk in chunks) == paragraph
+
+def test_content_defined_boundaries_survive_insertion():
+    paragraphs = _paragraphs(400, seed=3)
+    before = chunk_paragraphs(paragraphs, 400, content_defined=True)
+    after = chunk_paragraphs(paragraphs[:3] + ["새로 추가된 단락입니다."] + paragraphs[3:], 400, content_defined=True)
+    # 삽입 지점 뒤 몇 청크 안에 경계가 다시 맞춰지고, 그 뒤 청크는 그대로 → 청크 해시 캐시 재사용
+    tail = before[8:]
+    assert len(tail) > 100
+    assert after[-len(tail):] == tail
+
+def test_no_empty_chunks():
+    paragraphs = ["", "   ", "\n", "내용 있는 단락.", "\t", "끝."]
+    for kwargs in ({}, {"overlap": 2}, {"content_defined": True}, {"max_chars": 8}):
+        chunks = chunk_paragraphs(paragraphs, 10, **kwargs)
+        assert chunks
+        assert all(chunk.strip() for chunk in chunks)
+    assert chunk_paragraphs(["", "  "], 10) == []
+    assert chunk_paragraphs([], 10) == []